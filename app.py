@@ -1,38 +1,122 @@
 """Ingredient Ordering AI - Main Streamlit Application."""
+import os
+import numpy as np
 import streamlit as st
 import pandas as pd
 from datetime import datetime
 from model_utils import get_season, TEMPERATURE_CATEGORIES, get_temperature_category
-from data_loader import load_data
+from data_loader import load_data, load_sqlite_history, load_store_week_index, load_week_index
 from data_filter import filter_by_week
-from data_formatter import format_data_for_display, apply_year_highlight
+from data_formatter import (
+    format_data_for_display, highlight_for_display, page_count, paginate, DISPLAY_PAGE_SIZE
+)
 from weather_service import fetch_weather_data
-from model_trainer import train_model, predict_orders
-from shap_explainer import create_explainer, plot_waterfall
+from model_trainer import (
+    train_model, predict_orders, predict_intervals, load_compiled_model, load_model_params
+)
+from model_store import model_version
+from history_sqlite import filter_by_week_sqlite
+from history_store import HISTORY_STORE_PATH, history_fingerprint
+from store_models import load_store_models
+from shap_explainer import render_waterfall, start_shap_lookup, waterfall_frame
+from order_planner import plan_orders
+from telemetry import get_telemetry, serve_metrics
+
+# Optional metrics export: a Prometheus text file rewritten after every
+# rerun, and/or a /metrics endpoint on this port
+METRICS_FILE_ENV = 'APP_METRICS_FILE'
+METRICS_PORT_ENV = 'APP_METRICS_PORT'
+# History preview queries: 'memory' (pandas over the loaded frame) or 'sqlite'
+HISTORY_BACKEND_ENV = 'APP_HISTORY_BACKEND'
+
+
+@st.cache_resource
+def start_metrics_server(port):
+    """Start the /metrics endpoint once per process."""
+    return serve_metrics(port)
+
+
+def show_diagnostics(telemetry):
+    """Sidebar panel with this rerun's stage timings and cache counters."""
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        last_run = telemetry.last_run()
+        stages = telemetry.stages()
+        st.dataframe(pd.DataFrame([
+            {'Stage': name, 'This run (ms)': seconds * 1000,
+             'Avg (ms)': stages[name]['total_seconds'] / stages[name]['count'] * 1000,
+             'Runs': stages[name]['count']}
+            for name, seconds in last_run.items()
+        ]), hide_index=True)
+        st.dataframe(pd.DataFrame([
+            {'Cache': name, **counts} for name, counts in telemetry.cache_stats().items()
+        ]), hide_index=True)
 
 
 def main():
     st.title('🥗 Ingredient Ordering AI')
     st.markdown("Use this tool to predict how many boxes of ingredients you need to order.")
 
-    df = load_data()
-    model, metrics = train_model(df)
+    telemetry = get_telemetry()
+    telemetry.begin_run()
+    if os.environ.get(METRICS_PORT_ENV):
+        start_metrics_server(int(os.environ[METRICS_PORT_ENV]))
+    try:
+        _render(telemetry)
+    finally:
+        if os.environ.get(METRICS_FILE_ENV):
+            telemetry.write_metrics(os.environ[METRICS_FILE_ENV])
+    if st.sidebar.checkbox("Show diagnostics"):
+        show_diagnostics(telemetry)
+
+
+def _render(telemetry):
+    """Build the page, timing each stage of the rerun."""
+    with telemetry.span('load_data', cached=True):
+        df = load_data()
+    use_sqlite = os.environ.get(HISTORY_BACKEND_ENV) == 'sqlite'
+    if 'Store' in df.columns:
+        # Multi-store history: one model per store, loaded on demand
+        store_models = load_store_models(HISTORY_STORE_PATH, history_fingerprint(HISTORY_STORE_PATH),
+                                         params=load_model_params())
+        store = st.sidebar.selectbox("Store", store_models.stores)
+        with telemetry.span('train_model'):
+            model, metrics = store_models.get(store)
+        df = df[df['Store'] == store]
+        week_index = None if use_sqlite else load_store_week_index(store)
+    else:
+        store = None
+        with telemetry.span('train_model', cached=True):
+            # Read every rerun, so a newly selected config is part of the cache key
+            model, metrics = train_model(df, params=load_model_params())
+        # The SQLite backend answers the preview with its own indexes
+        week_index = None if use_sqlite else load_week_index()
     
-    # Prepare training data for SHAP explainer
-    X_train = df[['Season', 'Weather', 'Temperature', 'Long_Weekend', 'Promotion', 'Holiday']]
-    explainer = create_explainer(model, X_train)
+    version = model_version(model)
+    # Predictions for every possible input, so recommendations are table lookups
+    with telemetry.span('compile_model'):
+        compiled_model = load_compiled_model(model, version)
 
     st.header("Historical Data")
     
     # Get current week number for filtering and formatting
     current_week = datetime.now().isocalendar()[1]
     
-    preview_df = filter_by_week(df, current_week)
-    display_df = format_data_for_display(preview_df, current_week)
+    with telemetry.span('filter_history'):
+        if use_sqlite:
+            preview_df = filter_by_week_sqlite(load_sqlite_history(), current_week, store=store)
+        else:
+            preview_df = filter_by_week(df, current_week, index=week_index)
+    # Only the visible page is formatted and styled
+    pages = page_count(preview_df, DISPLAY_PAGE_SIZE)
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+    with telemetry.span('format_history'):
+        page_df = paginate(preview_df, page, DISPLAY_PAGE_SIZE)
+        display_df = format_data_for_display(page_df, current_week)
     
-    # Apply styling
-    styled_df = apply_year_highlight(display_df)
-    st.dataframe(styled_df, hide_index=True)
+        # Apply styling
+        st.dataframe(highlight_for_display(display_df), hide_index=True)
 
     st.header("Model Performance")
     col1, col2 = st.columns(2)
@@ -62,7 +146,8 @@ def main():
         st.write(f"Season: **{season}**")
 
         # Fetch weather data
-        weather, max_temp = fetch_weather_data(date)
+        with telemetry.span('weather'):
+            weather, max_temp = fetch_weather_data(date)
 
         if weather is None:
             st.warning("Weather report is not available for the selected date. Please enter manually.")
@@ -79,14 +164,25 @@ def main():
         is_promotion = st.checkbox("Promotion?")
         is_holiday = st.checkbox("Holiday?")
 
+    native_charts = st.sidebar.checkbox(
+        "Lightweight explanation charts",
+        help="Show feature contributions as a simple bar chart instead of a SHAP waterfall plot"
+    )
+
     if st.button("Predict"):
         if weather is None or temperature_category is None:
              st.error("Cannot predict without weather data.")
         else:
-            prediction = predict_orders(
-                model, season, weather, temperature_category,
-                is_long_weekend, is_promotion, is_holiday
-            )
+            with telemetry.span('predict'):
+                prediction = predict_orders(
+                    compiled_model, season, weather, temperature_category,
+                    is_long_weekend, is_promotion, is_holiday
+                )
+                # P10 / P50 / P90 of the individual trees' predictions
+                intervals = predict_intervals(
+                    compiled_model, season, weather, temperature_category,
+                    is_long_weekend, is_promotion, is_holiday
+                )
 
             ingredients = ['Tomato', 'Green Pepper', 'Lettuce', 'Cucumber']
 
@@ -97,6 +193,8 @@ def main():
                 with cols[i]:
                     st.metric(label=f"{ingredient} Boxes", value=int(round(prediction[i])))
                     st.caption(f"Raw: {prediction[i]:.2f}")
+                    p10, p50, p90 = np.round(intervals[:, i]).astype(int)
+                    st.caption(f"P10 / P50 / P90: {p10} / {p50} / {p90}")
             
             # SHAP Explainability Section
             st.header("Why These Predictions?")
@@ -112,25 +210,44 @@ def main():
                 'Holiday': [is_holiday]
             })
             
+            # The explainer is built in the background after the first render;
+            # wait for it here if it isn't ready yet
+            with telemetry.span('create_explainer', cached=True), st.spinner("Preparing explanations..."):
+                try:
+                    shap_lookup, shap_error = start_shap_lookup(model, version).result(), None
+                except Exception as e:
+                    # Don't keep the failed build cached, so the next rerun retries it
+                    start_shap_lookup.clear()
+                    shap_lookup, shap_error = None, e
+
             # Create tabs for each ingredient
             tabs = st.tabs(ingredients)
+            explanation = None
             
             for i, (tab, ingredient) in enumerate(zip(tabs, ingredients)):
                 with tab:
+                    if shap_lookup is None:
+                        st.warning(f"Could not generate explanation for {ingredient}: {str(shap_error)}")
+                        continue
                     try:
-                        # Get base values (expected value from model)
-                        preprocessor = model.named_steps['preprocessor']
-                        X_train_preprocessed = preprocessor.transform(X_train)
-                        regressor = model.named_steps['regressor']
-                        base_values = regressor.predict(X_train_preprocessed).mean(axis=0)
-                        
-                        # Create and display waterfall plot
-                        fig = plot_waterfall(
-                            explainer, model, input_data,
-                            ingredient, i, base_values
-                        )
-                        st.pyplot(fig)
-                        
+                        # SHAP values for all ingredients are computed once and shared by the tabs
+                        if explanation is None:
+                            with telemetry.span('explain'):
+                                explanation = shap_lookup.explain(input_data)
+
+                        if native_charts:
+                            st.bar_chart(waterfall_frame(explanation, i), x='Feature', y='Contribution',
+                                         horizontal=True, sort=False)
+                            st.caption(f"Base value {explanation.base_values[0][i]:.2f}, "
+                                       f"prediction {prediction[i]:.2f}")
+                            continue
+
+                        # Rendered images are cached per model, input and ingredient
+                        input_key = tuple(input_data.iloc[0].tolist())
+                        with telemetry.span('render_waterfall', cached=True):
+                            image = render_waterfall(version, input_key, i, explanation)
+                        st.image(image)
+
                         st.markdown(f"""
                         **How to read this chart:**
                         - The chart shows how different factors push the predicted {ingredient} boxes up (red) or down (blue)
@@ -141,6 +258,21 @@ def main():
                     except Exception as e:
                         st.warning(f"Could not generate explanation for {ingredient}: {str(e)}")
 
+    st.header("Plan Upcoming Orders")
+    st.markdown("Predict orders for the next several Wednesdays at once.")
+    n_weeks = st.slider("Weeks to plan", min_value=1, max_value=12, value=4)
+    if st.button("Plan"):
+        with telemetry.span('plan_orders'):
+            plan = plan_orders(compiled_model, df, n_weeks=n_weeks)
+        st.dataframe(
+            plan[['Date', 'Season', 'Weather', 'Temperature', 'Weather_Source',
+                  'Tomato', 'Green Pepper', 'Lettuce', 'Cucumber']],
+            hide_index=True
+        )
+
+    # Start building the SHAP explainer now that the page is on screen
+    start_shap_lookup(model, version)
+
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,130 @@
+"""Benchmark: cold-start import time of the app, broken down by package.
+
+Imports the target module in fresh interpreters with `python -X importtime`
+and reports the total, the target's direct imports and the self time
+attributed to each top-level package (median over runs). Results can be
+saved as JSON and compared against an earlier run.
+
+Run from the repository root:
+    python -m benchmarks.startup --output startup.json
+    python -m benchmarks.startup --baseline startup.json
+"""
+import argparse
+import json
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+DEFAULT_MODULE = 'app'
+DEFAULT_RUNS = 5
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        list of (module, self_us, cumulative_us, depth) in output order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            entries.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return entries
+
+
+def measure_once(module=DEFAULT_MODULE):
+    """
+    Import module in a fresh interpreter.
+
+    Returns:
+        dict with wall-clock 'wall_s', the module's cumulative 'import_s',
+        seconds per direct import and self seconds per top-level package
+    """
+    t0 = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            capture_output=True, text=True, check=True)
+    wall = time.perf_counter() - t0
+    entries = parse_importtime(result.stderr)
+
+    target = next(e for e in reversed(entries) if e[0] == module and e[3] == 0)
+    # Direct imports of the target are the depth-1 entries right before it
+    target_at = len(entries) - 1 - entries[::-1].index(target)
+    direct = {}
+    for name, _, cumulative, depth in reversed(entries[:target_at]):
+        if depth == 0:
+            break
+        if depth == 1:
+            direct[name] = cumulative / 1e6
+    packages = defaultdict(float)
+    for name, self_us, _, _ in entries:
+        packages[name.split('.')[0]] += self_us / 1e6
+    return {'wall_s': wall, 'import_s': target[2] / 1e6, 'direct': direct, 'packages': dict(packages)}
+
+
+def measure(module=DEFAULT_MODULE, runs=DEFAULT_RUNS):
+    """Median of measure_once over runs."""
+    samples = [measure_once(module) for _ in range(runs)]
+
+    def median_of(key):
+        names = set().union(*(s[key] for s in samples))
+        return {n: statistics.median(s[key].get(n, 0.0) for s in samples) for n in names}
+
+    return {
+        'module': module,
+        'runs': runs,
+        'wall_s': statistics.median(s['wall_s'] for s in samples),
+        'import_s': statistics.median(s['import_s'] for s in samples),
+        'direct': median_of('direct'),
+        'packages': median_of('packages'),
+    }
+
+
+def _table(title, values, baseline=None, top=12):
+    print(title)
+    for name, seconds in sorted(values.items(), key=lambda item: -item[1])[:top]:
+        line = f"  {name:<28} {seconds * 1000:8.1f} ms"
+        if baseline is not None:
+            line += f"  ({(seconds - baseline.get(name, 0.0)) * 1000:+8.1f} ms)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--module', default=DEFAULT_MODULE, help="Module to import")
+    parser.add_argument('--runs', type=int, default=DEFAULT_RUNS)
+    parser.add_argument('--top', type=int, default=12, help="Rows per table")
+    parser.add_argument('--output', default=None, help="Write the results to this JSON file")
+    parser.add_argument('--baseline', default=None, help="JSON from an earlier run to compare with")
+    args = parser.parse_args()
+
+    results = measure(args.module, args.runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    print(f"import {args.module}: {results['import_s'] * 1000:.0f} ms "
+          f"(interpreter + import: {results['wall_s'] * 1000:.0f} ms, median of {args.runs})")
+    if baseline is not None:
+        print(f"  baseline: {baseline['import_s'] * 1000:.0f} ms "
+              f"({(results['import_s'] - baseline['import_s']) * 1000:+.0f} ms, "
+              f"{baseline['import_s'] / results['import_s']:.2f}x)")
+    _table("Direct imports (cumulative):", results['direct'],
+           baseline and baseline['direct'], args.top)
+    _table("Packages (self time):", results['packages'],
+           baseline and baseline['packages'], args.top)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,308 @@
+"""Benchmark suite: every hot path at scaled history sizes.
+
+Histories of each size are produced with the data generator. Every
+benchmark is timed over a few repeats, then run once more under tracemalloc
+to record its peak Python/NumPy allocation (Arrow buffers are not counted).
+Results are written as JSON; `compare` flags regressions between two runs.
+
+Run from the repository root:
+    python -m benchmarks.suite run --sizes 200 10000 1000000 --output bench.json
+    python -m benchmarks.suite compare baseline.json bench.json --threshold 0.2
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import sklearn
+from data_filter import WeekIndex, filter_by_week
+from data_formatter import format_data_for_display
+from generate_data import generate_data
+from history_sqlite import filter_by_week_sqlite, read_date_range, write_sqlite_history
+from history_store import import_csv, read_history
+from model_trainer import FEATURE_COLUMNS, compile_model, predict_orders, train_model
+from prediction_intervals import predict_quantiles
+from shap_explainer import ExplanationContext, build_explainer, build_shap_table
+
+DEFAULT_SIZES = [200, 10_000, 1_000_000]
+DEFAULT_REPEATS = 3
+# Relative slowdown (or memory growth) that compare reports as a regression
+DEFAULT_THRESHOLD = 0.2
+# Smaller absolute changes are treated as noise by compare
+NOISE_FLOOR = {'seconds': 0.002, 'peak_mb': 1.0}
+# Wednesdays per year in the generated histories
+WEEKS_PER_YEAR = 52.18
+
+
+def _generate_history(rows, tmpdir):
+    """CSV with about `rows` rows; more stores are added once 20 years are used up."""
+    years = min(20, max(1, math.ceil(rows / WEEKS_PER_YEAR)))
+    stores = max(1, math.ceil(rows / (years * WEEKS_PER_YEAR)))
+    csv_path = os.path.join(tmpdir, 'history.csv')
+    generate_data(end_date=datetime(2024, 12, 25), seed=0, stores=stores, years=years,
+                  output_path=csv_path)
+    return csv_path
+
+
+def _scenario(df):
+    row = df.iloc[-1]
+    return (row['Season'], row['Weather'], row['Temperature'],
+            row['Long_Weekend'], row['Promotion'], row['Holiday'])
+
+
+def _benchmarks(ctx):
+    """(name, repeats, callable) per hot path; each callable may store state in ctx."""
+    tmpdir = ctx['tmpdir']
+
+    def import_history():
+        path = tempfile.mkdtemp(dir=tmpdir)
+        import_csv(ctx['csv_path'], path)
+        ctx['store_path'] = path
+
+    def load_history():
+        ctx['df'] = read_history(ctx['store_path'])
+
+    def train_full():
+        train_model.clear()
+        ctx['model'], _ = train_model(ctx['df'], artifact_dir=tempfile.mkdtemp(dir=tmpdir))
+
+    def predict_one():
+        for _ in range(10):
+            predict_orders(ctx['model'], *_scenario(ctx['df']))
+
+    def compile_table():
+        ctx['compiled'] = compile_model(ctx['model'])
+
+    def predict_one_compiled():
+        for _ in range(1000):
+            ctx['compiled'].predict_one(*_scenario(ctx['df']))
+
+    def quantiles_full_history():
+        predict_quantiles(ctx['model'], ctx['df'][FEATURE_COLUMNS])
+
+    def quantile_table():
+        compile_model(ctx['model']).quantile_table()
+
+    def build_week_index():
+        ctx['week_index'] = WeekIndex(ctx['df'])
+
+    def filter_week():
+        ctx['preview'] = filter_by_week(ctx['df'], 20, index=ctx['week_index'])
+
+    def _store():
+        return 1 if 'Store' in ctx['df'].columns else None
+
+    def filter_store_week():
+        store = _store()
+        df = ctx['df'] if store is None else ctx['df'][ctx['df']['Store'] == store]
+        filter_by_week(df, 20)
+
+    def filter_date_range():
+        df, store = ctx['df'], _store()
+        mask = (df['Date'] >= '2024-01-01') & (df['Date'] <= '2024-03-31')
+        if store is not None:
+            mask &= df['Store'] == store
+        df[mask]
+
+    def sqlite_build():
+        ctx['sqlite_path'] = os.path.join(tempfile.mkdtemp(dir=tmpdir), 'history.sqlite')
+        write_sqlite_history(ctx['df'], ctx['sqlite_path'])
+
+    def sqlite_filter_week():
+        filter_by_week_sqlite(ctx['sqlite_path'], 20)
+
+    def sqlite_filter_store_week():
+        filter_by_week_sqlite(ctx['sqlite_path'], 20, store=_store())
+
+    def sqlite_date_range():
+        read_date_range(ctx['sqlite_path'], '2024-01-01', '2024-03-31', store=_store())
+
+    def format_preview():
+        format_data_for_display(ctx['preview'], 20)
+
+    def format_history():
+        format_data_for_display(ctx['df'], 20)
+
+    def shap_context():
+        explainer = build_explainer(ctx['model'])
+        ctx['context'] = ExplanationContext(ctx['model'], explainer)
+
+    def shap_explain_one():
+        ctx['context'].explain(ctx['df'][FEATURE_COLUMNS].tail(1))
+
+    def shap_table():
+        build_shap_table(ctx['context'])
+
+    return [
+        ('load.import_csv', 1, import_history),
+        ('load.read_history', DEFAULT_REPEATS, load_history),
+        ('train.train_model', 1, train_full),
+        ('predict.predict_orders_x10', DEFAULT_REPEATS, predict_one),
+        ('predict.compile_model', 1, compile_table),
+        ('predict.compiled_predict_one_x1000', DEFAULT_REPEATS, predict_one_compiled),
+        ('predict.quantiles_full_history', DEFAULT_REPEATS, quantiles_full_history),
+        ('predict.quantile_table', DEFAULT_REPEATS, quantile_table),
+        ('filter.week_index', DEFAULT_REPEATS, build_week_index),
+        ('filter.filter_by_week', DEFAULT_REPEATS, filter_week),
+        ('filter.store_week', DEFAULT_REPEATS, filter_store_week),
+        ('filter.date_range', DEFAULT_REPEATS, filter_date_range),
+        ('sqlite.build', 1, sqlite_build),
+        ('sqlite.filter_by_week', DEFAULT_REPEATS, sqlite_filter_week),
+        ('sqlite.filter_store_week', DEFAULT_REPEATS, sqlite_filter_store_week),
+        ('sqlite.date_range', DEFAULT_REPEATS, sqlite_date_range),
+        ('format.preview', DEFAULT_REPEATS, format_preview),
+        ('format.full_history', DEFAULT_REPEATS, format_history),
+        ('shap.explanation_context', 1, shap_context),
+        ('shap.explain_one', DEFAULT_REPEATS, shap_explain_one),
+        ('shap.build_shap_table', 1, shap_table),
+    ]
+
+
+def _measure(fn, repeats):
+    """Wall-clock seconds per repeat, then peak traced MB of one extra run."""
+    seconds = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return seconds, peak / 2**20
+
+
+def run_size(rows, only=None):
+    """
+    Run every benchmark on a history of about `rows` rows.
+
+    Args:
+        rows: Target history size
+        only: Optional benchmark name prefixes to run; the others that
+            later benchmarks depend on still run, untimed
+
+    Returns:
+        list of result dicts
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmpdir:
+        ctx = {'tmpdir': tmpdir, 'csv_path': _generate_history(rows, tmpdir)}
+        for name, repeats, fn in _benchmarks(ctx):
+            if only and not any(name.startswith(prefix) for prefix in only):
+                fn()
+                continue
+            seconds, peak_mb = _measure(fn, repeats)
+            results.append({
+                'benchmark': name,
+                'rows': len(ctx['df']) if 'df' in ctx else rows,
+                'size': rows,
+                'seconds': statistics.median(seconds),
+                'min_seconds': min(seconds),
+                'repeats': repeats,
+                'peak_mb': peak_mb,
+            })
+            print(f"{rows:>9} {name:<36} {results[-1]['seconds']:9.4f} s {peak_mb:9.1f} MB", flush=True)
+    return results
+
+
+def run(sizes=None, only=None):
+    """
+    Run the suite for every size.
+
+    Returns:
+        dict with 'meta' (environment) and 'results' (one entry per benchmark and size)
+    """
+    sizes = DEFAULT_SIZES if sizes is None else sizes
+    results = []
+    for rows in sizes:
+        results.extend(run_size(rows, only))
+    return {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'sklearn': sklearn.__version__,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare two suite runs.
+
+    Args:
+        baseline: Suite output dict of the reference run
+        current: Suite output dict of the new run
+        threshold: Relative increase in seconds or peak_mb reported as a
+            regression, when the absolute increase also exceeds NOISE_FLOOR
+
+    Returns:
+        DataFrame with one row per benchmark and size present in both runs:
+        baseline and current values, their ratios and a 'regression' flag
+    """
+    key = ['benchmark', 'size']
+    merged = pd.DataFrame(baseline['results']).merge(
+        pd.DataFrame(current['results']), on=key, suffixes=('_base', '_new')
+    )
+    table = merged[key].copy()
+    table['regression'] = False
+    for metric, floor in NOISE_FLOOR.items():
+        base, new = merged[f'{metric}_base'], merged[f'{metric}_new']
+        table[f'{metric}_base'] = base
+        table[f'{metric}_new'] = new
+        table[f'{metric}_ratio'] = new / base.where(base > 0)
+        table['regression'] |= (new > base * (1 + threshold)) & (new - base > floor)
+    return table[[c for c in table.columns if c != 'regression'] + ['regression']]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the suite and write JSON results")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    run_parser.add_argument('--only', nargs='+', default=None,
+                            help="Benchmark name prefixes to time, e.g. train predict.compiled")
+    run_parser.add_argument('--output', default='benchmark_results.json')
+
+    compare_parser = commands.add_parser('compare', help="Flag regressions between two runs")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        output = run(args.sizes, args.only)
+        with open(args.output, 'w') as f:
+            json.dump(output, f, indent=2)
+        print(f"Wrote {len(output['results'])} results to {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+    table = compare(baseline, current, args.threshold)
+    with pd.option_context('display.width', 200):
+        print(table.to_string(index=False, float_format='{:.3f}'.format))
+    regressions = int(table['regression'].sum())
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark: sequential vs concurrent weather fetches against a local stub server.
+
+The stub server runs in the same process, so on few cores its request
+handling competes with the client for the GIL; speedups against the real API
+are larger.
+
+Run from the repository root:
+    python -m benchmarks.weather_prefetch --locations 50 --weeks 8 --latency 0.02
+"""
+import argparse
+import tempfile
+import time
+from datetime import date, timedelta
+from weather_service import WeatherClient, prefetch_weather
+from weather_stub import StubWeatherServer
+
+
+def _locations(n):
+    """n distinct locations around Vancouver."""
+    return [(round(49.0 + i * 0.01, 4), round(-123.0 - i * 0.01, 4)) for i in range(n)]
+
+
+def _client(server, cache_dir, pool_size):
+    return WeatherClient(base_url=server.base_url + '/v1/forecast', cache_dir=cache_dir,
+                         horizon_days=None, pool_size=pool_size)
+
+
+def run(n_locations=50, n_weeks=8, latency=0.02, concurrency=16):
+    """
+    Time fetching every (location, week) sequentially and with prefetch_weather.
+
+    Returns:
+        dict of wall-clock seconds and request counts
+    """
+    locations = _locations(n_locations)
+    start = date(2024, 1, 3)
+    dates = [start + timedelta(weeks=i) for i in range(n_weeks)]
+    results = {'requests': n_locations * n_weeks}
+
+    with StubWeatherServer(latency=latency) as server, tempfile.TemporaryDirectory() as tmp:
+        client = _client(server, f'{tmp}/sequential', pool_size=1)
+        t0 = time.perf_counter()
+        for latitude, longitude in locations:
+            for day in dates:
+                client.fetch(day, latitude, longitude)
+        results['sequential_s'] = time.perf_counter() - t0
+
+        client = _client(server, f'{tmp}/concurrent', pool_size=concurrency)
+        t0 = time.perf_counter()
+        prefetch_weather(locations, dates, client=client, concurrency=concurrency)
+        results['concurrent_s'] = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        prefetch_weather(locations, dates, client=client, concurrency=concurrency)
+        results['cached_s'] = time.perf_counter() - t0
+        results['server_requests'] = server.request_count
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--locations', type=int, default=50)
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02, help="Stub response delay (s)")
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    results = run(args.locations, args.weeks, args.latency, args.concurrency)
+    print(f"{results['requests']} (location, date) fetches, {args.latency * 1000:.0f} ms stub latency")
+    print(f"  sequential:              {results['sequential_s']:.2f} s")
+    print(f"  concurrent ({args.concurrency:>2} in flight): {results['concurrent_s']:.2f} s "
+          f"({results['sequential_s'] / results['concurrent_s']:.1f}x)")
+    print(f"  concurrent, cached:      {results['cached_s']:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
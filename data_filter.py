@@ -1,60 +1,102 @@
 """Data filtering utilities."""
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import datetime
 
+ONE_WEEK = np.timedelta64(7, 'D')
 
-def filter_by_week(df, week_number=None):
+
+class WeekIndex:
+    """
+    ISO calendar index over a history frame.
+
+    Built once per loaded history: the ISO week of every row plus the rows'
+    positions sorted by date, so week and date lookups are vectorized
+    searches instead of full-frame scans.
+    """
+
+    def __init__(self, df):
+        self.dates = df['Date'].to_numpy()
+        self.iso_week = df['Date'].dt.isocalendar()['week'].to_numpy(dtype=np.int64)
+        self.order = np.argsort(self.dates, kind='stable')
+        self.sorted_dates = self.dates[self.order]
+
+    def __len__(self):
+        return len(self.dates)
+
+    def matches(self, df):
+        """
+        True if the index was built for df's dates, in df's row order.
+
+        Compares the Date column itself rather than the frame's identity, since
+        cached loaders hand out copies of the same history.
+        """
+        dates = df['Date'].to_numpy()
+        return len(dates) == len(self.dates) and np.array_equal(dates, self.dates)
+
+    def rows_on(self, dates):
+        """
+        Positions of the rows falling exactly on each of the given dates.
+
+        Args:
+            dates: datetime64 array of lookup dates
+
+        Returns:
+            tuple: (row positions in df order per date, number of rows per date)
+        """
+        lo = np.searchsorted(self.sorted_dates, dates, side='left')
+        hi = np.searchsorted(self.sorted_dates, dates, side='right')
+        counts = hi - lo
+        total = int(counts.sum())
+        starts = np.repeat(lo, counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return self.order[starts + within], counts
+
+
+def filter_by_week(df, week_number=None, window=1, index=None):
     """
-    Filter dataframe to show the same week from each year, plus/minus one week.
-    
+    Filter dataframe to show the same week from each year, plus/minus window weeks.
+
     Args:
         df: DataFrame with 'Date' column (must be datetime)
         week_number: ISO week number to filter by. If None, uses current week.
-    
+        window: Number of weeks before and after each matching week to include
+        index: WeekIndex for df; built on the fly if None or built for other dates
+
     Returns:
         DataFrame filtered by week number and sorted by date
     """
     if week_number is None:
         week_number = datetime.now().isocalendar()[1]
-    
-    # Find all dates in the dataset that match the target week number
-    target_dates = df[df['Date'].dt.isocalendar().week == week_number]['Date']
-    
-    if target_dates.empty:
+    if index is None or not index.matches(df):
+        index = WeekIndex(df)
+
+    # Find all dates in the dataset that match the target week number,
+    # sorted descending to keep year order
+    target_dates = np.unique(index.dates[index.iso_week == week_number])[::-1]
+
+    if len(target_dates) == 0:
         # Fallback to last 12 entries if no data for the specified week
         return df.tail(12).sort_values('Date', ascending=False)
-        
-    result_rows = []
-    
-    # Sort target dates descending to keep year order
-    target_dates = target_dates.sort_values(ascending=False)
-
-    for date in target_dates:
-        # Define the triplet of dates
-        dates_in_group = [
-            date + timedelta(days=7), # Next
-            date,                     # This
-            date - timedelta(days=7)  # Prev
-        ]
-        
-        # Filter out future dates
-        dates_in_group = [d for d in dates_in_group if d <= datetime.now()]
-        
-        # Find these rows in the original df
-        group_df = df[df['Date'].isin(dates_in_group)].copy()
-        
-        # If we found any rows
-        if not group_df.empty:
-            # Assign the year of the central date (This Week) as the grouping year
-            group_df['GroupYear'] = date.year
-            result_rows.append(group_df)
-
-    if not result_rows:
-         return df.tail(12).sort_values('Date', ascending=False)
-
-    filtered_df = pd.concat(result_rows)
-    
+
+    # Every target date shifted by -window..+window weeks (Next first, Prev last)
+    offsets = np.arange(window, -window - 1, -1) * ONE_WEEK
+    candidates = target_dates[:, None] + offsets[None, :]
+    # Assign the year of the central date (This Week) as the grouping year
+    group_years = np.repeat(pd.DatetimeIndex(target_dates).year.to_numpy(np.int64), len(offsets))
+
+    # Filter out future dates
+    candidates = candidates.ravel()
+    not_future = candidates <= np.datetime64(datetime.now())
+    positions, counts = index.rows_on(candidates[not_future])
+
+    if len(positions) == 0:
+        return df.tail(12).sort_values('Date', ascending=False)
+
+    filtered_df = df.iloc[positions].copy()
+    filtered_df['GroupYear'] = np.repeat(group_years[not_future], counts)
+
     # Sort by GroupYear descending, and then by Date descending within group
     filtered_df = filtered_df.sort_values(['GroupYear', 'Date'], ascending=[False, False])
-    
+
     return filtered_df
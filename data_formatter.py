@@ -1,7 +1,44 @@
 """Data formatting utilities for display."""
+import numpy as np
 import pandas as pd
 from datetime import datetime
 
+# Soft background colors cycled by year to distinguish year groups:
+# light blue, light green, light yellow, light red/orange
+YEAR_COLORS = ['#e6f3ff', '#f0f9e8', '#fff7bc', '#fee0d2']
+# Colored markers matching YEAR_COLORS, for frames too large to style
+YEAR_MARKERS = ['🟦', '🟩', '🟨', '🟧']
+# Rows per page of the history view
+DISPLAY_PAGE_SIZE = 50
+# Frames with more rows than this get the marker column instead of a Styler
+HIGHLIGHT_ROW_LIMIT = 500
+
+
+def timeline_labels(dates, target_week):
+    """
+    Label dates relative to a target ISO week.
+
+    Args:
+        dates: Datetime Series
+        target_week: ISO week number of "This Week"
+
+    Returns:
+        numpy array of 'Previous Week', 'This Week' or 'Next Week'
+    """
+    w = dates.dt.isocalendar()['week'].to_numpy(dtype=np.int64)
+    if target_week == 1:
+        # Handle year boundary cases
+        is_previous = w >= 52
+    elif target_week >= 52:
+        is_previous = w != 1
+    else:
+        is_previous = w < target_week
+    return np.select(
+        [w == target_week, is_previous],
+        ['This Week', 'Previous Week'],
+        default='Next Week',
+    )
+
 
 def format_data_for_display(df, target_week=None):
     """
@@ -24,22 +61,7 @@ def format_data_for_display(df, target_week=None):
     # when a week spans across two years (e.g. Dec 25 labeled as next year)
     display_df['Year'] = display_df['Date'].dt.year
     
-    def get_timeline(row_date):
-        w = row_date.isocalendar().week
-        if w == target_week:
-            return "This Week"
-        
-        # Handle year boundary cases
-        if target_week == 1:
-            if w >= 52: return "Previous Week"
-            return "Next Week"
-        if target_week >= 52:
-            if w == 1: return "Next Week"
-            return "Previous Week"
-            
-        return "Previous Week" if w < target_week else "Next Week"
-
-    display_df['Timeline'] = display_df['Date'].apply(get_timeline)
+    display_df['Timeline'] = timeline_labels(display_df['Date'], target_week)
     
     # Format Date to be shorter (Month Day)
     display_df['Date'] = display_df['Date'].dt.strftime('%b %d')
@@ -72,6 +94,12 @@ def format_data_for_display(df, target_week=None):
     return display_df
 
 
+def _group_years(df):
+    """Year used for coloring: GroupYear keeps triplets visually unified."""
+    column = 'GroupYear' if 'GroupYear' in df.columns else 'Year'
+    return df[column].to_numpy(dtype=np.int64)
+
+
 def apply_year_highlight(df):
     """
     Apply background color highlighting based on Year.
@@ -82,25 +110,71 @@ def apply_year_highlight(df):
     Returns:
         pandas Styler object
     """
-    def get_row_style(row):
-        # Use GroupYear for coloring if available to keep triplets visually unified
-        year = row['GroupYear'] if 'GroupYear' in row else row['Year']
-        # Cycle through soft colors to distinguish years
-        colors = [
-            '#e6f3ff', # Light Blue
-            '#f0f9e8', # Light Green
-            '#fff7bc', # Light Yellow
-            '#fee0d2', # Light Red/Orange
-        ]
-        # Use year to pick a color
-        color = colors[year % len(colors)]
-        # Adding color: black to ensure text is readable against light backgrounds
-        return [f'background-color: {color}; color: black' for _ in row]
-        
-    styler = df.style.apply(get_row_style, axis=1)
+    row_colors = np.asarray(YEAR_COLORS, dtype=object)[_group_years(df) % len(YEAR_COLORS)]
+    # Adding color: black to ensure text is readable against light backgrounds
+    row_styles = 'background-color: ' + row_colors + '; color: black'
+    # One CSS frame built up front instead of a callback per row
+    styles = pd.DataFrame(
+        np.repeat(row_styles[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns
+    )
+    styler = df.style.apply(lambda _: styles, axis=None)
     
     # Hide GroupYear column if present
     if 'GroupYear' in df.columns:
         styler.hide(axis='columns', subset=['GroupYear'])
         
     return styler
+
+
+def add_year_marker(df):
+    """
+    Cheap alternative to apply_year_highlight for large frames.
+
+    Prepends a colored marker column matching the year's highlight color, so
+    the frame can be rendered without pandas Styler serialization.
+
+    Args:
+        df: DataFrame with Year (and optionally GroupYear) columns
+
+    Returns:
+        DataFrame with a leading ' ' marker column and GroupYear dropped
+    """
+    markers = np.asarray(YEAR_MARKERS, dtype=object)[_group_years(df) % len(YEAR_MARKERS)]
+    marked = df.drop(columns='GroupYear', errors='ignore')
+    marked.insert(0, ' ', markers)
+    return marked
+
+
+def page_count(df, page_size=DISPLAY_PAGE_SIZE):
+    """Number of pages needed to show df (at least 1)."""
+    return max(1, -(-len(df) // page_size))
+
+
+def paginate(df, page, page_size=DISPLAY_PAGE_SIZE):
+    """
+    Rows of df on a 1-based page.
+
+    Args:
+        df: DataFrame to page through
+        page: Page number, clipped to the valid range
+        page_size: Rows per page
+
+    Returns:
+        DataFrame slice for the page
+    """
+    page = min(max(int(page), 1), page_count(df, page_size))
+    start = (page - 1) * page_size
+    return df.iloc[start:start + page_size]
+
+
+def highlight_for_display(df, row_limit=HIGHLIGHT_ROW_LIMIT):
+    """
+    Year highlighting that stays cheap for large frames.
+
+    Returns:
+        Styler from apply_year_highlight when df has at most row_limit rows,
+        otherwise the plain frame from add_year_marker
+    """
+    if len(df) <= row_limit:
+        return apply_year_highlight(df)
+    return add_year_marker(df)
@@ -1,17 +1,136 @@
 """Data loading and generation module."""
+import logging
 import os
-import pandas as pd
 import streamlit as st
+from data_filter import WeekIndex
+from history_sqlite import SQLITE_HISTORY_PATH, is_current, sync_sqlite_history
+from history_store import (
+    HISTORY_STORE_PATH, csv_signature, history_exists, history_fingerprint, import_csv,
+    imported_source, read_history
+)
+from telemetry import get_telemetry
+
+logger = logging.getLogger(__name__)
 
 
 @st.cache_data
-def load_data():
-    """Load historical sales data, generating it if it doesn't exist."""
-    if not os.path.exists('sales_history.csv'):
-        st.info("Generating initial data file...")
-        from generate_data import generate_data
-        generate_data()
-    
-    df = pd.read_csv('sales_history.csv')
-    df['Date'] = pd.to_datetime(df['Date'])
-    return df
+def _load_history(path, fingerprint):
+    """
+    Read the history store. The fingerprint is only part of the cache key, so
+    appends or rewrites on disk invalidate the cached copy.
+    """
+    get_telemetry().cache_miss('load_data')
+    return read_history(path)
+
+
+@st.cache_resource
+def _load_week_index(path, fingerprint):
+    """Build the ISO-week index once per version of the history on disk."""
+    return WeekIndex(_load_history(path, fingerprint))
+
+
+@st.cache_resource
+def _load_store_week_index(path, fingerprint, store):
+    """Build one store's ISO-week index once per version of the history on disk."""
+    df = _load_history(path, fingerprint)
+    return WeekIndex(df[df['Store'] == store])
+
+
+@st.cache_resource
+def _sync_sqlite_history(path, fingerprint, db_path):
+    """
+    Bring the SQLite copy up to date once per version of the history on disk.
+
+    The full history is only loaded when the copy was built from another
+    version; a warm SQLite file is reused as is.
+    """
+    if not is_current(fingerprint, db_path):
+        sync_sqlite_history(_load_history(path, fingerprint), fingerprint, db_path)
+    return db_path
+
+
+@st.cache_resource
+def _reimport_csv(csv_path, path, signature):
+    """Re-import csv_path once per version of the file, even with concurrent sessions."""
+    import_csv(csv_path, path)
+
+
+def _ensure_history(path, csv_path):
+    """
+    Seed the history store from csv_path (generating it first if missing).
+
+    When csv_path has changed since it was imported, the store is rebuilt
+    from it, replacing anything appended since.
+    """
+    if not history_exists(path):
+        if not os.path.exists(csv_path):
+            st.info("Generating initial data file...")
+            from generate_data import generate_data
+            generate_data(output_path=csv_path)
+        import_csv(csv_path, path)
+        return
+    if not os.path.exists(csv_path):
+        return
+    signature = csv_signature(csv_path)
+    source = imported_source(path)
+    if source is not None and source != signature:
+        st.info(f"{csv_path} changed, re-importing it...")
+        _reimport_csv(csv_path, path, tuple(sorted(signature.items())))
+    elif source is None and signature['mtime_ns'] > max(mtime for _, _, mtime in history_fingerprint(path)):
+        # Stores imported before the source was recorded: don't guess, but say so
+        logger.warning("%s is newer than the history store %s; delete the store to re-import it",
+                       csv_path, path)
+
+
+def load_data(path=HISTORY_STORE_PATH, csv_path='sales_history.csv'):
+    """
+    Load historical sales data, generating it if it doesn't exist.
+
+    The columnar store at path is built from csv_path the first time; after
+    that the store is the source of truth and new weeks are added with
+    history_store.append_history.
+
+    Args:
+        path: History store directory
+        csv_path: CSV used to seed the store (generated if missing)
+
+    Returns:
+        Typed DataFrame with the full sales history
+    """
+    _ensure_history(path, csv_path)
+    return _load_history(path, history_fingerprint(path))
+
+
+def load_week_index(path=HISTORY_STORE_PATH, csv_path='sales_history.csv'):
+    """
+    ISO-week index for the history returned by load_data.
+
+    Returns:
+        data_filter.WeekIndex, rebuilt only when the history changes on disk
+    """
+    _ensure_history(path, csv_path)
+    return _load_week_index(path, history_fingerprint(path))
+
+
+def load_store_week_index(store, path=HISTORY_STORE_PATH, csv_path='sales_history.csv'):
+    """
+    ISO-week index for one store's rows of the history returned by load_data.
+
+    Returns:
+        data_filter.WeekIndex over df[df['Store'] == store], rebuilt only when
+        the history changes on disk
+    """
+    _ensure_history(path, csv_path)
+    return _load_store_week_index(path, history_fingerprint(path), store)
+
+
+def load_sqlite_history(path=HISTORY_STORE_PATH, db_path=SQLITE_HISTORY_PATH,
+                        csv_path='sales_history.csv'):
+    """
+    SQLite copy of the history returned by load_data, for indexed queries.
+
+    Returns:
+        Path of the SQLite file, rebuilt only when the history changes on disk
+    """
+    _ensure_history(path, csv_path)
+    return _sync_sqlite_history(path, history_fingerprint(path), db_path)
@@ -1,17 +1,189 @@
+"""Synthetic sales history generator."""
+import argparse
 import pandas as pd
 import numpy as np
-import random
 from datetime import datetime, timedelta
-from model_utils import get_season, get_temperature_category
+from model_utils import (
+    SEASONS, WEATHER_CATEGORIES, TEMPERATURE_CATEGORIES, season_codes, temperature_codes
+)
+
+# Rows generated per batch before the batch is flushed to disk
+DEFAULT_CHUNK_ROWS = 250_000
+
+# Mean Vancouver temperature (Celsius) per season, in SEASONS order
+SEASON_TEMP_MEAN = np.array([
+    13.0,  # Spring
+    22.0,  # Summer
+    11.0,  # Autumn
+    4.0,   # Winter: sometimes < 0, sometimes > 10
+])
+TEMP_STD = 4.0
+
+# Weather probabilities per season, in SEASONS x WEATHER_CATEGORIES order.
+# Only winter can be snowy.
+SEASON_WEATHER_WEIGHTS = np.array([
+    [0.4, 0.3, 0.3, 0.0],  # Spring
+    [0.6, 0.2, 0.2, 0.0],  # Summer
+    [0.3, 0.3, 0.4, 0.0],  # Autumn
+    [0.2, 0.3, 0.3, 0.2],  # Winter
+])
+# Cumulative weights normalized so the last reachable option ends at exactly 1.0
+_WEATHER_CUM_WEIGHTS = (
+    SEASON_WEATHER_WEIGHTS.cumsum(axis=1)
+    / SEASON_WEATHER_WEIGHTS.sum(axis=1, keepdims=True)
+)
+
+SUMMER = SEASONS.index('Summer')
+SUNNY = WEATHER_CATEGORIES.index('Sunny')
+RAINY = WEATHER_CATEGORIES.index('Rainy')
+SNOWY = WEATHER_CATEGORIES.index('Snowy')
+WARM_OR_HOT = [TEMPERATURE_CATEGORIES.index('Warm'), TEMPERATURE_CATEGORIES.index('Hot')]
+COLD_OR_VERY_COLD = [TEMPERATURE_CATEGORIES.index('Cold'), TEMPERATURE_CATEGORIES.index('Very cold')]
+
+BOX_COLUMNS = ['Tomato_Boxes', 'Green_Pepper_Boxes', 'Lettuce_Boxes', 'Cucumber_Boxes']
+
+
+def _randint(rng, low, high, n):
+    """Draw n integers from [low, high], inclusive like random.randint."""
+    return rng.integers(low, high + 1, size=n)
+
+
+def _generate_chunk(rng, days, stores):
+    """
+    Generate sales rows for every store on each of the given days.
+
+    Args:
+        rng: numpy Generator used for all random draws
+        days: numpy datetime64[D] array of sales dates
+        stores: Number of stores; None to omit the Store column
 
-def generate_data(start_date=None, end_date=None):
+    Returns:
+        DataFrame with one row per (day, store)
+    """
+    n_stores = stores or 1
+    dates = pd.DatetimeIndex(np.repeat(days, n_stores))
+    n = len(dates)
+
+    month = dates.month.to_numpy()
+    dom = dates.day.to_numpy()
+    weekday = dates.weekday.to_numpy()  # 0=Monday, 6=Sunday
+
+    # Season, temperature and weather
+    season = season_codes(month, dom)
+    temp_c = rng.normal(SEASON_TEMP_MEAN[season], TEMP_STD)
+    u = rng.random(n)
+    weather = (_WEATHER_CUM_WEIGHTS[season] <= u[:, None]).sum(axis=1)
+    temp_category = temperature_codes(temp_c)
+
+    # Consistency checks (e.g. Snowy only if cold enough), applied in order
+    weather[(weather == SNOWY) & (temp_c > 5)] = RAINY
+    weather[(weather == RAINY) & (temp_c < -1)] = SNOWY
+
+    # Occasional long weekend on Fridays or Mondays
+    is_long_weekend = np.isin(weekday, [0, 4]) & (rng.random(n) < 0.05)
+
+    # Holiday (Simple approximation): New Year, Christmas, Canada Day,
+    # and Thanksgiving (Canada is 2nd Mon in Oct)
+    is_holiday = (
+        ((month == 1) & (dom == 1))
+        | ((month == 12) & (dom == 25))
+        | ((month == 7) & (dom == 1))
+        | ((month == 10) & (dom >= 8) & (dom <= 14) & (weekday == 0))
+    )
+
+    is_promotion = rng.random(n) < 0.15
+
+    # Base Orders
+    tomato = _randint(rng, 2, 5, n)
+    green_pepper = _randint(rng, 1, 3, n)
+    lettuce = _randint(rng, 2, 4, n)
+    cucumber = _randint(rng, 1, 4, n)
+
+    # High sales on nice summer days
+    nice_summer = (season == SUMMER) & (weather == SUNNY) & np.isin(temp_category, WARM_OR_HOT)
+    tomato += np.where(nice_summer, _randint(rng, 2, 4, n), 0)
+    green_pepper += np.where(nice_summer, _randint(rng, 1, 3, n), 0)
+    lettuce += np.where(nice_summer, _randint(rng, 2, 5, n), 0)
+    cucumber += np.where(nice_summer, _randint(rng, 2, 4, n), 0)
+
+    tomato += np.where(is_long_weekend, 2, 0)
+    green_pepper += np.where(is_long_weekend, 1, 0)
+    lettuce += np.where(is_long_weekend, 2, 0)
+    cucumber += np.where(is_long_weekend, 1, 0)
+
+    tomato += np.where(is_promotion, _randint(rng, 2, 3, n), 0)
+    green_pepper += np.where(is_promotion, _randint(rng, 1, 2, n), 0)
+    lettuce += np.where(is_promotion, _randint(rng, 2, 4, n), 0)
+    cucumber += np.where(is_promotion, _randint(rng, 1, 3, n), 0)
+
+    # Low sales on bad weather days
+    bad_weather = (weather == RAINY) | (
+        (season != SUMMER) & np.isin(temp_category, COLD_OR_VERY_COLD)
+    )
+    tomato -= np.where(bad_weather, _randint(rng, 1, 2, n), 0)
+    green_pepper -= np.where(bad_weather, 1, 0)
+    lettuce -= np.where(bad_weather, _randint(rng, 1, 2, n), 0)
+    cucumber -= np.where(bad_weather, 1, 0)
+
+    tomato += np.where(is_holiday, _randint(rng, 5, 10, n), 0)
+    green_pepper += np.where(is_holiday, _randint(rng, 3, 6, n), 0)
+    lettuce += np.where(is_holiday, _randint(rng, 5, 10, n), 0)
+    cucumber += np.where(is_holiday, _randint(rng, 4, 8, n), 0)
+
+    chunk = pd.DataFrame({'Date': dates})
+    if stores:
+        chunk['Store'] = np.tile(np.arange(1, stores + 1, dtype=np.int16), len(days))
+    chunk['Season'] = np.asarray(SEASONS, dtype=object)[season]
+    chunk['Weather'] = np.asarray(WEATHER_CATEGORIES, dtype=object)[weather]
+    chunk['Temperature'] = np.asarray(TEMPERATURE_CATEGORIES, dtype=object)[temp_category]
+    chunk['Long_Weekend'] = is_long_weekend
+    chunk['Promotion'] = is_promotion
+    chunk['Holiday'] = is_holiday
+    # Ensure boxes is at least 1 (1 minimum for operation)
+    for column, boxes in zip(BOX_COLUMNS, [tomato, green_pepper, lettuce, cucumber]):
+        chunk[column] = np.maximum(boxes, 1)
+    return chunk
+
+
+def _sales_days(start_date, end_date):
+    """Return every Wednesday between start_date and end_date (inclusive) as datetime64[D]."""
+    first = np.datetime64(start_date.date(), 'D')
+    last = np.datetime64(end_date.date(), 'D')
+    # 1970-01-01 was a Thursday, so (days + 3) % 7 gives 0=Monday ... 6=Sunday
+    weekday = (first.astype(np.int64) + 3) % 7
+    first += (2 - weekday) % 7
+    return np.arange(first, last + 1, 7)
+
+
+def generate_data(start_date=None, end_date=None, seed=None, stores=1, years=4,
+                  output_path='sales_history.csv', chunk_rows=DEFAULT_CHUNK_ROWS):
     """
     Generate historical sales data for Wednesdays.
-    
+
+    Rows are generated in NumPy batches and streamed to disk chunk by chunk,
+    so multi-million-row histories never need to fit in memory at once.
+
     Args:
         start_date: Start date for data generation (datetime). If None, calculated from end_date.
         end_date: End date for data generation (datetime). If None, uses current date.
+        seed: Seed for the random generator. If None, output is not reproducible.
+        stores: Number of stores to generate. A 'Store' column (1..stores) is
+            added when more than one store is requested.
+        years: Years of history before end_date, used when start_date is None.
+        output_path: Destination file; '.parquet' writes Parquet, anything else CSV.
+        chunk_rows: Approximate number of rows generated and written per batch.
+
+    Returns:
+        int: Number of rows written
+
+    Raises:
+        ValueError: If stores or years is less than 1
     """
+    if stores < 1:
+        raise ValueError(f"stores must be at least 1, got {stores}")
+    if years < 1:
+        raise ValueError(f"years must be at least 1, got {years}")
+
     if end_date is None:
         today = datetime.now()
         # Calculate days to subtract to get to the most recent Wednesday (weekday 2)
@@ -19,140 +191,53 @@ def generate_data(start_date=None, end_date=None):
         # If today is Thursday (3), offset is 1.
         offset = (today.weekday() - 2) % 7
         end_date = today - timedelta(days=offset)
-    
+
     if start_date is None:
-        # Generate 4 years of data before the end date
-        start_date = end_date - timedelta(days=365 * 4)
-    
-    delta = end_date - start_date
-
-    data = []
-
-    for i in range(delta.days + 1):
-        day = start_date + timedelta(days=i)
-        weekday = day.weekday() # 0=Monday, 6=Sunday
-        
-        # Only generate data for Wednesdays (weekday = 2)
-        if weekday != 2:
-            continue
-
-        # Determine Season
-        season = get_season(day)
-
-        # Determine Weather
-        weather_options = ['Sunny', 'Cloudy', 'Rainy']
-        if season == 'Winter':
-            weather_options.append('Snowy')
-
-        # Generate Temperature (Celsius) and Weather based on season
-        if season == 'Winter':
-            # Vancouver Winter: ~4C, sometimes < 0, sometimes > 10
-            temp_c = random.gauss(4, 4)
-            weather = random.choices(weather_options, weights=[0.2, 0.3, 0.3, 0.2], k=1)[0]
-        elif season == 'Spring':
-            # Vancouver Spring: ~13C
-            temp_c = random.gauss(13, 4)
-            weather = random.choices(weather_options, weights=[0.4, 0.3, 0.3], k=1)[0]
-        elif season == 'Summer':
-            # Vancouver Summer: ~22C, can reach 30+
-            temp_c = random.gauss(22, 4)
-            weather = random.choices(weather_options, weights=[0.6, 0.2, 0.2], k=1)[0]
-        else: # Autumn
-            # Vancouver Autumn: ~11C
-            temp_c = random.gauss(11, 4)
-            weather = random.choices(weather_options, weights=[0.3, 0.3, 0.4], k=1)[0]
-
-        temp_category = get_temperature_category(temp_c)
-
-        # Consistency checks (e.g. Snowy only if cold enough)
-        if weather == 'Snowy' and temp_c > 5:
-            weather = 'Rainy'
-        if weather == 'Rainy' and temp_c < -1:
-            weather = 'Snowy'
-
-        # Long Weekend
-        is_long_weekend = False
-        if weekday == 4 or weekday == 0: # Friday or Monday
-            if random.random() < 0.05: # Occasional long weekend
-                is_long_weekend = True
-
-        # Holiday (Simple approximation)
-        is_holiday = False
-        month = day.month
-        # New Year
-        if month == 1 and day.day == 1: is_holiday = True
-        # Christmas
-        if month == 12 and day.day == 25: is_holiday = True
-        # Canada Day (July 1st) - using July 4th in original code but Vancouver implies Canada Day
-        if month == 7 and day.day == 1: is_holiday = True
-        # Thanksgiving (Canada is 2nd Mon in Oct) - approximations
-        if month == 10 and 8 <= day.day <= 14 and weekday == 0: is_holiday = True
-
-        # Promotion
-        is_promotion = random.random() < 0.15
-
-        # Base Orders
-        tomato_boxes = random.randint(2, 5)
-        green_pepper_boxes = random.randint(1, 3)
-        lettuce_boxes = random.randint(2, 4)
-        cucumber_boxes = random.randint(1, 4)
-
-        # Modifiers using new categories
-        # High sales on nice summer days
-        if season == 'Summer' and weather == 'Sunny' and temp_category in ['Warm', 'Hot']:
-            tomato_boxes += random.randint(2, 4)
-            green_pepper_boxes += random.randint(1, 3)
-            lettuce_boxes += random.randint(2, 5)
-            cucumber_boxes += random.randint(2, 4)
-
-        if is_long_weekend:
-            tomato_boxes += 2
-            green_pepper_boxes += 1
-            lettuce_boxes += 2
-            cucumber_boxes += 1
-
-        if is_promotion:
-            tomato_boxes += random.randint(2, 3)
-            green_pepper_boxes += random.randint(1, 2)
-            lettuce_boxes += random.randint(2, 4)
-            cucumber_boxes += random.randint(1, 3)
-
-        # Low sales on bad weather days
-        if weather == 'Rainy' or (season != 'Summer' and temp_category in ['Cold', 'Very cold']):
-            tomato_boxes -= random.randint(1, 2)
-            green_pepper_boxes -= 1
-            lettuce_boxes -= random.randint(1, 2)
-            cucumber_boxes -= 1
-
-        if is_holiday:
-            tomato_boxes += random.randint(5, 10)
-            green_pepper_boxes += random.randint(3, 6)
-            lettuce_boxes += random.randint(5, 10)
-            cucumber_boxes += random.randint(4, 8)
-
-        # Ensure boxes is at least 1 (or 0 if that makes sense, but let's say 1 minimum for operation)
-        tomato_boxes = max(1, tomato_boxes)
-        green_pepper_boxes = max(1, green_pepper_boxes)
-        lettuce_boxes = max(1, lettuce_boxes)
-        cucumber_boxes = max(1, cucumber_boxes)
-
-        data.append({
-            'Date': day.strftime('%Y-%m-%d'),
-            'Season': season,
-            'Weather': weather,
-            'Temperature': temp_category,
-            'Long_Weekend': is_long_weekend,
-            'Promotion': is_promotion,
-            'Holiday': is_holiday,
-            'Tomato_Boxes': tomato_boxes,
-            'Green_Pepper_Boxes': green_pepper_boxes,
-            'Lettuce_Boxes': lettuce_boxes,
-            'Cucumber_Boxes': cucumber_boxes
-        })
-
-    df = pd.DataFrame(data)
-    df.to_csv('sales_history.csv', index=False)
-    print("Data generated and saved to sales_history.csv")
+        start_date = end_date - timedelta(days=365 * years)
+
+    rng = np.random.default_rng(seed)
+    days = _sales_days(start_date, end_date)
+    store_count = stores if stores > 1 else None
+    days_per_chunk = max(1, chunk_rows // stores)
+    is_parquet = str(output_path).endswith('.parquet')
+
+    writer = None
+    rows = 0
+    try:
+        for offset in range(0, max(len(days), 1), days_per_chunk):
+            chunk = _generate_chunk(rng, days[offset:offset + days_per_chunk], store_count)
+            if is_parquet:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(output_path, table.schema)
+                writer.write_table(table)
+            else:
+                chunk.to_csv(output_path, mode='w' if offset == 0 else 'a',
+                             header=offset == 0, index=False, date_format='%Y-%m-%d')
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    print(f"Data generated and saved to {output_path} ({rows} rows)")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic sales history.")
+    parser.add_argument('--seed', type=int, default=None, help="Random seed")
+    parser.add_argument('--stores', type=int, default=1, help="Number of stores")
+    parser.add_argument('--years', type=int, default=4, help="Years of history")
+    parser.add_argument('--output', default='sales_history.csv',
+                        help="Output file (.csv or .parquet)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help="Rows generated per batch")
+    args = parser.parse_args()
+    generate_data(seed=args.seed, stores=args.stores, years=args.years,
+                  output_path=args.output, chunk_rows=args.chunk_rows)
+
 
 if __name__ == '__main__':
-    generate_data()
+    main()
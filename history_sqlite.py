@@ -0,0 +1,280 @@
+"""Optional SQLite backend for history queries.
+
+Keeps a copy of the sales history in an SQLite file with indexes on the
+date, the ISO year/week and the store, so the weekly preview and date-range
+lookups run as indexed queries that load only the matching rows instead of
+scanning the full frame. The copy is rebuilt whenever the history store's
+fingerprint changes; the Parquet store stays the source of truth.
+
+Results match the in-memory path (data_filter.filter_by_week on the frame
+from read_history), including the index labels: every row keeps its
+position in the history as row_id.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data_filter import ONE_WEEK, WeekIndex
+from history_store import to_typed
+
+SQLITE_HISTORY_PATH = 'sales_history.sqlite'
+TABLE_NAME = 'sales'
+META_TABLE_NAME = 'meta'
+# Columns added for indexing; they are not returned by queries
+INDEX_COLUMNS = ['row_id', 'iso_year', 'iso_week']
+# Rows converted and inserted per batch when building
+WRITE_CHUNK_ROWS = 100_000
+# Rows returned by the fallback when the requested week has no data
+FALLBACK_ROWS = 12
+# Dates bound per query; older SQLite builds allow only 999 host parameters
+MAX_QUERY_DATES = 900
+
+
+def _connect(db_path, read_only=True):
+    """Connection that is closed when its with-block exits."""
+    if read_only:
+        return closing(sqlite3.connect(f'file:{os.path.abspath(db_path)}?mode=ro', uri=True))
+    return closing(sqlite3.connect(db_path))
+
+
+def _fingerprint_text(fingerprint):
+    return json.dumps(fingerprint, default=str)
+
+
+def stored_fingerprint(db_path=SQLITE_HISTORY_PATH):
+    """Fingerprint of the history the database was built from, or None."""
+    if not os.path.exists(db_path):
+        return None
+    with _connect(db_path) as conn:
+        try:
+            row = conn.execute(f"SELECT value FROM {META_TABLE_NAME} WHERE key = 'fingerprint'").fetchone()
+        except sqlite3.OperationalError:
+            return None
+    return row[0] if row else None
+
+
+def write_sqlite_history(df, db_path=SQLITE_HISTORY_PATH, fingerprint=None):
+    """
+    Replace the database with the history in df.
+
+    The database is written to a temporary file and renamed into place, so
+    readers never see a partial build.
+
+    Args:
+        df: Typed sales history frame (as returned by read_history)
+        db_path: SQLite file
+        fingerprint: history_store.history_fingerprint of the source, stored
+            so sync_sqlite_history can tell when a rebuild is needed
+    """
+    # Unique per writer, so concurrent rebuilds never touch each other's file;
+    # SQLite treats the empty file as a new database
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(db_path)), suffix='.tmp')
+    os.close(fd)
+    try:
+        _write_table(df, tmp_path, fingerprint)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, db_path)
+
+
+def _table_chunk(df, start):
+    """Rows start..start+WRITE_CHUNK_ROWS of df in the sales table layout."""
+    chunk = df.iloc[start:start + WRITE_CHUNK_ROWS]
+    iso = chunk['Date'].dt.isocalendar()
+    table = chunk.assign(
+        Date=chunk['Date'].dt.strftime('%Y-%m-%d'),
+        row_id=np.arange(start, start + len(chunk)),
+        iso_year=iso['year'].to_numpy(dtype=np.int64),
+        iso_week=iso['week'].to_numpy(dtype=np.int64),
+    )
+    table = table.astype({c: str for c in table.columns if isinstance(table[c].dtype, pd.CategoricalDtype)})
+    return table[['row_id', *df.columns, 'iso_year', 'iso_week']]
+
+
+def _write_table(df, db_path, fingerprint):
+    with _connect(db_path, read_only=False) as conn:
+        # Converted chunk by chunk so the text copy of the history is never held in full
+        first = _table_chunk(df, 0)
+        definitions = ', '.join(
+            'row_id INTEGER PRIMARY KEY' if c == 'row_id'
+            else f'"{c}" {"INTEGER" if pd.api.types.is_numeric_dtype(first[c]) else "TEXT"}'
+            for c in first.columns
+        )
+        conn.execute(f'CREATE TABLE {TABLE_NAME} ({definitions})')
+        for start in range(0, len(df), WRITE_CHUNK_ROWS):
+            table = first if start == 0 else _table_chunk(df, start)
+            table.to_sql(TABLE_NAME, conn, if_exists='append', index=False)
+        # Indexes are built after the bulk insert, which is much faster than maintaining them
+        conn.execute(f'CREATE INDEX idx_{TABLE_NAME}_date ON {TABLE_NAME} (Date)')
+        conn.execute(f'CREATE INDEX idx_{TABLE_NAME}_week ON {TABLE_NAME} (iso_week, Date)')
+        conn.execute(f'CREATE INDEX idx_{TABLE_NAME}_year_week ON {TABLE_NAME} (iso_year, iso_week)')
+        if 'Store' in df.columns:
+            conn.execute(f'CREATE INDEX idx_{TABLE_NAME}_store_date ON {TABLE_NAME} (Store, Date)')
+            conn.execute(f'CREATE INDEX idx_{TABLE_NAME}_store_week ON {TABLE_NAME} (Store, iso_week, Date)')
+        conn.execute(f'CREATE TABLE {META_TABLE_NAME} (key TEXT PRIMARY KEY, value TEXT)')
+        conn.executemany(f'INSERT INTO {META_TABLE_NAME} VALUES (?, ?)', [
+            ('fingerprint', _fingerprint_text(fingerprint)),
+            ('date_dtype', str(df['Date'].dtype)),
+        ])
+        conn.commit()
+
+
+def is_current(fingerprint, db_path=SQLITE_HISTORY_PATH):
+    """True if the database was built from the history with this fingerprint."""
+    return stored_fingerprint(db_path) == _fingerprint_text(fingerprint)
+
+
+def sync_sqlite_history(df, fingerprint, db_path=SQLITE_HISTORY_PATH):
+    """
+    Rebuild the database if it was not built from this version of the history.
+
+    Args:
+        df: Typed sales history frame
+        fingerprint: history_store.history_fingerprint of the store df came from
+        db_path: SQLite file
+
+    Returns:
+        True if the database was rebuilt
+    """
+    if is_current(fingerprint, db_path):
+        return False
+    write_sqlite_history(df, db_path, fingerprint)
+    return True
+
+
+def _query(db_path, where='', params=(), order='row_id', limit=None):
+    """Rows of the sales table as a typed frame indexed by row_id."""
+    with _connect(db_path) as conn:
+        date_dtype = conn.execute(
+            f"SELECT value FROM {META_TABLE_NAME} WHERE key = 'date_dtype'"
+        ).fetchone()[0]
+        sql = f'SELECT * FROM {TABLE_NAME}'
+        if where:
+            sql += f' WHERE {where}'
+        sql += f' ORDER BY {order}'
+        if limit is not None:
+            sql += f' LIMIT {int(limit)}'
+        frame = pd.read_sql_query(sql, conn, params=params)
+    frame = frame.set_index('row_id').rename_axis(None)
+    typed = to_typed(frame.drop(columns=[c for c in INDEX_COLUMNS if c in frame.columns]))
+    # Same resolution as the frame the database was built from
+    typed['Date'] = typed['Date'].astype(date_dtype)
+    return typed
+
+
+def _store_clause(store):
+    return ('', ()) if store is None else (' AND Store = ?', (int(store),))
+
+
+def read_date_range(db_path=SQLITE_HISTORY_PATH, start=None, end=None, store=None):
+    """
+    Rows with start <= Date <= end, in history order.
+
+    Args:
+        db_path: SQLite file
+        start: First date (inclusive); None for no lower bound
+        end: Last date (inclusive); None for no upper bound
+        store: Optional Store id
+
+    Returns:
+        Typed DataFrame indexed by the rows' positions in the history
+    """
+    start = '0000-01-01' if start is None else pd.Timestamp(start).strftime('%Y-%m-%d')
+    end = '9999-12-31' if end is None else pd.Timestamp(end).strftime('%Y-%m-%d')
+    store_sql, store_params = _store_clause(store)
+    return _query(db_path, f'Date BETWEEN ? AND ?{store_sql}', (start, end, *store_params))
+
+
+def read_iso_week(db_path=SQLITE_HISTORY_PATH, iso_year=None, iso_week=None, store=None):
+    """
+    Rows of one ISO year/week, in history order.
+
+    Args:
+        db_path: SQLite file
+        iso_year: ISO year
+        iso_week: ISO week number
+        store: Optional Store id
+
+    Returns:
+        Typed DataFrame indexed by the rows' positions in the history
+    """
+    store_sql, store_params = _store_clause(store)
+    return _query(db_path, f'iso_year = ? AND iso_week = ?{store_sql}',
+                  (int(iso_year), int(iso_week), *store_params))
+
+
+def _read_days(db_path, days, store=None):
+    """Rows on any of the given 'YYYY-MM-DD' days, in history order."""
+    store_sql, store_params = _store_clause(store)
+    chunks = []
+    for start in range(0, len(days), MAX_QUERY_DATES):
+        batch = days[start:start + MAX_QUERY_DATES]
+        placeholders = ', '.join('?' * len(batch))
+        chunks.append(_query(db_path, f'Date IN ({placeholders}){store_sql}', (*batch, *store_params)))
+    # Empty frames would lose the typed columns in the concat
+    non_empty = [chunk for chunk in chunks if not chunk.empty]
+    if len(non_empty) <= 1:
+        return non_empty[0] if non_empty else chunks[0]
+    return pd.concat(non_empty).sort_index()
+
+
+def _fallback(db_path, store):
+    """Same as df.tail(FALLBACK_ROWS).sort_values('Date', ascending=False)."""
+    store_sql, store_params = _store_clause(store)
+    rows = _query(db_path, f'1{store_sql}', store_params, order='row_id DESC', limit=FALLBACK_ROWS)
+    return rows.iloc[::-1].sort_values('Date', ascending=False)
+
+
+def filter_by_week_sqlite(db_path=SQLITE_HISTORY_PATH, week_number=None, window=1, store=None):
+    """
+    data_filter.filter_by_week as indexed queries.
+
+    Finds the dates in ISO week week_number with the week index, then loads
+    only the rows on those dates +/- window weeks.
+
+    Args:
+        db_path: SQLite file
+        week_number: ISO week number to filter by. If None, uses current week.
+        window: Number of weeks before and after each matching week to include
+        store: Optional Store id (the in-memory path filters df to the store first)
+
+    Returns:
+        DataFrame filtered by week number and sorted by date, identical to
+        filter_by_week on the in-memory history
+    """
+    if week_number is None:
+        week_number = datetime.now().isocalendar()[1]
+    store_sql, store_params = _store_clause(store)
+    with _connect(db_path) as conn:
+        target_dates = [row[0] for row in conn.execute(
+            f'SELECT DISTINCT Date FROM {TABLE_NAME} WHERE iso_week = ?{store_sql} ORDER BY Date DESC',
+            (int(week_number), *store_params)
+        )]
+    if not target_dates:
+        return _fallback(db_path, store)
+    target_dates = np.array(target_dates, dtype='datetime64[D]').astype('datetime64[us]')
+
+    offsets = np.arange(window, -window - 1, -1) * ONE_WEEK
+    candidates = target_dates[:, None] + offsets[None, :]
+    group_years = np.repeat(pd.DatetimeIndex(target_dates).year.to_numpy(np.int64), len(offsets))
+    candidates = candidates.ravel()
+    not_future = candidates <= np.datetime64(datetime.now())
+    wanted = candidates[not_future]
+
+    days = sorted({str(day) for day in wanted.astype('datetime64[D]')})
+    if not days:
+        return _fallback(db_path, store)
+    rows = _read_days(db_path, days, store)
+    if rows.empty:
+        return _fallback(db_path, store)
+
+    # The same candidate-to-row expansion as the in-memory path, over the fetched rows only
+    positions, counts = WeekIndex(rows).rows_on(wanted.astype(rows['Date'].dtype))
+    filtered_df = rows.iloc[positions].copy()
+    filtered_df['GroupYear'] = np.repeat(group_years[not_future], counts)
+    return filtered_df.sort_values(['GroupYear', 'Date'], ascending=[False, False])
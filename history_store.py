@@ -0,0 +1,237 @@
+"""Columnar, typed storage for the sales history.
+
+The history is kept as a directory of Parquet part files. Appending writes a
+new part instead of rewriting the existing ones, and reads memory-map each
+part. Column types are fixed so every reader sees the same schema.
+
+append_part and read_parts are the schema-agnostic building blocks, also used
+for other local tables such as the weather feature store.
+"""
+import json
+import os
+import uuid
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from model_utils import SEASONS, WEATHER_CATEGORIES, TEMPERATURE_CATEGORIES
+
+HISTORY_STORE_PATH = 'sales_history.parquet'
+# Signature of the CSV the store was imported from; not a part file
+SOURCE_FILE = 'source.json'
+
+CATEGORY_DTYPES = {
+    'Season': pd.CategoricalDtype(SEASONS),
+    'Weather': pd.CategoricalDtype(WEATHER_CATEGORIES),
+    'Temperature': pd.CategoricalDtype(TEMPERATURE_CATEGORIES),
+}
+FLAG_COLUMNS = ['Long_Weekend', 'Promotion', 'Holiday']
+BOX_COLUMNS = ['Tomato_Boxes', 'Green_Pepper_Boxes', 'Lettuce_Boxes', 'Cucumber_Boxes']
+BOX_DTYPE = 'int16'
+STORE_DTYPE = 'int16'
+
+
+def to_typed(df):
+    """
+    Convert a sales history frame to the store's column types.
+
+    Args:
+        df: DataFrame with sales_history.csv columns (and optionally 'Store');
+            columns that are missing are skipped
+
+    Returns:
+        DataFrame with datetime dates, categorical Season/Weather/Temperature,
+        bool flags and small-int box counts
+    """
+    typed = df.copy()
+    dtypes = {'Store': STORE_DTYPE, **CATEGORY_DTYPES}
+    dtypes.update({column: bool for column in FLAG_COLUMNS})
+    dtypes.update({column: BOX_DTYPE for column in BOX_COLUMNS})
+    if 'Date' in typed.columns:
+        typed['Date'] = pd.to_datetime(typed['Date'])
+    return typed.astype({c: t for c, t in dtypes.items() if c in typed.columns})
+
+
+def _part_files(path):
+    """List the store's Parquet part files in append order."""
+    if not os.path.isdir(path):
+        return []
+    return sorted(
+        os.path.join(path, name) for name in os.listdir(path)
+        if name.startswith('part-') and name.endswith('.parquet')
+    )
+
+
+def history_exists(path=HISTORY_STORE_PATH):
+    """Return True if the store contains at least one part file."""
+    return bool(_part_files(path))
+
+
+def stored_columns(path=HISTORY_STORE_PATH):
+    """Column names of the store's parts; empty if the store has no parts."""
+    parts = _part_files(path)
+    return pq.read_schema(parts[0]).names if parts else []
+
+
+def history_fingerprint(path=HISTORY_STORE_PATH):
+    """
+    Cheap fingerprint of the store's contents on disk.
+
+    Built from each part's name, size and modification time, so any append or
+    rewrite produces a new value without reading the data.
+
+    Args:
+        path: Store directory
+
+    Returns:
+        tuple of (name, size, mtime_ns) per part file
+    """
+    fingerprint = []
+    for part in _part_files(path):
+        stat = os.stat(part)
+        fingerprint.append((os.path.basename(part), stat.st_size, stat.st_mtime_ns))
+    return tuple(fingerprint)
+
+
+def _next_part_index(parts):
+    """Sequence number following the last existing part."""
+    return int(os.path.basename(parts[-1])[5:10]) + 1 if parts else 0
+
+
+def _write_part(df, path, index):
+    """
+    Atomically write one part file so readers never see a partial write.
+
+    The name carries a random suffix: concurrent appenders may pick the same
+    index, and both parts must survive.
+    """
+    name = f'part-{index:05d}-{uuid.uuid4().hex}.parquet'
+    final_path = os.path.join(path, name)
+    tmp_path = os.path.join(path, f'.{name}.tmp')
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    pq.write_table(table, tmp_path)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+def write_history(df, path=HISTORY_STORE_PATH):
+    """
+    Replace the store's contents with df.
+
+    Args:
+        df: Sales history DataFrame
+        path: Store directory
+    """
+    os.makedirs(path, exist_ok=True)
+    old_parts = _part_files(path)
+    _write_part(to_typed(df), path, _next_part_index(old_parts))
+    for part in old_parts:
+        os.remove(part)
+
+
+def append_part(df, path):
+    """
+    Append a DataFrame to a part-file directory as-is.
+
+    Args:
+        df: Rows to append
+        path: Store directory (created if missing)
+
+    Returns:
+        Path of the written part file
+    """
+    os.makedirs(path, exist_ok=True)
+    return _write_part(df, path, _next_part_index(_part_files(path)))
+
+
+def read_parts(path, columns=None, filters=None):
+    """
+    Read every part of a part-file directory with memory-mapped Parquet reads.
+
+    Args:
+        path: Store directory
+        columns: Optional list of columns to read
+        filters: Optional pyarrow row filters, e.g. [('Store', '=', 3)];
+            row groups that cannot match are skipped
+
+    Returns:
+        DataFrame with the parts concatenated in append order
+    """
+    tables = [pq.read_table(part, columns=columns, filters=filters, memory_map=True)
+              for part in _part_files(path)]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    return pa.concat_tables(tables, promote_options='permissive').to_pandas()
+
+
+def append_history(df, path=HISTORY_STORE_PATH):
+    """
+    Append rows to the store as a new part file.
+
+    Args:
+        df: New sales history rows
+        path: Store directory
+
+    Returns:
+        Path of the written part file
+    """
+    return append_part(to_typed(df), path)
+
+
+def read_history(path=HISTORY_STORE_PATH, columns=None, store=None):
+    """
+    Read the whole history using memory-mapped Parquet reads.
+
+    Args:
+        path: Store directory
+        columns: Optional list of columns to read
+        store: Only read rows of this Store (multi-store histories)
+
+    Returns:
+        Typed DataFrame with the parts concatenated in append order
+    """
+    filters = None if store is None else [('Store', '=', store)]
+    return to_typed(read_parts(path, columns, filters))
+
+
+def list_stores(path=HISTORY_STORE_PATH):
+    """
+    Stores present in a multi-store history.
+
+    Returns:
+        Sorted list of Store ids; empty if the history has no Store column
+    """
+    if 'Store' not in stored_columns(path):
+        return []
+    return sorted(int(store) for store in read_parts(path, ['Store'])['Store'].unique())
+
+
+def csv_signature(csv_path):
+    """Size and modification time of a CSV file, to tell when it was rewritten."""
+    stat = os.stat(csv_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def imported_source(path=HISTORY_STORE_PATH):
+    """csv_signature of the CSV the store was last imported from, or None if unknown."""
+    try:
+        with open(os.path.join(path, SOURCE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def import_csv(csv_path, path=HISTORY_STORE_PATH):
+    """
+    Build the store from a sales history CSV file.
+
+    The CSV's signature is recorded next to the parts (see imported_source),
+    so callers can re-import when the file changes.
+
+    Args:
+        csv_path: CSV file in the sales_history.csv format
+        path: Store directory
+    """
+    signature = csv_signature(csv_path)
+    write_history(pd.read_csv(csv_path), path)
+    with open(os.path.join(path, SOURCE_FILE), 'w') as f:
+        json.dump(signature, f)
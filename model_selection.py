@@ -0,0 +1,186 @@
+"""Model selection: time-aware cross-validation over a grid of estimators.
+
+Every (candidate, fold) pair is fitted in a process pool. Results report
+accuracy, fit time and single-row predict latency side by side, and the best
+forest can be written back as the trainer's default config.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import ExtraTreesRegressor, HistGradientBoostingRegressor, RandomForestRegressor
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import TimeSeriesSplit
+from sklearn.multioutput import MultiOutputRegressor
+from model_trainer import (
+    ESTIMATORS, FEATURE_COLUMNS, MODEL_CONFIG_PATH, TARGET_COLUMNS, build_pipeline,
+    save_model_config
+)
+
+DEFAULT_SPLITS = 5
+# Single-row predictions timed per fold for the latency column
+LATENCY_REPEATS = 20
+
+
+def _hist_gradient_boosting(**params):
+    # HistGradientBoostingRegressor predicts one target; fit one per ingredient
+    return MultiOutputRegressor(HistGradientBoostingRegressor(**params))
+
+
+CANDIDATE_ESTIMATORS = {
+    'random_forest': RandomForestRegressor,
+    'extra_trees': ExtraTreesRegressor,
+    'hist_gradient_boosting': _hist_gradient_boosting,
+}
+
+# (estimator, params) pairs evaluated by default
+DEFAULT_GRID = (
+    [('random_forest', {'n_estimators': n, 'min_samples_leaf': leaf, 'random_state': 42})
+     for n in [50, 100, 200] for leaf in [1, 5]]
+    + [('extra_trees', {'n_estimators': n, 'min_samples_leaf': leaf, 'random_state': 42})
+       for n in [50, 100, 200] for leaf in [1, 5]]
+    + [('hist_gradient_boosting', {'max_iter': n, 'learning_rate': rate, 'random_state': 42})
+       for n in [100, 200] for rate in [0.05, 0.1]]
+)
+
+# Training data shared with pool workers once, instead of pickled per task
+_worker_data = {}
+
+
+def _init_worker(X, y):
+    _worker_data['X'] = X
+    _worker_data['y'] = y
+
+
+def _evaluate(task):
+    """Fit one candidate on one fold; returns its scores and timings."""
+    candidate, fold, estimator, params, train_idx, test_idx = task
+    X, y = _worker_data['X'], _worker_data['y']
+    model = build_pipeline(CANDIDATE_ESTIMATORS[estimator](**params))
+
+    start = time.perf_counter()
+    model.fit(X.iloc[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    X_test = X.iloc[test_idx]
+    y_pred = model.predict(X_test)
+    row = X_test.iloc[:1]
+    start = time.perf_counter()
+    for _ in range(LATENCY_REPEATS):
+        model.predict(row)
+    predict_ms = (time.perf_counter() - start) / LATENCY_REPEATS * 1000
+
+    return {
+        'candidate': candidate,
+        'fold': fold,
+        'mae': mean_absolute_error(y[test_idx], y_pred),
+        'r2': r2_score(y[test_idx], y_pred),
+        'fit_seconds': fit_seconds,
+        'predict_ms': predict_ms,
+    }
+
+
+def time_series_folds(df, n_splits=DEFAULT_SPLITS):
+    """
+    Expanding-window folds in date order.
+
+    Every fold trains on the past and tests on the period right after it,
+    so scores reflect forecasting unseen weeks rather than interpolation.
+
+    Args:
+        df: Sales history with a 'Date' column
+        n_splits: Number of folds
+
+    Returns:
+        list of (train_positions, test_positions) into df
+    """
+    order = np.argsort(df['Date'].to_numpy(), kind='stable')
+    return [(order[train], order[test]) for train, test in TimeSeriesSplit(n_splits).split(order)]
+
+
+def run_selection(df, grid=None, n_splits=DEFAULT_SPLITS, n_jobs=None):
+    """
+    Cross-validate every candidate in grid.
+
+    Args:
+        df: Sales history DataFrame
+        grid: List of (estimator, params) with estimator a key of
+            CANDIDATE_ESTIMATORS. If None, uses DEFAULT_GRID.
+        n_splits: Number of time-ordered folds
+        n_jobs: Worker processes (default: os.cpu_count()); 1 runs in-process
+
+    Returns:
+        DataFrame with one row per candidate (estimator, params, mean MAE and
+        R², mean fit seconds and single-row predict milliseconds), best first
+    """
+    grid = DEFAULT_GRID if grid is None else grid
+    X = df[FEATURE_COLUMNS].reset_index(drop=True)
+    y = df[TARGET_COLUMNS].to_numpy(dtype=float)
+    tasks = [
+        (candidate, fold, estimator, params, train_idx, test_idx)
+        for candidate, (estimator, params) in enumerate(grid)
+        for fold, (train_idx, test_idx) in enumerate(time_series_folds(df, n_splits))
+    ]
+
+    n_jobs = n_jobs or os.cpu_count() or 1
+    if n_jobs == 1:
+        _init_worker(X, y)
+        scores = [_evaluate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(n_jobs, initializer=_init_worker, initargs=(X, y)) as pool:
+            scores = list(pool.map(_evaluate, tasks))
+
+    summary = pd.DataFrame(scores).groupby('candidate')[['mae', 'r2', 'fit_seconds', 'predict_ms']].mean()
+    summary.insert(0, 'estimator', [grid[c][0] for c in summary.index])
+    summary.insert(1, 'params', [grid[c][1] for c in summary.index])
+    return summary.sort_values(['mae', 'fit_seconds']).reset_index(drop=True)
+
+
+def best_config(results):
+    """
+    Best candidate the trainer can use.
+
+    Args:
+        results: DataFrame from run_selection
+
+    Returns:
+        tuple: (estimator, params) of the lowest-MAE forest (see model_trainer.ESTIMATORS)
+
+    Raises:
+        ValueError: If results contain no supported estimator
+    """
+    supported = results[results['estimator'].isin(list(ESTIMATORS))]
+    if supported.empty:
+        raise ValueError("No candidate in the results is supported by the trainer")
+    best = supported.iloc[0]
+    return best['estimator'], dict(best['params'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cross-validate candidate models on the sales history.")
+    parser.add_argument('--splits', type=int, default=DEFAULT_SPLITS, help="Time-ordered folds")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--output', default=None, help="Also write the results to this CSV file")
+    parser.add_argument('--write-config', action='store_true',
+                        help=f"Save the best forest as the trainer default ({MODEL_CONFIG_PATH})")
+    args = parser.parse_args()
+
+    from data_loader import load_data
+    results = run_selection(load_data(), n_splits=args.splits, n_jobs=args.jobs)
+    table = results.assign(params=results['params'].map(json.dumps))
+    with pd.option_context('display.max_colwidth', None, 'display.width', 200):
+        print(table.to_string(index=False, float_format='{:.3f}'.format))
+    if args.output:
+        table.to_csv(args.output, index=False)
+
+    if args.write_config:
+        estimator, params = best_config(results)
+        save_model_config(estimator, params)
+        print(f"Wrote {estimator} {json.dumps(params)} to {MODEL_CONFIG_PATH}")
+
+
+if __name__ == '__main__':
+    main()
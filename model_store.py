@@ -0,0 +1,328 @@
+"""Persisted, content-addressed model artifacts.
+
+Trained pipelines are saved under a key derived from the training data and
+the hyperparameters, so a new process can load a matching model from disk
+instead of retraining it.
+
+The artifact directory doubles as a cache shared by every process that
+mounts it: artifacts are published atomically, and load_or_build holds a
+per-artifact file lock while building, so replicas that start together
+build each artifact once and the others load (or memory-map) the result.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+import joblib
+import numpy as np
+import pandas as pd
+import sklearn
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not coordinated, publishing is still atomic
+    fcntl = None
+
+# Overridable so containers can keep artifacts outside the source tree
+ARTIFACT_DIR = os.environ.get('ARTIFACT_DIR', 'artifacts')
+MODEL_FILE = 'model.joblib'
+METRICS_FILE = 'metrics.json'
+META_FILE = 'meta.json'
+LATEST_FILE = 'latest.json'
+STORE_INDEX_FILE = 'stores.json'
+LOCK_DIR = '.locks'
+# How long load_or_build waits for another process building the same artifact
+DEFAULT_LOCK_TIMEOUT = 1800
+LOCK_POLL_SECONDS = 0.1
+# Attribute stamped on models so caches downstream can key on the artifact
+VERSION_ATTR = 'artifact_key_'
+
+
+def data_hash(df, columns):
+    """
+    Hash the values of the given columns, independent of their storage dtypes.
+
+    Args:
+        df: DataFrame to hash
+        columns: Columns that determine the trained model
+
+    Returns:
+        Hex digest string
+    """
+    normalized = pd.DataFrame({
+        column: df[column].astype(str) if not pd.api.types.is_numeric_dtype(df[column])
+        else df[column].astype('int64')
+        for column in columns
+    })
+    row_hashes = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()
+
+
+def artifact_key(df, columns, params):
+    """
+    Build the artifact key for a training run.
+
+    Args:
+        df: Training data
+        columns: Feature and target columns used for training
+        params: JSON-serializable dict of hyperparameters
+
+    Returns:
+        Short hex key identifying (data, hyperparameters, scikit-learn version)
+    """
+    payload = json.dumps({
+        'data': data_hash(df, columns),
+        'params': params,
+        'sklearn': sklearn.__version__,
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def artifact_path(key, artifact_dir=ARTIFACT_DIR):
+    """Directory holding the artifact for key."""
+    return os.path.join(artifact_dir, key)
+
+
+def save_artifact(key, model, metrics, meta=None, artifact_dir=ARTIFACT_DIR):
+    """
+    Save a trained model and its metrics under key.
+
+    The artifact is written to a temporary directory and renamed into place,
+    so concurrent readers never see a partial artifact.
+
+    Args:
+        key: Artifact key from artifact_key
+        model: Trained scikit-learn Pipeline
+        metrics: dict of evaluation metrics
+        meta: Optional JSON-serializable dict stored alongside
+        artifact_dir: Root directory for artifacts
+
+    Returns:
+        Path of the artifact directory
+    """
+    os.makedirs(artifact_dir, exist_ok=True)
+    setattr(model, VERSION_ATTR, key)
+    final_path = artifact_path(key, artifact_dir)
+    tmp_path = tempfile.mkdtemp(prefix=f'.{key}-', dir=artifact_dir)
+    try:
+        joblib.dump(model, os.path.join(tmp_path, MODEL_FILE))
+        with open(os.path.join(tmp_path, METRICS_FILE), 'w') as f:
+            json.dump({name: float(value) for name, value in metrics.items()}, f, indent=2)
+        with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+            json.dump(dict(meta or {}, key=key), f, indent=2)
+        try:
+            os.rename(tmp_path, final_path)
+        except OSError:
+            if not os.path.isdir(final_path):
+                raise
+            # Another process published the same artifact first
+            shutil.rmtree(tmp_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return final_path
+
+
+def load_artifact(key, artifact_dir=ARTIFACT_DIR):
+    """
+    Load the model and metrics saved under key.
+
+    Args:
+        key: Artifact key from artifact_key
+        artifact_dir: Root directory for artifacts
+
+    Returns:
+        tuple: (model, metrics) or None if no artifact exists for key
+    """
+    path = artifact_path(key, artifact_dir)
+    if not os.path.isfile(os.path.join(path, MODEL_FILE)):
+        return None
+    model = joblib.load(os.path.join(path, MODEL_FILE))
+    setattr(model, VERSION_ATTR, key)
+    with open(os.path.join(path, METRICS_FILE)) as f:
+        metrics = json.load(f)
+    return model, metrics
+
+
+def load_meta(key, artifact_dir=ARTIFACT_DIR):
+    """Return the metadata saved with key, or None if it doesn't exist."""
+    path = os.path.join(artifact_path(key, artifact_dir), META_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_arrays(key, name, arrays, artifact_dir=ARTIFACT_DIR):
+    """
+    Save named NumPy arrays (e.g. precomputed tables) next to an artifact.
+
+    Each array is stored as its own .npy file so it can be memory-mapped.
+
+    Args:
+        key: Artifact key the arrays belong to
+        name: Name of the array group
+        arrays: dict of array name to numpy array
+        artifact_dir: Root directory for artifacts
+
+    Returns:
+        Path of the array group directory
+    """
+    parent = artifact_path(key, artifact_dir)
+    os.makedirs(parent, exist_ok=True)
+    final_path = os.path.join(parent, name)
+    tmp_path = tempfile.mkdtemp(prefix=f'.{name}-', dir=parent)
+    try:
+        for array_name, array in arrays.items():
+            np.save(os.path.join(tmp_path, f'{array_name}.npy'), np.asarray(array))
+        try:
+            os.rename(tmp_path, final_path)
+        except OSError:
+            if not os.path.isdir(final_path):
+                raise
+            shutil.rmtree(tmp_path)
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+    return final_path
+
+
+def load_arrays(key, name, artifact_dir=ARTIFACT_DIR, mmap_mode=None):
+    """
+    Load an array group saved with save_arrays.
+
+    Args:
+        key: Artifact key the arrays belong to
+        name: Name of the array group
+        artifact_dir: Root directory for artifacts
+        mmap_mode: Passed to numpy.load, e.g. 'r' to memory-map
+
+    Returns:
+        dict of array name to numpy array, or None if the group doesn't exist
+    """
+    path = os.path.join(artifact_path(key, artifact_dir), name)
+    if not os.path.isdir(path):
+        return None
+    return {
+        file_name[:-4]: np.load(os.path.join(path, file_name), mmap_mode=mmap_mode)
+        for file_name in os.listdir(path) if file_name.endswith('.npy')
+    }
+
+
+def model_version(model):
+    """Artifact key a model was saved or loaded under, or None."""
+    return getattr(model, VERSION_ATTR, None)
+
+
+@contextmanager
+def artifact_lock(key, name, artifact_dir=ARTIFACT_DIR, timeout=DEFAULT_LOCK_TIMEOUT):
+    """
+    Exclusive cross-process lock on building (key, name).
+
+    Uses flock on a file under artifact_dir/.locks, so the lock is released
+    when its holder exits, even if it crashes. Separate threads of one
+    process exclude each other too.
+
+    Args:
+        key: Artifact key
+        name: What is being built under the key, e.g. 'model' or an array group
+        artifact_dir: Root directory for artifacts
+        timeout: Seconds to wait for the lock
+
+    Raises:
+        TimeoutError: If the lock is still held after timeout seconds
+    """
+    if fcntl is None:
+        yield
+        return
+    lock_dir = os.path.join(artifact_dir, LOCK_DIR)
+    os.makedirs(lock_dir, exist_ok=True)
+    with open(os.path.join(lock_dir, f'{key}-{name}.lock'), 'w') as f:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Timed out waiting for {name} of artifact {key}") from None
+                time.sleep(LOCK_POLL_SECONDS)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def load_or_build(key, name, load, build, artifact_dir=ARTIFACT_DIR, timeout=DEFAULT_LOCK_TIMEOUT):
+    """
+    Load an artifact, building it at most once across processes (single flight).
+
+    Args:
+        key: Artifact key
+        name: What is being built under the key
+        load: Callable() returning the published artifact, or None if missing
+        build: Callable() that builds and publishes the artifact and returns it
+        artifact_dir: Root directory for artifacts
+        timeout: Seconds to wait for a build running in another process
+
+    Returns:
+        The result of load, or of build when no process had published it yet
+    """
+    result = load()
+    if result is not None:
+        return result
+    with artifact_lock(key, name, artifact_dir, timeout):
+        # Another process may have published it while we waited for the lock
+        result = load()
+        if result is None:
+            result = build()
+    return result
+
+
+def save_latest(key, artifact_dir=ARTIFACT_DIR):
+    """Record key as the most recently trained artifact."""
+    os.makedirs(artifact_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{LATEST_FILE}.', dir=artifact_dir)
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'key': key}, f)
+    os.replace(tmp_path, os.path.join(artifact_dir, LATEST_FILE))
+
+
+def load_latest(artifact_dir=ARTIFACT_DIR):
+    """Return the most recently trained artifact key, or None."""
+    path = os.path.join(artifact_dir, LATEST_FILE)
+    if not os.path.isfile(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['key']
+
+
+def save_store_index(keys, artifact_dir=ARTIFACT_DIR):
+    """
+    Record the artifact key of each store's model.
+
+    Args:
+        keys: dict mapping Store id to artifact key; merged into the
+            existing index
+        artifact_dir: Root directory for artifacts
+    """
+    index = load_store_index(artifact_dir)
+    index.update(keys)
+    os.makedirs(artifact_dir, exist_ok=True)
+    # Unique per writer: StoreModelCache updates the index from several threads
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{STORE_INDEX_FILE}.', dir=artifact_dir)
+    with os.fdopen(fd, 'w') as f:
+        json.dump({str(store): key for store, key in sorted(index.items())}, f, indent=2)
+    os.replace(tmp_path, os.path.join(artifact_dir, STORE_INDEX_FILE))
+
+
+def load_store_index(artifact_dir=ARTIFACT_DIR):
+    """Return a dict mapping Store id to artifact key (empty if none saved)."""
+    path = os.path.join(artifact_dir, STORE_INDEX_FILE)
+    if not os.path.isfile(path):
+        return {}
+    with open(path) as f:
+        return {int(store): key for store, key in json.load(f).items()}
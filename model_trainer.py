@@ -1,31 +1,186 @@
 """Model training module."""
+import argparse
+import json
+import os
+import tempfile
+import numpy as np
 import pandas as pd
 import streamlit as st
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import ExtraTreesRegressor, RandomForestRegressor
 from sklearn.preprocessing import OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error, r2_score
+from model_utils import (
+    coerce_flags, encode_feature_frame, encode_features, feature_space_frame, get_seasons
+)
+from model_store import (
+    ARTIFACT_DIR, artifact_key, data_hash, load_arrays, load_artifact, load_latest, load_meta,
+    load_or_build, save_arrays, save_artifact, save_latest
+)
+from prediction_intervals import DEFAULT_QUANTILES, predict_quantiles
+from telemetry import get_telemetry
+
+FEATURE_COLUMNS = ['Season', 'Weather', 'Temperature', 'Long_Weekend', 'Promotion', 'Holiday']
+TARGET_COLUMNS = ['Tomato_Boxes', 'Green_Pepper_Boxes', 'Lettuce_Boxes', 'Cucumber_Boxes']
+INGREDIENTS = ['Tomato', 'Green Pepper', 'Lettuce', 'Cucumber']
+FLAG_COLUMNS = ['Long_Weekend', 'Promotion', 'Holiday']
+
+# RandomForestRegressor hyperparameters; part of the artifact key
+DEFAULT_MODEL_PARAMS = {'n_estimators': 100, 'random_state': 42}
+# Overrides DEFAULT_MODEL_PARAMS when present; written by model_selection
+MODEL_CONFIG_PATH = 'model_config.json'
+# Forest estimators the trainer can build. Incremental updates, the SHAP
+# explainer and per-tree statistics rely on an ensemble of trees.
+ESTIMATORS = {
+    'random_forest': RandomForestRegressor,
+    'extra_trees': ExtraTreesRegressor,
+}
+DEFAULT_ESTIMATOR = 'random_forest'
+
+# Incremental retraining settings
+INCREMENTAL_TREES = 10          # trees added per update (the oldest are retired)
+INCREMENTAL_CONTEXT_ROWS = 100  # minimum rows of recent history the new trees see
+HOLDOUT_ROWS = 200              # size of the rolling out-of-sample window
+DRIFT_THRESHOLD = 0.5           # relative MAE increase that forces a full retrain
+MIN_DRIFT_ROWS = 20             # most recent out-of-sample rows the drift check looks at
+MAX_RETIRED_FRACTION = 0.5      # share of full-history trees updates may retire before a full retrain
+
+# Array group name of the persisted prediction table
+PREDICTION_TABLE_NAME = 'prediction_table'
+QUANTILE_TABLE_NAME = 'quantile_table'
 
 
 @st.cache_resource
-def train_model(df):
+def train_model(df, artifact_dir=ARTIFACT_DIR, incremental=True, params=None):
     """
-    Train a RandomForest model to predict ingredient box orders.
-    
+    Load the model for df from disk, training and saving it if needed.
+
+    Artifacts are keyed by the training data and hyperparameters, so a new
+    process reuses a model trained on the same history instead of refitting.
+    When the latest artifact was trained on a prefix of df (new weeks were
+    appended), it is updated incrementally with update_model instead. The
+    updated model depends on the base it grew from, so it is saved under its
+    own key (derived from df, params and the base key) and found again
+    through the latest-artifact pointer, never under df's full-fit key.
+    Processes sharing artifact_dir train each artifact once: the others wait
+    for it to be published and load it.
+
     Args:
         df: DataFrame with historical sales data
-    
+        artifact_dir: Root directory for saved model artifacts
+        incremental: Allow incremental updates of the latest artifact
+        params: Hyperparameters, e.g. load_model_params(). They are part of
+            the cache key, so callers that pass them pick up a newly saved
+            config; None reads the config only when this call is not cached.
+
     Returns:
         tuple: (Trained scikit-learn Pipeline model, dict of metrics)
     """
-    X = df[['Season', 'Weather', 'Temperature', 'Long_Weekend', 'Promotion', 'Holiday']]
-    # Predict all ingredient box counts
-    y = df[['Tomato_Boxes', 'Green_Pepper_Boxes', 'Lettuce_Boxes', 'Cucumber_Boxes']]
+    get_telemetry().cache_miss('train_model')
+    params = load_model_params() if params is None else params
+    columns = FEATURE_COLUMNS + TARGET_COLUMNS
+    key = artifact_key(df, columns, params)
+    return load_or_build(
+        key, 'model', lambda: _load_trained(df, key, params, artifact_dir, incremental),
+        lambda: _train_and_save(df, key, params, artifact_dir, incremental), artifact_dir
+    )
+
+
+def _load_trained(df, key, params, artifact_dir, incremental):
+    """The full fit of df, or the latest artifact if it was updated incrementally to df."""
+    artifact = load_artifact(key, artifact_dir)
+    if artifact is not None or not incremental:
+        return artifact
+    latest_key = load_latest(artifact_dir)
+    meta = load_meta(latest_key, artifact_dir) if latest_key else None
+    if (meta and meta.get('mode') == 'incremental' and meta.get('params') == params
+            and meta['rows'] == len(df)
+            and meta['data_hash'] == data_hash(df, FEATURE_COLUMNS + TARGET_COLUMNS)):
+        return load_artifact(latest_key, artifact_dir)
+    return None
+
+
+def _train_and_save(df, key, params, artifact_dir, incremental):
+    """Train (or incrementally update) the model for df and publish it."""
+    columns = FEATURE_COLUMNS + TARGET_COLUMNS
+    result = None
+    latest_key = load_latest(artifact_dir)
+    latest_meta = load_meta(latest_key, artifact_dir) if latest_key else None
+    if incremental and _is_prefix_of(latest_meta, df, params):
+        base_model, _ = load_artifact(latest_key, artifact_dir)
+        result = update_model(base_model, df, latest_meta['rows'], latest_meta['holdout'],
+                              updates=latest_meta.get('updates', 0))
+
+    meta = {'params': params, 'rows': len(df), 'data_hash': data_hash(df, columns)}
+    if result is None:
+        model, metrics, holdout = _fit(df, params)
+        meta.update(mode='full', holdout=holdout, updates=0)
+    else:
+        model, metrics, holdout = result
+        # Incremental and full fits of the same data never share a key
+        key = artifact_key(df, columns, {'params': params, 'mode': 'incremental', 'base': latest_key})
+        meta.update(mode='incremental', base=latest_key, holdout=holdout,
+                    updates=latest_meta.get('updates', 0) + 1)
+
+    save_artifact(key, model, metrics, meta=meta, artifact_dir=artifact_dir)
+    save_latest(key, artifact_dir)
+    return model, metrics
 
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
+def _is_prefix_of(meta, df, params):
+    """True if meta describes a model trained with params on the first rows of df."""
+    if not meta or meta.get('params') != params or 'holdout' not in meta:
+        return False
+    rows = meta['rows']
+    return rows < len(df) and data_hash(df.iloc[:rows], FEATURE_COLUMNS + TARGET_COLUMNS) == meta['data_hash']
+
+
+def load_model_params(path=MODEL_CONFIG_PATH):
+    """
+    Hyperparameters used by train_model.
+
+    Args:
+        path: Model config written by save_model_config
+
+    Returns:
+        dict: The config's params (with an 'estimator' entry for estimators
+        other than DEFAULT_ESTIMATOR), or DEFAULT_MODEL_PARAMS if there is no config
+    """
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_MODEL_PARAMS
+    params = dict(config['params'])
+    if config.get('estimator', DEFAULT_ESTIMATOR) != DEFAULT_ESTIMATOR:
+        params['estimator'] = config['estimator']
+    return params
+
+
+def save_model_config(estimator, params, path=MODEL_CONFIG_PATH):
+    """
+    Make estimator and params the default for train_model.
+
+    Args:
+        estimator: Key of ESTIMATORS
+        params: Estimator hyperparameters (JSON-serializable)
+        path: Config file to write
+
+    Raises:
+        ValueError: If estimator is not one of ESTIMATORS
+    """
+    if estimator not in ESTIMATORS:
+        raise ValueError(f"Unsupported estimator {estimator!r}; expected one of {sorted(ESTIMATORS)}")
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump({'estimator': estimator, 'params': params}, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def build_pipeline(regressor):
+    """Preprocessing (one-hot categorical features, flags passed through) + regressor."""
     # Categorical features must match what is in the CSV and what is produced by inputs
     categorical_features = ['Season', 'Weather', 'Temperature']
 
@@ -36,39 +191,352 @@ def train_model(df):
         remainder='passthrough'
     )
 
-    model = Pipeline(steps=[
+    return Pipeline(steps=[
         ('preprocessor', preprocessor),
-        ('regressor', RandomForestRegressor(n_estimators=100, random_state=42))
+        ('regressor', regressor)
     ])
 
-    model.fit(X_train, y_train)
 
-    y_pred = model.predict(X_test)
+def _pipeline_from_params(params):
+    """Untrained build_pipeline around the estimator named in params (see load_model_params)."""
+    params = dict(params)
+    estimator = ESTIMATORS[params.pop('estimator', DEFAULT_ESTIMATOR)]
+    return build_pipeline(estimator(**params))
 
+
+def _compute_metrics(y_true, y_pred):
+    """Overall and per-ingredient MAE and R² for out-of-sample predictions."""
     metrics = {}
-    target_names = ['Tomato', 'Green Pepper', 'Lettuce', 'Cucumber']
+    target_names = INGREDIENTS
 
     # Overall metrics
-    metrics['overall_mae'] = mean_absolute_error(y_test, y_pred)
-    metrics['overall_r2'] = r2_score(y_test, y_pred)
+    metrics['overall_mae'] = mean_absolute_error(y_true, y_pred)
+    metrics['overall_r2'] = r2_score(y_true, y_pred)
 
     # Per-target metrics
-    mae_per_target = mean_absolute_error(y_test, y_pred, multioutput='raw_values')
-    r2_per_target = r2_score(y_test, y_pred, multioutput='raw_values')
+    mae_per_target = mean_absolute_error(y_true, y_pred, multioutput='raw_values')
+    r2_per_target = r2_score(y_true, y_pred, multioutput='raw_values')
 
     for i, target in enumerate(target_names):
         metrics[f'{target}_mae'] = mae_per_target[i]
         metrics[f'{target}_r2'] = r2_per_target[i]
 
+    return metrics
+
+
+def _holdout_window(y_true, y_pred):
+    """Keep the most recent HOLDOUT_ROWS out-of-sample pairs as JSON-friendly lists."""
+    return {
+        'y_true': np.asarray(y_true, dtype=float)[-HOLDOUT_ROWS:].tolist(),
+        'y_pred': np.asarray(y_pred, dtype=float)[-HOLDOUT_ROWS:].tolist(),
+    }
+
+
+def _fit(df, params):
+    """Full fit on a random 80/20 split; returns (model, metrics, holdout window)."""
+    X = df[FEATURE_COLUMNS]
+    # Predict all ingredient box counts
+    y = df[TARGET_COLUMNS]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    model = _pipeline_from_params(params)
+    model.fit(X_train, y_train)
+
+    y_pred = model.predict(X_test)
+    return model, _compute_metrics(y_test, y_pred), _holdout_window(y_test, y_pred)
+
+
+def fit_model(df, params=None):
+    """
+    Train a RandomForest model to predict ingredient box orders.
+    
+    Args:
+        df: DataFrame with historical sales data
+        params: RandomForestRegressor hyperparameters, optionally with an
+            'estimator' key naming another of ESTIMATORS. If None, uses
+            DEFAULT_MODEL_PARAMS.
+    
+    Returns:
+        tuple: (Trained scikit-learn Pipeline model, dict of metrics)
+    """
+    if params is None:
+        params = DEFAULT_MODEL_PARAMS
+    model, metrics, _ = _fit(df, params)
     return model, metrics
 
 
+def update_model(model, df, trained_rows, holdout, n_new_trees=INCREMENTAL_TREES,
+                 drift_threshold=DRIFT_THRESHOLD, updates=0):
+    """
+    Incrementally update a trained forest with rows appended to its history.
+
+    The current model first predicts the new rows, which are unseen and so
+    extend the rolling out-of-sample holdout. If its error on the most recent
+    MIN_DRIFT_ROWS (or more, if more rows are new) of that window exceeds the
+    holdout's MAE by more than drift_threshold, the update is refused so the
+    caller can retrain from scratch. So is an update that would retire more
+    than MAX_RETIRED_FRACTION of the trees fitted on the full history, since
+    new trees only see recent windows. Otherwise n_new_trees trees are grown on
+    the new rows plus a bounded window of recent history (warm_start), and
+    the same number of the oldest trees are retired to keep the ensemble size
+    fixed. Cost grows with the new data, not with the whole history.
+
+    Args:
+        model: Trained Pipeline; updated in place
+        df: Full history, whose first trained_rows rows the model was trained on
+        trained_rows: Number of leading rows of df already seen
+        holdout: Rolling holdout window ({'y_true': ..., 'y_pred': ...})
+        n_new_trees: Trees to add (and retire) in this update
+        drift_threshold: Allowed relative MAE increase on the new rows
+        updates: Incremental updates applied since the last full fit
+
+    Returns:
+        tuple: (model, metrics, holdout) or None if a full retrain is required
+    """
+    regressor = model.named_steps['regressor']
+    n_trees = len(regressor.estimators_)
+    if (updates + 1) * n_new_trees > n_trees * MAX_RETIRED_FRACTION:
+        return None
+
+    new_rows = df.iloc[trained_rows:]
+    X_new = new_rows[FEATURE_COLUMNS]
+    y_new = new_rows[TARGET_COLUMNS].to_numpy(dtype=float)
+
+    y_new_pred = model.predict(X_new)
+    baseline_mae = mean_absolute_error(holdout['y_true'], holdout['y_pred'])
+    # A few new rows alone are too noisy to judge, so look at the recent end of the window
+    recent_rows = max(MIN_DRIFT_ROWS, len(new_rows))
+    recent_true = np.vstack([holdout['y_true'], y_new])[-recent_rows:]
+    recent_pred = np.vstack([holdout['y_pred'], y_new_pred])[-recent_rows:]
+    if mean_absolute_error(recent_true, recent_pred) > baseline_mae * (1 + drift_threshold):
+        return None
+
+    context_rows = max(INCREMENTAL_CONTEXT_ROWS, 3 * len(new_rows))
+    recent = df.iloc[max(0, trained_rows - context_rows):]
+    X_recent = model.named_steps['preprocessor'].transform(recent[FEATURE_COLUMNS])
+
+    regressor.set_params(warm_start=True, n_estimators=n_trees + n_new_trees)
+    regressor.fit(X_recent, recent[TARGET_COLUMNS])
+    regressor.estimators_ = regressor.estimators_[-n_trees:]
+    regressor.set_params(warm_start=False, n_estimators=n_trees)
+
+    window = _holdout_window(
+        np.vstack([holdout['y_true'], y_new]), np.vstack([holdout['y_pred'], y_new_pred])
+    )
+    metrics = _compute_metrics(window['y_true'], window['y_pred'])
+    return model, metrics, window
+
+
+class CompiledModel:
+    """
+    Trained model evaluated once over the whole categorical input space.
+
+    Predictions for known inputs are array lookups into a dense table indexed
+    by model_utils.encode_features; inputs with a category outside the table
+    fall back to the wrapped model. With a model_version, quantile tables are
+    shared through the artifact directory like the prediction table.
+    """
+
+    def __init__(self, model, table=None, model_version=None, artifact_dir=ARTIFACT_DIR):
+        self.model = model
+        if table is None:
+            table = model.predict(feature_space_frame())
+        self.table = np.asarray(table, dtype=float)
+        self.model_version = model_version
+        self.artifact_dir = artifact_dir
+        self._quantile_tables = {}
+
+    def quantile_table(self, quantiles=DEFAULT_QUANTILES):
+        """Per-tree quantiles over the input space, (len(quantiles), n_inputs, 4); built on first use."""
+        key = tuple(quantiles)
+        if key not in self._quantile_tables:
+            build = lambda: predict_quantiles(self.model, feature_space_frame(), key)
+            if self.model_version is None:
+                table = build()
+            else:
+                name = f"{QUANTILE_TABLE_NAME}-{'-'.join(f'{q:g}' for q in key)}"
+                table = _load_or_build_table(self.model_version, name, 'quantiles', build,
+                                             self.artifact_dir)
+            self._quantile_tables[key] = table
+        return self._quantile_tables[key]
+
+    def predict_one(self, season, weather, temperature, is_long_weekend, is_promotion, is_holiday):
+        """Predict a single scenario; returns an array of 4 box counts."""
+        index = encode_features(season, weather, temperature,
+                                is_long_weekend, is_promotion, is_holiday)
+        if index is None:
+            return predict_orders_batch(self.model, {
+                'Season': [season], 'Weather': [weather], 'Temperature': [temperature],
+                'Long_Weekend': [is_long_weekend], 'Promotion': [is_promotion],
+                'Holiday': [is_holiday]
+            })[0]
+        return self.table[index].copy()
+
+    def predict(self, X):
+        """Predict a feature frame, scikit-learn style; returns (n, 4)."""
+        index = encode_feature_frame(X)
+        predictions = self.table[np.maximum(index, 0)]
+        unknown = index < 0
+        if unknown.any():
+            predictions[unknown] = self.model.predict(X[unknown])
+        return predictions
+
+    def predict_quantiles(self, X, quantiles=DEFAULT_QUANTILES):
+        """Quantiles of the per-tree predictions of a feature frame; returns (len(quantiles), n, 4)."""
+        index = encode_feature_frame(X)
+        result = self.quantile_table(quantiles)[:, np.maximum(index, 0)]
+        unknown = index < 0
+        if unknown.any():
+            result[:, unknown] = predict_quantiles(self.model, X[unknown], quantiles)
+        return result
+
+
+def compile_model(model, model_version=None, artifact_dir=ARTIFACT_DIR):
+    """
+    Build the CompiledModel for a trained model.
+
+    Args:
+        model: Trained scikit-learn Pipeline
+        model_version: Artifact key of the model; the table is persisted under it
+        artifact_dir: Root directory for artifacts
+
+    Returns:
+        CompiledModel
+    """
+    if model_version is None:
+        return CompiledModel(model)
+    table = _load_or_build_table(
+        model_version, PREDICTION_TABLE_NAME, 'predictions',
+        lambda: model.predict(feature_space_frame()), artifact_dir
+    )
+    return CompiledModel(model, table, model_version, artifact_dir)
+
+
+def _load_or_build_table(model_version, name, array_name, build, artifact_dir):
+    """
+    Memory-map a persisted table, or build and save it once across processes.
+
+    Args:
+        model_version: Artifact key the table belongs to
+        name: Array group name
+        array_name: Name of the table within the group
+        build: Callable() returning the table
+        artifact_dir: Root directory for artifacts
+
+    Returns:
+        numpy array (read-only memory map when it was already saved)
+    """
+    def load():
+        arrays = load_arrays(model_version, name, artifact_dir, mmap_mode='r')
+        return None if arrays is None else arrays[array_name]
+
+    def build_and_save():
+        table = np.asarray(build(), dtype=float)
+        save_arrays(model_version, name, {array_name: table}, artifact_dir)
+        return table
+
+    return load_or_build(model_version, name, load, build_and_save, artifact_dir)
+
+
+@st.cache_resource
+def load_compiled_model(_model, model_version=None, artifact_dir=ARTIFACT_DIR):
+    """Cached compile_model; a new model_version compiles a new table."""
+    return compile_model(_model, model_version, artifact_dir)
+
+
+def build_scenarios(scenarios):
+    """
+    Normalize scenarios into the model's feature frame.
+
+    Args:
+        scenarios: DataFrame or mapping of column name to array-like. Must
+            provide 'Weather' and 'Temperature', and either 'Season' or 'Date'
+            (the season is derived from the date). Missing flag columns
+            default to False; flags must be booleans or 0/1.
+
+    Returns:
+        DataFrame with FEATURE_COLUMNS in model order
+
+    Raises:
+        ValueError: If a flag is missing (NaN/None) or not a boolean or 0/1
+    """
+    frame = pd.DataFrame(scenarios)
+    if 'Season' not in frame.columns:
+        if 'Date' not in frame.columns:
+            raise ValueError("Scenarios need either a 'Season' or a 'Date' column")
+        frame['Season'] = np.asarray(get_seasons(frame['Date']), dtype=object)
+    for column in FLAG_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = False
+            continue
+        flags = coerce_flags(frame[column])
+        invalid = np.flatnonzero(flags.isna())
+        if len(invalid):
+            raise ValueError(f"{column} must be a boolean or 0/1 (invalid at rows {invalid[:10].tolist()})")
+        frame[column] = flags.to_numpy(dtype=bool)
+    return frame[FEATURE_COLUMNS].reset_index(drop=True)
+
+
+def predict_orders_batch(model, scenarios):
+    """
+    Predict ingredient box orders for many scenarios in one model call.
+
+    Args:
+        model: Trained model
+        scenarios: DataFrame or mapping of arrays, see build_scenarios
+
+    Returns:
+        Array of shape (n_scenarios, 4) with columns [Tomato, Green Pepper, Lettuce, Cucumber]
+    """
+    X = build_scenarios(scenarios)
+    if X.empty:
+        return np.empty((0, len(TARGET_COLUMNS)))
+    return np.asarray(model.predict(X)).reshape(len(X), len(TARGET_COLUMNS))
+
+
+def predict_quantiles_batch(model, scenarios, quantiles=DEFAULT_QUANTILES):
+    """
+    Prediction intervals for many scenarios from the forest's per-tree predictions.
+
+    Args:
+        model: Trained model, or a CompiledModel for a table lookup
+        scenarios: DataFrame or mapping of arrays, see build_scenarios
+        quantiles: Quantiles in [0, 1], e.g. (0.1, 0.5, 0.9) for P10/P50/P90
+
+    Returns:
+        Array of shape (len(quantiles), n_scenarios, 4)
+    """
+    X = build_scenarios(scenarios)
+    if isinstance(model, CompiledModel):
+        return model.predict_quantiles(X, quantiles)
+    return predict_quantiles(model, X, quantiles)
+
+
+def predict_intervals(model, season, weather, temperature, is_long_weekend, is_promotion, is_holiday,
+                      quantiles=DEFAULT_QUANTILES):
+    """
+    Prediction interval of a single scenario; arguments as for predict_orders.
+
+    Returns:
+        Array of shape (len(quantiles), 4): one row of box counts per quantile
+    """
+    return predict_quantiles_batch(model, {
+        'Season': [season],
+        'Weather': [weather],
+        'Temperature': [temperature],
+        'Long_Weekend': [is_long_weekend],
+        'Promotion': [is_promotion],
+        'Holiday': [is_holiday]
+    }, quantiles)[:, 0]
+
+
 def predict_orders(model, season, weather, temperature, is_long_weekend, is_promotion, is_holiday):
     """
     Predict ingredient box orders using the trained model.
     
     Args:
-        model: Trained model
+        model: Trained model, or a CompiledModel for a table lookup
         season: Season string
         weather: Weather category string
         temperature: Temperature category string
@@ -79,14 +547,32 @@ def predict_orders(model, season, weather, temperature, is_long_weekend, is_prom
     Returns:
         Array of predictions [Tomato, Green Pepper, Lettuce, Cucumber]
     """
-    input_data = pd.DataFrame({
+    if isinstance(model, CompiledModel):
+        return model.predict_one(season, weather, temperature,
+                                 is_long_weekend, is_promotion, is_holiday)
+    return predict_orders_batch(model, {
         'Season': [season],
         'Weather': [weather],
         'Temperature': [temperature],
         'Long_Weekend': [is_long_weekend],
         'Promotion': [is_promotion],
         'Holiday': [is_holiday]
-    })
+    })[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Train the model and save its artifact, e.g. during the Docker image build."
+    )
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR, help="Artifact directory")
+    args = parser.parse_args()
+
+    from data_loader import load_data
+    df = load_data()
+    _, metrics = train_model(df, artifact_dir=args.artifact_dir, params=load_model_params())
+    print(f"Model artifact ready in {args.artifact_dir} "
+          f"(MAE {metrics['overall_mae']:.2f}, R² {metrics['overall_r2']:.2f})")
+
 
-    prediction = model.predict(input_data)[0]
-    return prediction
+if __name__ == '__main__':
+    main()
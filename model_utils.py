@@ -1,5 +1,23 @@
+import numpy as np
+import pandas as pd
+
+SEASONS = ['Spring', 'Summer', 'Autumn', 'Winter']
+WEATHER_CATEGORIES = ['Sunny', 'Cloudy', 'Rainy', 'Snowy']
 TEMPERATURE_CATEGORIES = ['Very cold', 'Cold', 'Normal', 'Warm', 'Hot']
 
+# Every model input is categorical, so the whole input space can be enumerated.
+# Order matters: the last feature varies fastest in the encoded index.
+FEATURE_SPACE = [
+    ('Season', SEASONS),
+    ('Weather', WEATHER_CATEGORIES),
+    ('Temperature', TEMPERATURE_CATEGORIES),
+    ('Long_Weekend', [False, True]),
+    ('Promotion', [False, True]),
+    ('Holiday', [False, True]),
+]
+FEATURE_SPACE_SHAPE = tuple(len(values) for _, values in FEATURE_SPACE)
+FEATURE_SPACE_SIZE = int(np.prod(FEATURE_SPACE_SHAPE))
+
 def get_season(date_obj):
     """
     Determines the season based on the date for Vancouver, Canada.
@@ -42,3 +60,161 @@ def get_temperature_category(temp):
         return 'Warm'
     else:
         return 'Hot'
+
+
+def season_codes(month, day):
+    """
+    Vectorized get_season returning indices into SEASONS.
+
+    Args:
+        month: Integer array of months (1-12)
+        day: Integer array of days of the month
+
+    Returns:
+        int array of SEASONS indices
+    """
+    md = np.asarray(month) * 100 + np.asarray(day)
+    return np.select(
+        [(md >= 320) & (md <= 619), (md >= 620) & (md <= 919), (md >= 920) & (md <= 1219)],
+        [0, 1, 2],
+        default=3,
+    )
+
+
+def get_seasons(dates):
+    """
+    Vectorized get_season.
+
+    Args:
+        dates: Array-like of dates (datetime64, Timestamps, dates or date strings)
+
+    Returns:
+        pandas Categorical with SEASONS categories
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates)))
+    codes = season_codes(dates.month.to_numpy(), dates.day.to_numpy())
+    return pd.Categorical.from_codes(codes, categories=SEASONS)
+
+
+def temperature_codes(temp):
+    """
+    Vectorized get_temperature_category returning indices into TEMPERATURE_CATEGORIES.
+
+    Args:
+        temp: Float array of temperatures (Celsius); NaN for missing
+
+    Returns:
+        int array of TEMPERATURE_CATEGORIES indices; -1 where temp is NaN
+    """
+    temp = np.asarray(temp, dtype=float)
+    return np.select(
+        [np.isnan(temp), temp <= -3, temp < 10, temp < 17, temp < 27],
+        [-1, 0, 1, 2, 3],
+        default=4,
+    )
+
+
+def get_temperature_categories(temps):
+    """
+    Vectorized get_temperature_category.
+
+    Args:
+        temps: Array-like of temperatures (Celsius); None or NaN for missing
+
+    Returns:
+        pandas Categorical with TEMPERATURE_CATEGORIES categories; missing
+        temperatures map to NaN
+    """
+    temps = pd.to_numeric(pd.Series(temps, dtype=object), errors='coerce').to_numpy(dtype=float)
+    return pd.Categorical.from_codes(temperature_codes(temps), categories=TEMPERATURE_CATEGORIES)
+
+
+def feature_space_frame():
+    """
+    Every possible model input, one row per encoded index.
+
+    Returns:
+        DataFrame with FEATURE_SPACE_SIZE rows; row i has encoded index i
+    """
+    codes = np.unravel_index(np.arange(FEATURE_SPACE_SIZE), FEATURE_SPACE_SHAPE)
+    return pd.DataFrame({
+        name: np.asarray(values, dtype=object)[code].astype(type(values[0]))
+        for (name, values), code in zip(FEATURE_SPACE, codes)
+    })
+
+
+def coerce_flag(value):
+    """
+    Strict boolean for a single flag input.
+
+    Only real booleans and the numbers 0 and 1 are flags; truthiness is not
+    used, so None, NaN or the string "false" are not silently read as a value.
+
+    Returns:
+        True, False, or None if value is not a valid flag
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)) and value in (0, 1):
+        return bool(value)
+    return None
+
+
+def coerce_flags(values):
+    """
+    Array version of coerce_flag.
+
+    Args:
+        values: Array-like of flag inputs
+
+    Returns:
+        pandas 'boolean' array; invalid flags are <NA>
+    """
+    series = pd.Series(values)
+    if pd.api.types.is_bool_dtype(series.dtype) and not series.hasnans:
+        return pd.array(series.to_numpy(dtype=bool), dtype='boolean')
+    return pd.array([coerce_flag(value) for value in series.to_numpy(dtype=object)], dtype='boolean')
+
+
+def encode_feature_frame(df):
+    """
+    Map rows of model inputs to their index in the feature space.
+
+    Args:
+        df: DataFrame with the FEATURE_SPACE columns
+
+    Returns:
+        int64 array of indices; -1 for rows with a value outside the known
+        categories or an invalid flag (see coerce_flag)
+    """
+    codes = []
+    for name, values in FEATURE_SPACE:
+        column = df[name]
+        if values == [False, True]:
+            flags = coerce_flags(column)
+            code = np.where(flags.isna(), -1, flags.to_numpy(dtype=bool, na_value=False)).astype(np.int64)
+        else:
+            code = pd.Index(values).get_indexer(column.astype(object)).astype(np.int64)
+        codes.append(code)
+    codes = np.vstack(codes)
+    known = (codes >= 0).all(axis=0)
+    index = np.ravel_multi_index(np.where(known, codes, 0), FEATURE_SPACE_SHAPE)
+    return np.where(known, index, -1)
+
+
+def encode_features(season, weather, temperature, is_long_weekend, is_promotion, is_holiday):
+    """
+    Index of a single model input in the feature space.
+
+    Returns:
+        int index, or None if a value is outside the known categories or a
+        flag is invalid (see coerce_flag)
+    """
+    values = (season, weather, temperature,
+              coerce_flag(is_long_weekend), coerce_flag(is_promotion), coerce_flag(is_holiday))
+    codes = []
+    for value, (_, categories) in zip(values, FEATURE_SPACE):
+        if value not in categories:
+            return None
+        codes.append(categories.index(value))
+    return int(np.ravel_multi_index(codes, FEATURE_SPACE_SHAPE))
@@ -0,0 +1,117 @@
+"""Multi-week order planning built on batch predictions."""
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from model_utils import get_season, get_temperature_category
+from model_trainer import predict_orders_batch, predict_quantiles_batch, INGREDIENTS
+from weather_service import fetch_weather_range
+
+# Orders are placed for Wednesdays, matching the sales history
+ORDER_WEEKDAY = 2
+
+
+def next_wednesdays(n_weeks, start_date=None):
+    """
+    List the next n_weeks order dates.
+
+    Args:
+        n_weeks: Number of Wednesdays to return
+        start_date: First candidate date (datetime or date). If None, uses today.
+
+    Returns:
+        list of dates; start_date itself is included when it is a Wednesday
+    """
+    if start_date is None:
+        start_date = datetime.now()
+    if isinstance(start_date, datetime):
+        start_date = start_date.date()
+    first = start_date + timedelta(days=(ORDER_WEEKDAY - start_date.weekday()) % 7)
+    return [first + timedelta(weeks=i) for i in range(n_weeks)]
+
+
+def seasonal_weather_defaults(df):
+    """
+    Most common weather and temperature category per season in the history.
+
+    Used for dates beyond the forecast horizon.
+
+    Args:
+        df: Sales history DataFrame
+
+    Returns:
+        dict mapping season to (weather, temperature_category)
+    """
+    defaults = {}
+    for season, group in df.groupby('Season', observed=True):
+        defaults[str(season)] = (
+            str(group['Weather'].mode().iloc[0]),
+            str(group['Temperature'].mode().iloc[0]),
+        )
+    return defaults
+
+
+def plan_orders(model, df, n_weeks=4, start_date=None, is_long_weekend=False,
+                is_promotion=False, is_holiday=False, weather_fn=None, quantiles=None):
+    """
+    Predict orders for the next n_weeks Wednesdays in a single model call.
+
+    Season is derived from each date. Weather comes from the forecast where
+    available (one range request for all weeks) and falls back to the
+    season's most common conditions in the history otherwise.
+
+    Args:
+        model: Trained model
+        df: Sales history DataFrame, used for weather fallbacks
+        n_weeks: Number of weeks to plan
+        start_date: First candidate date. If None, uses today.
+        is_long_weekend: Boolean, or one Boolean per week
+        is_promotion: Boolean, or one Boolean per week
+        is_holiday: Boolean, or one Boolean per week
+        weather_fn: Callable(date) -> (weather_category, max_temperature).
+            If None, the whole span is fetched with fetch_weather_range.
+        quantiles: Optional quantiles, e.g. (0.1, 0.9); adds rounded
+            '<Ingredient> P10' style columns from the forest's per-tree predictions
+
+    Returns:
+        DataFrame with one row per week: the scenario, where its weather came
+        from, and raw and rounded box predictions per ingredient
+    """
+    dates = next_wednesdays(n_weeks, start_date)
+    defaults = seasonal_weather_defaults(df)
+    if weather_fn is None:
+        forecast = fetch_weather_range(dates[0], dates[-1]) if dates else {}
+        weather_fn = lambda day: forecast.get(day, (None, None))
+
+    rows = []
+    for date in dates:
+        season = get_season(date)
+        weather, max_temp = weather_fn(date)
+        if weather is None:
+            weather, temperature = defaults.get(season, (None, None))
+            source = 'History'
+        else:
+            temperature = get_temperature_category(max_temp)
+            source = 'Forecast'
+        rows.append({
+            'Date': date,
+            'Season': season,
+            'Weather': weather,
+            'Temperature': temperature,
+            'Weather_Source': source,
+        })
+
+    plan = pd.DataFrame(rows, columns=['Date', 'Season', 'Weather', 'Temperature', 'Weather_Source'])
+    plan['Long_Weekend'] = np.broadcast_to(is_long_weekend, len(plan))
+    plan['Promotion'] = np.broadcast_to(is_promotion, len(plan))
+    plan['Holiday'] = np.broadcast_to(is_holiday, len(plan))
+
+    predictions = predict_orders_batch(model, plan)
+    for i, ingredient in enumerate(INGREDIENTS):
+        plan[f'{ingredient} Raw'] = predictions[:, i]
+        plan[ingredient] = np.round(predictions[:, i]).astype(int)
+    if quantiles is not None:
+        intervals = predict_quantiles_batch(model, plan, quantiles)
+        for q, values in zip(quantiles, intervals):
+            for i, ingredient in enumerate(INGREDIENTS):
+                plan[f'{ingredient} P{round(q * 100)}'] = np.round(values[:, i]).astype(int)
+    return plan
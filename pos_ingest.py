@@ -0,0 +1,292 @@
+"""Streaming ingestion of POS sales exports into the history store.
+
+Exports are read in fixed-size chunks, validated against the history schema
+(column set, dates, the category vocabularies in model_utils, boolean flags
+and non-negative box counts) and deduplicated by (Store, Date) against a
+sorted key index of the rows already stored. Accepted rows are buffered and
+appended as Parquet parts of bounded size, so memory use does not depend on
+the size of the export.
+"""
+import argparse
+import os
+import time
+import numpy as np
+import pandas as pd
+from history_store import (
+    BOX_COLUMNS, FLAG_COLUMNS, HISTORY_STORE_PATH, append_history, read_parts, stored_columns
+)
+from model_utils import SEASONS, WEATHER_CATEGORIES, TEMPERATURE_CATEGORIES, get_seasons
+
+# Rows read from the export per chunk
+DEFAULT_CHUNK_ROWS = 100_000
+# Accepted rows buffered before a part file is written
+DEFAULT_PART_ROWS = 1_000_000
+REQUIRED_COLUMNS = ['Date', 'Weather', 'Temperature', *FLAG_COLUMNS, *BOX_COLUMNS]
+HISTORY_COLUMNS = ['Date', 'Store', 'Season', 'Weather', 'Temperature', *FLAG_COLUMNS, *BOX_COLUMNS]
+CATEGORY_VOCABULARIES = {
+    'Season': SEASONS,
+    'Weather': WEATHER_CATEGORIES,
+    'Temperature': TEMPERATURE_CATEGORIES,
+}
+TRUE_VALUES = ['true', '1', 'yes']
+FALSE_VALUES = ['false', '0', 'no']
+MAX_BOXES = np.iinfo(np.int16).max
+
+
+def sales_keys(dates, stores=None):
+    """
+    Encode (Store, Date) pairs as int64 keys.
+
+    Args:
+        dates: datetime64 array-like
+        stores: Store ids, or None for a single-store history (Store 0)
+
+    Returns:
+        int64 array; equal pairs give equal keys
+    """
+    days = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+    if stores is None:
+        return days
+    return np.asarray(stores, dtype=np.int64) * (1 << 32) + days
+
+
+def _parse_counts(values):
+    """
+    Parse a column of non-negative integers that fit the store's int16.
+
+    Returns:
+        (int16 array with 0 where invalid, boolean mask of invalid entries)
+    """
+    try:
+        # Clean exports take this fast path; to_numeric is much slower on strings
+        numbers = values.astype('int64')
+    except (TypeError, ValueError):
+        numbers = pd.to_numeric(values, errors='coerce')
+    invalid = (numbers.isna() | (numbers % 1 != 0) | (numbers < 0) | (numbers > MAX_BOXES)).to_numpy()
+    return np.where(invalid, 0, numbers.fillna(0)).astype('int16'), invalid
+
+
+class SalesKeyIndex:
+    """
+    Sorted (Store, Date) keys of the rows in the history store.
+
+    Membership tests are binary searches; added keys are merged in with a
+    stable sort, which is linear for two sorted runs.
+
+    Args:
+        keys: Optional int64 keys from sales_keys
+    """
+
+    def __init__(self, keys=None):
+        self.keys = np.unique(np.asarray([] if keys is None else keys, dtype=np.int64))
+
+    @classmethod
+    def from_history(cls, path=HISTORY_STORE_PATH):
+        """Index the rows already stored, reading only the Date (and Store) columns."""
+        columns = stored_columns(path)
+        if not columns:
+            return cls()
+        columns = ['Date', 'Store'] if 'Store' in columns else ['Date']
+        stored = read_parts(path, columns)
+        return cls(sales_keys(stored['Date'], stored['Store'] if 'Store' in columns else None))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def contains(self, keys):
+        """Boolean mask of keys already in the index."""
+        positions = np.searchsorted(self.keys, keys)
+        found = positions < len(self.keys)
+        found[found] = self.keys[positions[found]] == keys[found]
+        return found
+
+    def add(self, keys):
+        """Add keys that are not in the index yet."""
+        self.keys = np.sort(np.concatenate([self.keys, np.unique(keys)]), kind='stable')
+
+
+def validate_chunk(chunk, store=None):
+    """
+    Split a chunk of raw export rows into valid history rows and rejects.
+
+    Args:
+        chunk: DataFrame of strings as read from the export; needs
+            REQUIRED_COLUMNS, optionally 'Season' (derived from the date when
+            missing) and 'Store'
+        store: Store id for every row (overrides a Store column)
+
+    Returns:
+        (valid, rejected): valid rows in HISTORY_COLUMNS order (without Store
+        when there is none), typed like history_store.to_typed; rejected raw
+        rows with an 'Error' column naming the first failed check
+
+    Raises:
+        ValueError: If required columns are missing
+    """
+    missing = [column for column in REQUIRED_COLUMNS if column not in chunk.columns]
+    if missing:
+        raise ValueError(f"Export is missing columns {missing}")
+
+    chunk = chunk.reset_index(drop=True)
+    errors = pd.Series(pd.NA, index=chunk.index, dtype=object)
+
+    def reject(mask, message):
+        errors[mask & errors.isna()] = message
+
+    out = pd.DataFrame(index=chunk.index)
+    out['Date'] = pd.to_datetime(chunk['Date'].str.strip(), format='%Y-%m-%d', errors='coerce')
+    reject(out['Date'].isna().to_numpy(), 'invalid Date')
+
+    if store is not None:
+        out['Store'] = np.int16(store)
+    elif 'Store' in chunk.columns:
+        out['Store'], invalid = _parse_counts(chunk['Store'])
+        reject(invalid, 'invalid Store')
+
+    if 'Season' in chunk.columns:
+        out['Season'] = chunk['Season'].str.strip()
+    else:
+        out['Season'] = np.asarray(get_seasons(out['Date'].fillna(pd.Timestamp(0))), dtype=object)
+    for column in ['Weather', 'Temperature']:
+        out[column] = chunk[column].str.strip()
+    for column, vocabulary in CATEGORY_VOCABULARIES.items():
+        codes = pd.Index(vocabulary).get_indexer(out[column])
+        out[column] = pd.Categorical.from_codes(codes, categories=vocabulary)
+        reject(out[column].isna().to_numpy(), f'unknown {column}')
+
+    for column in FLAG_COLUMNS:
+        flags = chunk[column].str.strip().str.lower()
+        is_true = flags.isin(TRUE_VALUES).to_numpy()
+        reject(~(is_true | flags.isin(FALSE_VALUES).to_numpy()), f'invalid {column}')
+        out[column] = is_true
+
+    for column in BOX_COLUMNS:
+        out[column], invalid = _parse_counts(chunk[column])
+        reject(invalid, f'invalid {column}')
+
+    valid = errors.isna().to_numpy()
+    rejected = chunk[~valid].assign(Error=errors[~valid])
+    return out[valid].reset_index(drop=True), rejected
+
+
+def ingest_pos_export(export_path, path=HISTORY_STORE_PATH, store=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                      part_rows=DEFAULT_PART_ROWS, rejects_path=None, on_progress=None):
+    """
+    Validate, deduplicate and append a POS export to the history store.
+
+    Rows whose (Store, Date) is already stored, or appeared earlier in the
+    export, are skipped. Accepted rows are written in parts of up to
+    part_rows rows; an interrupted run keeps the parts already written and
+    a rerun skips them as duplicates.
+
+    Args:
+        export_path: CSV export (compressed files are read transparently)
+        path: History store directory
+        store: Store id for every row, for per-store exports without a Store column
+        chunk_rows: Rows read per chunk
+        part_rows: Accepted rows per written part
+        rejects_path: Optional CSV that receives rejected rows with an 'Error' column
+        on_progress: Optional callable(report) called after each chunk
+
+    Returns:
+        dict report: rows_read, rows_appended, duplicates, rejected,
+        rejected_by_error, parts_written, seconds, rows_per_second and
+        mb_per_second (of the export file)
+
+    Raises:
+        ValueError: If the export's Store column does not fit the history
+            (multi-store history without store ids, or the reverse)
+    """
+    start = time.perf_counter()
+    index = SalesKeyIndex.from_history(path)
+    columns = stored_columns(path)
+    history_has_store = 'Store' in columns if columns else None
+    report = {'rows_read': 0, 'rows_appended': 0, 'duplicates': 0, 'rejected': 0,
+              'rejected_by_error': {}, 'parts_written': 0}
+    pending = []
+    pending_rows = 0
+
+    def flush():
+        nonlocal pending, pending_rows
+        if pending:
+            append_history(pd.concat(pending, ignore_index=True), path)
+            report['parts_written'] += 1
+            pending, pending_rows = [], 0
+
+    def finish_report():
+        seconds = time.perf_counter() - start
+        report['seconds'] = seconds
+        report['rows_per_second'] = report['rows_read'] / seconds if seconds > 0 else 0.0
+        report['mb_per_second'] = os.path.getsize(export_path) / 2**20 / seconds if seconds > 0 else 0.0
+
+    reader = pd.read_csv(export_path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    with reader:
+        for chunk in reader:
+            report['rows_read'] += len(chunk)
+            valid, rejected = validate_chunk(chunk, store)
+
+            has_store = 'Store' in valid.columns
+            if history_has_store is None:
+                history_has_store = has_store
+            elif has_store != history_has_store:
+                raise ValueError(
+                    "The history is multi-store; pass store ids" if history_has_store
+                    else "The history is single-store but the export has store ids"
+                )
+
+            keys = sales_keys(valid['Date'], valid['Store'] if has_store else None)
+            _, first = np.unique(keys, return_index=True)
+            new = np.zeros(len(keys), dtype=bool)
+            new[first] = True
+            new &= ~index.contains(keys)
+            index.add(keys[new])
+            report['duplicates'] += int((~new).sum())
+
+            if len(rejected):
+                report['rejected'] += len(rejected)
+                for error, count in rejected['Error'].value_counts().items():
+                    report['rejected_by_error'][error] = report['rejected_by_error'].get(error, 0) + int(count)
+                if rejects_path is not None:
+                    rejected.to_csv(rejects_path, mode='a', index=False,
+                                    header=not os.path.exists(rejects_path))
+
+            if new.any():
+                pending.append(valid[new][[c for c in HISTORY_COLUMNS if c in valid.columns]])
+                pending_rows += int(new.sum())
+                report['rows_appended'] += int(new.sum())
+                if pending_rows >= part_rows:
+                    flush()
+            if on_progress is not None:
+                finish_report()
+                on_progress(dict(report))
+    flush()
+    finish_report()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append a POS sales export to the history store.")
+    parser.add_argument('export', help="CSV export with the sales_history.csv columns")
+    parser.add_argument('--history', default=HISTORY_STORE_PATH, help="History store directory")
+    parser.add_argument('--store', type=int, default=None, help="Store id for every row of the export")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--part-rows', type=int, default=DEFAULT_PART_ROWS)
+    parser.add_argument('--rejects', default=None, help="CSV file for rejected rows")
+    args = parser.parse_args()
+
+    def progress(report):
+        print(f"  {report['rows_read']:>12,} rows read, {report['rows_appended']:>12,} appended "
+              f"({report['rows_per_second']:,.0f} rows/s)", flush=True)
+
+    report = ingest_pos_export(args.export, args.history, args.store, args.chunk_rows,
+                               args.part_rows, args.rejects, progress)
+    print(f"Appended {report['rows_appended']:,} of {report['rows_read']:,} rows in "
+          f"{report['parts_written']} part(s): {report['duplicates']:,} duplicates, "
+          f"{report['rejected']:,} rejected in {report['seconds']:.1f} s "
+          f"({report['rows_per_second']:,.0f} rows/s, {report['mb_per_second']:.1f} MB/s)")
+    for error, count in sorted(report['rejected_by_error'].items()):
+        print(f"  {error}: {count:,}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""Prediction intervals from the individual trees of a forest.
+
+The forest's point prediction is the mean of its trees; the spread of the
+per-tree predictions gives empirical quantiles of the order size. All trees
+are flattened into shared node arrays, so every (tree, row) pair descends
+one level per NumPy step instead of calling each tree from Python.
+"""
+import numpy as np
+
+DEFAULT_QUANTILES = (0.1, 0.5, 0.9)
+# Rows evaluated per step by predict_quantiles; bounds the (n_trees, rows, 4) intermediate
+DEFAULT_CHUNK_ROWS = 4096
+
+
+class StackedTrees:
+    """
+    Every tree of a fitted forest in one set of node arrays.
+
+    Node ids are offset per tree; leaves point to themselves, so descending a
+    fixed max_depth levels lands every row on its leaf in every tree.
+
+    Args:
+        regressor: Fitted forest (estimators_ of decision trees)
+    """
+
+    def __init__(self, regressor):
+        estimators = getattr(regressor, 'estimators_', None)
+        if not estimators or not all(hasattr(tree, 'tree_') for tree in estimators):
+            raise ValueError(
+                f"Prediction intervals need a forest of decision trees, not {type(regressor).__name__}"
+            )
+        trees = [tree.tree_ for tree in estimators]
+        sizes = np.array([tree.node_count for tree in trees])
+        self.roots = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        offsets = np.repeat(self.roots, sizes)
+        nodes = np.arange(sizes.sum())
+
+        left = np.concatenate([tree.children_left for tree in trees])
+        right = np.concatenate([tree.children_right for tree in trees])
+        leaf = left < 0
+        self.left = np.where(leaf, nodes, left + offsets)
+        self.right = np.where(leaf, nodes, right + offsets)
+        self.feature = np.where(leaf, 0, np.concatenate([tree.feature for tree in trees]))
+        self.threshold = np.concatenate([tree.threshold for tree in trees])
+        # (nodes, n_outputs): the mean target of the training rows in each node
+        self.value = np.concatenate([tree.value[:, :, 0] for tree in trees])
+        self.max_depth = max(tree.max_depth for tree in trees)
+
+    @property
+    def n_trees(self):
+        return len(self.roots)
+
+    def predict(self, X):
+        """
+        Every tree's prediction for preprocessed rows.
+
+        Args:
+            X: Dense array (n_rows, n_features) as seen by the regressor
+
+        Returns:
+            Array of shape (n_trees, n_rows, n_outputs)
+        """
+        # Trees split on float32 features, like DecisionTreeRegressor.predict
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        flat = X.ravel()
+        row_starts = (np.arange(len(X)) * X.shape[1])[None, :]
+        node = np.repeat(self.roots[:, None], len(X), axis=1)
+        for _ in range(self.max_depth):
+            go_left = flat[row_starts + self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+
+def _split_pipeline(model):
+    """(preprocessor or None, regressor) of a Pipeline or bare regressor."""
+    if hasattr(model, 'named_steps'):
+        return model[:-1], model[-1]
+    return None, model
+
+
+def _preprocess(preprocessor, X):
+    if preprocessor is None:
+        return np.asarray(X)
+    X = preprocessor.transform(X)
+    return X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+
+
+def tree_predictions(model, X):
+    """
+    Per-tree predictions of a forest pipeline.
+
+    Args:
+        model: Trained Pipeline (or bare forest) from model_trainer
+        X: Raw feature frame (FEATURE_COLUMNS)
+
+    Returns:
+        Array of shape (n_trees, len(X), 4); its mean over axis 0 is model.predict(X)
+    """
+    preprocessor, regressor = _split_pipeline(model)
+    return StackedTrees(regressor).predict(_preprocess(preprocessor, X))
+
+
+def predict_quantiles(model, X, quantiles=DEFAULT_QUANTILES, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Quantiles of the per-tree predictions.
+
+    Identical rows are evaluated once (the categorical inputs repeat a lot),
+    in chunks so only (n_trees, chunk_rows, 4) per-tree values exist at a time.
+
+    Args:
+        model: Trained Pipeline (or bare forest) from model_trainer
+        X: Raw feature frame (FEATURE_COLUMNS)
+        quantiles: Quantiles in [0, 1]
+        chunk_rows: Rows per chunk
+
+    Returns:
+        Array of shape (len(quantiles), len(X), 4)
+    """
+    preprocessor, regressor = _split_pipeline(model)
+    stacked = StackedTrees(regressor)
+    quantiles = np.asarray(quantiles, dtype=float)
+    if len(X) == 0:
+        return np.empty((len(quantiles), 0, stacked.value.shape[1]))
+    X = _preprocess(preprocessor, X)
+    unique_rows, inverse = np.unique(X, axis=0, return_inverse=True)
+    result = np.empty((len(quantiles), len(unique_rows), stacked.value.shape[1]))
+    for start in range(0, len(unique_rows), chunk_rows):
+        chunk = stacked.predict(unique_rows[start:start + chunk_rows])
+        result[:, start:start + chunk_rows] = np.quantile(chunk, quantiles, axis=0)
+    return result[:, inverse.ravel()]
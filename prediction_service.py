@@ -0,0 +1,335 @@
+"""Headless HTTP prediction service.
+
+Loads the trained pipeline once and serves order recommendations and SHAP
+explanations as JSON, for the ordering system and POS integrations.
+Requests are handled by a fixed pool of worker threads; concurrent requests
+are coalesced by a micro-batching queue into a single model call.
+
+Endpoints:
+    GET  /health   model version and whether the SHAP table is ready
+    POST /predict  {"scenarios": [{...}, ...]} or a single scenario object
+    POST /explain  same body; per-ingredient SHAP contributions
+
+A scenario has 'Weather', 'Temperature', either 'Season' or 'Date', and
+optionally the 'Long_Weekend', 'Promotion' and 'Holiday' flags.
+"""
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import numpy as np
+import pandas as pd
+from model_store import ARTIFACT_DIR, model_version
+from model_trainer import (
+    FLAG_COLUMNS, INGREDIENTS, build_scenarios, load_compiled_model, load_model_params,
+    predict_orders_batch, train_model
+)
+from model_utils import encode_feature_frame
+from shap_explainer import ExplanationContext, ShapLookup, build_explainer
+
+DEFAULT_HOST = '0.0.0.0'
+DEFAULT_PORT = 8000
+DEFAULT_WORKERS = 16
+# Largest number of scenarios evaluated in one model call
+DEFAULT_MAX_BATCH_SIZE = 256
+# How long the first request of a batch waits for others to join it
+DEFAULT_MAX_WAIT_SECONDS = 0.002
+# Largest accepted request body
+MAX_BODY_BYTES = 1_000_000
+# Scenario fields that must be JSON strings
+CATEGORY_FIELDS = ['Season', 'Weather', 'Temperature', 'Date']
+
+
+class MicroBatcher:
+    """
+    Coalesce concurrent requests into batched calls.
+
+    Callers submit DataFrames of rows; a single worker thread concatenates
+    whatever arrived within max_wait (up to max_batch_size rows), calls fn
+    once on the combined frame and hands each caller its slice of the result.
+
+    Args:
+        fn: Callable(DataFrame) -> array with one entry per row
+        max_batch_size: Maximum rows per call (a larger single request is
+            still evaluated in one call)
+        max_wait: Seconds to wait for more requests after the first one
+    """
+
+    def __init__(self, fn, max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT_SECONDS):
+        self.fn = fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.batch_count = 0
+        self.request_count = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame):
+        """
+        Queue rows for the next batch.
+
+        Returns:
+            concurrent.futures.Future resolving to fn's result for these rows
+        """
+        future = Future()
+        self._queue.put((frame, future))
+        return future
+
+    def __call__(self, frame):
+        """Submit rows and wait for their result."""
+        return self.submit(frame).result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            rows = len(item[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while rows < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                rows += len(item[0])
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch):
+        frames = [frame for frame, _ in batch]
+        futures = [future for _, future in batch]
+        self.batch_count += 1
+        self.request_count += len(batch)
+        try:
+            result = self.fn(pd.concat(frames, ignore_index=True))
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            return
+        bounds = np.cumsum([0] + [len(frame) for frame in frames])
+        for future, start, end in zip(futures, bounds[:-1], bounds[1:]):
+            future.set_result(result[start:end])
+
+    def close(self):
+        """Finish queued work and stop the worker thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+
+class PredictionService:
+    """
+    Model state shared by every request.
+
+    Args:
+        model: Trained scikit-learn Pipeline (stamped with its artifact key)
+        artifact_dir: Where the prediction and SHAP tables are persisted
+        max_batch_size: See MicroBatcher
+        max_wait: See MicroBatcher
+    """
+
+    def __init__(self, model, artifact_dir=ARTIFACT_DIR,
+                 max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait=DEFAULT_MAX_WAIT_SECONDS):
+        self.version = model_version(model)
+        self.compiled_model = load_compiled_model(model, self.version, artifact_dir)
+        # Runs outside Streamlit, so the plain builders are used; the service is built once
+        self.context = ExplanationContext(model, build_explainer(model))
+        self.shap_lookup = ShapLookup(self.context, self.version, artifact_dir)
+        self.predictor = MicroBatcher(
+            lambda X: predict_orders_batch(self.compiled_model, X), max_batch_size, max_wait
+        )
+        self.explainer = MicroBatcher(
+            lambda X: self.shap_lookup.explain(X).values, max_batch_size, max_wait
+        )
+
+    @staticmethod
+    def parse_scenarios(body):
+        """
+        Validate a request body into the model's feature frame.
+
+        Raises:
+            ValueError: If the body is malformed, has fields of the wrong type
+                or uses unknown categories
+        """
+        scenarios = body.get('scenarios', [body]) if isinstance(body, dict) else body
+        if not isinstance(scenarios, list) or not all(isinstance(s, dict) for s in scenarios):
+            raise ValueError("Expected a scenario object or {'scenarios': [...]}")
+        if not scenarios:
+            raise ValueError("No scenarios given")
+        for i, scenario in enumerate(scenarios):
+            for field in CATEGORY_FIELDS:
+                if field in scenario and not isinstance(scenario[field], str):
+                    raise ValueError(f"'{field}' must be a string in scenario {i}")
+            for field in FLAG_COLUMNS:
+                if field in scenario and not isinstance(scenario[field], bool):
+                    raise ValueError(f"'{field}' must be true or false in scenario {i}")
+        try:
+            X = build_scenarios(pd.DataFrame(scenarios))
+            unknown = np.flatnonzero(encode_feature_frame(X) < 0)
+        except KeyError as e:
+            raise ValueError(f"Missing field {e}") from None
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Invalid scenarios: {e}") from None
+        if len(unknown):
+            raise ValueError(f"Unknown category values in scenarios {unknown.tolist()}")
+        return X
+
+    def predict(self, body):
+        """Rounded and raw box recommendations for each scenario."""
+        predictions = self.predictor(self.parse_scenarios(body))
+        return {
+            'model_version': self.version,
+            'predictions': [
+                {**{ingredient: int(round(row[i])) for i, ingredient in enumerate(INGREDIENTS)},
+                 **{f'{ingredient} Raw': float(row[i]) for i, ingredient in enumerate(INGREDIENTS)}}
+                for row in predictions
+            ],
+        }
+
+    def explain(self, body):
+        """SHAP contributions of each encoded feature, per scenario and ingredient."""
+        values = self.explainer(self.parse_scenarios(body))
+        names = self.context.feature_names
+        return {
+            'model_version': self.version,
+            'base_values': dict(zip(INGREDIENTS, self.context.expected_value.tolist())),
+            'explanations': [
+                {ingredient: dict(zip(names, row[:, i].tolist()))
+                 for i, ingredient in enumerate(INGREDIENTS)}
+                for row in values
+            ],
+        }
+
+    def health(self):
+        return {
+            'status': 'ok',
+            'model_version': self.version,
+            'shap_table_ready': self.shap_lookup.table is not None,
+        }
+
+    def close(self):
+        self.predictor.close()
+        self.explainer.close()
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles each connection on a fixed-size thread pool."""
+
+    def __init__(self, server_address, handler_class, workers=DEFAULT_WORKERS):
+        super().__init__(server_address, handler_class)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='prediction-http')
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+
+def make_handler(service):
+    """Request handler class bound to a PredictionService."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == '/health':
+                self._send(200, service.health())
+            else:
+                self._send(404, {'error': 'not found'})
+
+        def do_POST(self):
+            routes = {'/predict': service.predict, '/explain': service.explain}
+            if self.path not in routes:
+                self._send(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length') or 0)
+            except ValueError:
+                length = -1
+            if length < 0:
+                self._send(400, {'error': 'invalid Content-Length'})
+                return
+            if length > MAX_BODY_BYTES:
+                self._send(413, {'error': 'request body too large'})
+                return
+            try:
+                body = json.loads(self.rfile.read(length) or b'null')
+                result = routes[self.path](body)
+            except ValueError as e:
+                self._send(400, {'error': str(e)})
+                return
+            except Exception as e:
+                # Always answer, so a bug never leaves the client waiting
+                self._send(500, {'error': f'{type(e).__name__}: {e}'})
+                return
+            self._send(200, result)
+
+        def _send(self, status, body):
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT, workers=DEFAULT_WORKERS):
+    """PooledHTTPServer serving service; call serve_forever() to run it."""
+    return PooledHTTPServer((host, port), make_handler(service), workers)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve order predictions over HTTP.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Request handler threads")
+    parser.add_argument('--max-batch-size', type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=DEFAULT_MAX_WAIT_SECONDS * 1000,
+                        help="Time a request waits for others to share its batch")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR, help="Artifact directory")
+    args = parser.parse_args()
+
+    from data_loader import load_data
+    df = load_data()
+    model, _ = train_model(df, artifact_dir=args.artifact_dir, params=load_model_params())
+    service = PredictionService(model, args.artifact_dir,
+                                args.max_batch_size, args.max_wait_ms / 1000)
+    server = create_server(service, args.host, args.port, args.workers)
+    print(f"Serving model {service.version} on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == '__main__':
+    main()
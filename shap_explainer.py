@@ -1,139 +1,315 @@
-"""SHAP explainer module for model interpretability."""
-import shap
+"""SHAP explainer module for model interpretability.
+
+shap and matplotlib are slow to import and only needed once a prediction is
+explained, so they are imported on first use rather than with this module.
+"""
+import io
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
+from model_store import ARTIFACT_DIR, load_arrays, load_or_build, save_arrays
+from model_utils import encode_feature_frame, feature_space_frame
+from telemetry import get_telemetry
+
+CATEGORICAL_FEATURES = ['Season', 'Weather', 'Temperature']
+PASSTHROUGH_FEATURES = ['Long_Weekend', 'Promotion', 'Holiday']
+
+# Array group name of the persisted SHAP lookup table
+SHAP_TABLE_NAME = 'shap_table'
+
+# Rendered waterfall images kept by render_waterfall (least recently used are dropped)
+WATERFALL_CACHE_ENTRIES = 256
+WATERFALL_DPI = 100
+# Bars shown by waterfall_frame
+NATIVE_CHART_FEATURES = 10
+
+# pyplot keeps global state (the current figure), so figures are drawn one at a time
+_plot_lock = threading.Lock()
+
+
+def build_explainer(model):
+    """Uncached SHAP TreeExplainer for the pipeline's forest."""
+    get_telemetry().cache_miss('create_explainer')
+    import shap
+
+    # Extract the regressor from the pipeline
+    regressor = model.named_steps['regressor']
+
+    # Create TreeExplainer
+    return shap.TreeExplainer(regressor)
+
+
+def _to_dense(X):
+    """Preprocessor output as a dense array."""
+    return X.toarray() if hasattr(X, 'toarray') else np.asarray(X)
+
+
+class ExplanationContext:
+    """
+    Per-model state shared by every explanation.
+
+    Holds the preprocessor, the one-hot feature names and the explainer's
+    expected values (one per ingredient), so none of them are recomputed per
+    prediction or per ingredient tab.
+    """
+
+    def __init__(self, model, explainer):
+        self.preprocessor = model.named_steps['preprocessor']
+        self.explainer = explainer
+        # One-hot encoded feature names followed by the passthrough flags
+        self.feature_names = self.preprocessor.named_transformers_['cat'].get_feature_names_out(
+            input_features=CATEGORICAL_FEATURES
+        ).tolist() + PASSTHROUGH_FEATURES
+        self.expected_value = np.atleast_1d(explainer.expected_value)
+
+    def explain(self, input_data):
+        """
+        Compute SHAP values for all ingredients in one explainer pass.
+
+        Args:
+            input_data: DataFrame of raw input features
+
+        Returns:
+            shap.Explanation with values of shape (n_samples, n_features, n_ingredients)
+        """
+        import shap
+
+        X_preprocessed = _to_dense(self.preprocessor.transform(input_data))
+        shap_values = np.asarray(self.explainer.shap_values(X_preprocessed))
+        return shap.Explanation(
+            values=shap_values,
+            base_values=np.tile(self.expected_value, (len(X_preprocessed), 1)),
+            data=X_preprocessed,
+            feature_names=self.feature_names
+        )
+
+
+def build_shap_table(context):
+    """
+    Compute SHAP values for every possible input in one batched explainer pass.
+
+    Args:
+        context: ExplanationContext for the model
+
+    Returns:
+        dict with 'values' (FEATURE_SPACE_SIZE, n_features, n_ingredients),
+        'data' (FEATURE_SPACE_SIZE, n_features) and 'expected_value' arrays,
+        indexed by model_utils.encode_feature_frame
+    """
+    explanation = context.explain(feature_space_frame())
+    return {
+        'values': explanation.values.astype(np.float32),
+        'data': explanation.data.astype(np.float32),
+        'expected_value': context.expected_value,
+    }
+
+
+class ShapLookup:
+    """
+    Explanations served from a precomputed SHAP table.
+
+    The table is loaded from the model's artifact directory, or built in a
+    background thread and saved there. Until it is ready, and for inputs
+    outside the known categories, explanations fall back to the explainer.
+    """
+
+    def __init__(self, context, model_version=None, artifact_dir=ARTIFACT_DIR):
+        self.context = context
+        self.table = None
+        self.error = None
+        self._thread = threading.Thread(
+            target=self._load_or_build, args=(model_version, artifact_dir), daemon=True
+        )
+        self._thread.start()
+
+    def _load_or_build(self, model_version, artifact_dir):
+        try:
+            if model_version is None:
+                self.table = build_shap_table(self.context)
+                return
+
+            def build_and_save():
+                table = build_shap_table(self.context)
+                save_arrays(model_version, SHAP_TABLE_NAME, table, artifact_dir)
+                return table
+
+            # Processes sharing artifact_dir build the table once and memory-map it
+            self.table = load_or_build(
+                model_version, SHAP_TABLE_NAME,
+                lambda: load_arrays(model_version, SHAP_TABLE_NAME, artifact_dir, mmap_mode='r'),
+                build_and_save, artifact_dir
+            )
+        except Exception as e:
+            self.error = e
+
+    def wait(self, timeout=None):
+        """Block until the table is loaded or built; returns True if it is ready."""
+        self._thread.join(timeout)
+        return self.table is not None
+
+    def explain(self, input_data):
+        """
+        Explain predictions for input_data, by table lookup when possible.
+
+        Args:
+            input_data: DataFrame of raw input features
+
+        Returns:
+            shap.Explanation with values of shape (n_samples, n_features, n_ingredients)
+        """
+        table = self.table
+        if table is not None:
+            index = encode_feature_frame(input_data)
+            if (index >= 0).all():
+                import shap
+
+                return shap.Explanation(
+                    values=table['values'][index],
+                    base_values=np.tile(table['expected_value'], (len(index), 1)),
+                    data=table['data'][index],
+                    feature_names=self.context.feature_names
+                )
+        return self.context.explain(input_data)
+
+
+def _build_shap_lookup(model, model_version, artifact_dir):
+    # Runs outside the script thread; start_shap_lookup itself is the cache
+    context = ExplanationContext(model, build_explainer(model))
+    return ShapLookup(context, model_version, artifact_dir)
 
 
 @st.cache_resource
-def create_explainer(_model, _X_train):
+def start_shap_lookup(_model, model_version=None, artifact_dir=ARTIFACT_DIR):
     """
-    Create a SHAP TreeExplainer for the trained Random Forest model.
-    
+    Build the explainer, explanation context and SHAP lookup in the background.
+
+    Lets the page render before shap is even imported; callers that need
+    explanations wait on the returned future.
+
     Args:
         _model: Trained scikit-learn Pipeline model
-        _X_train: Training data (preprocessed features)
-    
+        model_version: Artifact key of the model; a new version starts a new build
+        artifact_dir: Root directory for artifacts
+
     Returns:
-        SHAP TreeExplainer object
+        concurrent.futures.Future resolving to a ShapLookup
     """
-    # Extract the regressor from the pipeline
-    regressor = _model.named_steps['regressor']
-    
-    # Create TreeExplainer
-    explainer = shap.TreeExplainer(regressor)
-    return explainer
+    executor = ThreadPoolExecutor(1, thread_name_prefix='shap-build')
+    future = executor.submit(_build_shap_lookup, _model, model_version, artifact_dir)
+    executor.shutdown(wait=False)
+    return future
 
 
-def explain_prediction(model, explainer, input_data, ingredient_index):
+def ingredient_explanation(explanation, ingredient_index, row=0):
     """
-    Generate SHAP explanation for a single prediction.
-    
+    Slice one sample and one ingredient out of a multi-output explanation.
+
     Args:
-        model: Trained scikit-learn Pipeline model
-        explainer: SHAP TreeExplainer object
-        input_data: DataFrame with single row of input features
+        explanation: shap.Explanation from ExplanationContext.explain
         ingredient_index: Index of ingredient (0=Tomato, 1=Green Pepper, 2=Lettuce, 3=Cucumber)
-    
+        row: Sample index within the explanation
+
     Returns:
-        SHAP values for the prediction
+        shap.Explanation for a single prediction
     """
-    # Preprocess input data using the pipeline's preprocessor
-    preprocessor = model.named_steps['preprocessor']
-    X_preprocessed = preprocessor.transform(input_data)
-    
-    # Get SHAP values for this input
-    shap_values = explainer.shap_values(X_preprocessed)
-    
-    # Return SHAP values for the specific ingredient
-    return shap_values[ingredient_index]
+    import shap
+
+    return shap.Explanation(
+        values=explanation.values[row][:, ingredient_index],
+        base_values=explanation.base_values[row][ingredient_index],
+        data=explanation.data[row],
+        feature_names=explanation.feature_names
+    )
 
 
-def plot_waterfall(explainer, model, input_data, ingredient_name, ingredient_index, base_value):
+def plot_waterfall(explanation, ingredient_index, row=0):
     """
     Create a SHAP waterfall plot showing feature contributions.
-    
+
+    The figure stays registered with pyplot until the caller closes it
+    (plt.close); prefer waterfall_image, which does so.
+
     Args:
-        explainer: SHAP TreeExplainer object
-        model: Trained scikit-learn Pipeline model
-        input_data: DataFrame with single row of input features
-        ingredient_name: Name of ingredient being predicted
+        explanation: shap.Explanation from ExplanationContext.explain
         ingredient_index: Index of ingredient (0=Tomato, 1=Green Pepper, 2=Lettuce, 3=Cucumber)
-        base_value: Expected value (base prediction) for the model
-    """
-    # Preprocess input data
-    preprocessor = model.named_steps['preprocessor']
-    X_preprocessed = preprocessor.transform(input_data)
-    
-    # Get SHAP values (returns array of shape (1, n_features, n_outputs) for single sample)
-    shap_values = explainer.shap_values(X_preprocessed)
-    
-    # Create feature names after preprocessing
-    feature_names = []
-    # Get one-hot encoded feature names from the preprocessor
-    cat_features = preprocessor.named_transformers_['cat'].get_feature_names_out(
-        input_features=['Season', 'Weather', 'Temperature']
-    ).tolist()
-    feature_names.extend(cat_features)
-    # Add passthrough features (Long_Weekend, Promotion, Holiday)
-    feature_names.extend(['Long_Weekend', 'Promotion', 'Holiday'])
-    
-    # Extract SHAP values for the specific ingredient and sample
-    # shap_values[0] gives (n_features, n_outputs), then [:, ingredient_index] gives 1D array
-    ingredient_shap = shap_values[0][:, ingredient_index]
-    
-    # Create SHAP explanation object
-    explanation = shap.Explanation(
-        values=ingredient_shap,
-        base_values=base_value[ingredient_index],
-        data=X_preprocessed[0],
-        feature_names=feature_names
-    )
-    
-    # Create waterfall plot
+        row: Sample index within the explanation
+
+    Returns:
+        matplotlib Figure
+    """
+    import matplotlib.pyplot as plt
+    import shap
+
     fig = plt.figure(figsize=(10, 6))
-    shap.plots.waterfall(explanation, show=False)
-    
+    shap.plots.waterfall(ingredient_explanation(explanation, ingredient_index, row), show=False)
+
     return fig
 
 
-def plot_force(explainer, model, input_data, ingredient_name, ingredient_index, base_value):
+def waterfall_image(explanation, ingredient_index, row=0, fmt='png', dpi=WATERFALL_DPI):
     """
-    Create a SHAP force plot showing feature contributions.
-    
+    Render a waterfall plot to image bytes and release the figure.
+
     Args:
-        explainer: SHAP TreeExplainer object
-        model: Trained scikit-learn Pipeline model
-        input_data: DataFrame with single row of input features
-        ingredient_name: Name of ingredient being predicted
+        explanation: shap.Explanation from ExplanationContext.explain
         ingredient_index: Index of ingredient
-        base_value: Expected value (base prediction) for the model
-    """
-    # Preprocess input data
-    preprocessor = model.named_steps['preprocessor']
-    X_preprocessed = preprocessor.transform(input_data)
-    
-    # Get SHAP values (returns array of shape (1, n_features, n_outputs) for single sample)
-    shap_values = explainer.shap_values(X_preprocessed)
-    
-    # Create feature names
-    feature_names = []
-    cat_features = preprocessor.named_transformers_['cat'].get_feature_names_out(
-        input_features=['Season', 'Weather', 'Temperature']
-    ).tolist()
-    feature_names.extend(cat_features)
-    feature_names.extend(['Long_Weekend', 'Promotion', 'Holiday'])
-    
-    # Extract SHAP values for the specific ingredient and sample
-    ingredient_shap = shap_values[0][:, ingredient_index]
-    
-    # Create SHAP explanation object
-    explanation = shap.Explanation(
-        values=ingredient_shap,
-        base_values=base_value[ingredient_index],
-        data=X_preprocessed[0],
-        feature_names=feature_names
-    )
-    
-    # Return the explanation object for force plot
-    return explanation
+        row: Sample index within the explanation
+        fmt: Image format understood by matplotlib, e.g. 'png' or 'svg'
+        dpi: Resolution of raster formats
+
+    Returns:
+        bytes of the rendered image
+    """
+    import matplotlib.pyplot as plt
+
+    with _plot_lock:
+        fig = plot_waterfall(explanation, ingredient_index, row)
+        try:
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=fmt, dpi=dpi, bbox_inches='tight')
+        finally:
+            plt.close(fig)
+    return buffer.getvalue()
+
+
+@st.cache_data(max_entries=WATERFALL_CACHE_ENTRIES, show_spinner=False)
+def render_waterfall(model_version, input_key, ingredient_index, _explanation, fmt='png'):
+    """
+    Cached waterfall_image for the first row of an explanation.
+
+    Args:
+        model_version: Artifact key of the model
+        input_key: Hashable tuple of the raw input values that were explained
+        ingredient_index: Index of ingredient
+        _explanation: shap.Explanation for input_key under model_version
+        fmt: Image format
+
+    Returns:
+        bytes of the rendered image
+    """
+    get_telemetry().cache_miss('render_waterfall')
+    return waterfall_image(_explanation, ingredient_index, fmt=fmt)
+
+
+def waterfall_frame(explanation, ingredient_index, row=0, max_features=NATIVE_CHART_FEATURES):
+    """
+    Feature contributions as a table, for native (non-matplotlib) charts.
+
+    Args:
+        explanation: shap.Explanation from ExplanationContext.explain
+        ingredient_index: Index of ingredient
+        row: Sample index within the explanation
+        max_features: Number of largest contributions to keep
+
+    Returns:
+        DataFrame with 'Feature' and 'Contribution' columns, largest absolute
+        contribution first; features that did not contribute are left out
+    """
+    values = np.asarray(explanation.values[row])[:, ingredient_index]
+    frame = pd.DataFrame({'Feature': explanation.feature_names, 'Contribution': values})
+    frame = frame[frame['Contribution'] != 0]
+    order = frame['Contribution'].abs().sort_values(ascending=False, kind='stable').index
+    return frame.loc[order].head(max_features).reset_index(drop=True)
+
@@ -0,0 +1,200 @@
+"""Per-store models for multi-store sales histories.
+
+Each store gets its own pipeline, trained on its partition of the history.
+Stores are trained in parallel worker processes that read their own
+partition from the history store, or one at a time when the app first asks
+for them, and models are loaded on demand with a bound on how many stay in
+memory.
+"""
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import streamlit as st
+from history_store import HISTORY_STORE_PATH, list_stores, read_history
+from model_store import (
+    ARTIFACT_DIR, artifact_key, data_hash, load_artifact, load_meta, load_or_build,
+    load_store_index, save_artifact, save_store_index
+)
+from model_trainer import FEATURE_COLUMNS, TARGET_COLUMNS, fit_model, load_model_params
+
+# Store models kept in memory by StoreModelCache
+DEFAULT_MAX_RESIDENT_MODELS = 8
+
+
+def _train_store(task):
+    """
+    Train and save one store's model unless its artifact already exists.
+
+    Processes sharing artifact_dir train each store's artifact once: the
+    others wait for it to be published.
+    """
+    path, store, params, artifact_dir = task
+    df = read_history(path, store=store)
+    columns = FEATURE_COLUMNS + TARGET_COLUMNS
+    key = artifact_key(df, columns, params)
+
+    def build():
+        model, metrics = fit_model(df, params)
+        save_artifact(key, model, metrics, meta={
+            'params': params,
+            'rows': len(df),
+            'data_hash': data_hash(df, columns),
+            'mode': 'full',
+            'store': store,
+        }, artifact_dir=artifact_dir)
+        return load_meta(key, artifact_dir)
+
+    load_or_build(key, 'model', lambda: load_meta(key, artifact_dir), build, artifact_dir)
+    return store, key
+
+
+def train_store_models(path=HISTORY_STORE_PATH, artifact_dir=ARTIFACT_DIR, stores=None,
+                       params=None, n_jobs=None):
+    """
+    Train one model per store in parallel.
+
+    Artifacts are content-addressed like train_model's, so stores whose
+    partition has not changed are skipped. The store index in artifact_dir
+    is updated to point at each store's model.
+
+    Args:
+        path: History store directory with a Store column
+        artifact_dir: Root directory for saved model artifacts
+        stores: Stores to train (default: every store in the history)
+        params: Model hyperparameters (default: model_trainer.load_model_params())
+        n_jobs: Worker processes (default: os.cpu_count()); 1 trains in-process
+
+    Returns:
+        dict mapping Store id to artifact key
+    """
+    stores = list_stores(path) if stores is None else list(stores)
+    params = load_model_params() if params is None else params
+    tasks = [(path, store, params, artifact_dir) for store in stores]
+
+    n_jobs = min(n_jobs or os.cpu_count() or 1, max(len(tasks), 1))
+    if n_jobs == 1:
+        keys = dict(map(_train_store, tasks))
+    else:
+        with ProcessPoolExecutor(n_jobs) as pool:
+            keys = dict(pool.map(_train_store, tasks))
+    save_store_index(keys, artifact_dir)
+    return keys
+
+
+class StoreModelCache:
+    """
+    Lazily loaded per-store models with an LRU bound.
+
+    A store's model is read from its artifact on first use. Given the history
+    path, a store whose artifact is missing or stale is trained at that point,
+    so a page load only waits for the store it shows. Once more than
+    max_models are resident, the least recently used one is dropped.
+    Each store's artifact key is worked out once per cache, so reloading an
+    evicted model does not re-read and re-hash its partition; the cache is
+    rebuilt when the history changes (see load_store_models).
+    Safe to share between threads.
+    """
+
+    def __init__(self, artifact_dir=ARTIFACT_DIR, max_models=DEFAULT_MAX_RESIDENT_MODELS,
+                 path=None, params=None):
+        self.artifact_dir = artifact_dir
+        self.max_models = max_models
+        self.path = path
+        self.params = load_model_params() if params is None else params
+        self.keys = load_store_index(artifact_dir)
+        self._stores = None if path is None else list_stores(path)
+        self._models = OrderedDict()
+        # Keys checked against the current partitions, by store
+        self._partition_keys = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stores(self):
+        """Stores in the history, or with a trained model when there is no history path."""
+        return sorted(self.keys) if self._stores is None else list(self._stores)
+
+    @property
+    def resident(self):
+        """Stores whose models are currently in memory, least recently used first."""
+        with self._lock:
+            return list(self._models)
+
+    def get(self, store):
+        """
+        Model and metrics for a store, loading (or training) them if needed.
+
+        Returns:
+            tuple: (Trained scikit-learn Pipeline model, dict of metrics)
+
+        Raises:
+            KeyError: If the store has no trained model
+        """
+        with self._lock:
+            if store in self._models:
+                self._models.move_to_end(store)
+                return self._models[store]
+        # Outside the lock, so other stores stay available while one trains;
+        # concurrent requests for the same store share one build
+        key = self._key(store)
+        artifact = load_artifact(key, self.artifact_dir)
+        if artifact is None:
+            raise KeyError(store)
+        with self._lock:
+            self.keys[store] = key
+            self._models[store] = artifact
+            self._models.move_to_end(store)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+            return artifact
+
+    def _key(self, store):
+        """Artifact key of the store's current model, training it first if needed."""
+        if self._stores is None:
+            return self.keys[store]
+        if store not in self._stores:
+            raise KeyError(store)
+        with self._lock:
+            key = self._partition_keys.get(store)
+        if key is None or load_meta(key, self.artifact_dir) is None:
+            _, key = _train_store((self.path, store, self.params, self.artifact_dir))
+            save_store_index({store: key}, self.artifact_dir)
+            with self._lock:
+                self._partition_keys[store] = key
+        return key
+
+
+@st.cache_resource
+def load_store_models(path=HISTORY_STORE_PATH, fingerprint=None, artifact_dir=ARTIFACT_DIR,
+                      max_models=DEFAULT_MAX_RESIDENT_MODELS, params=None):
+    """
+    Cache over the per-store models of the history at path.
+
+    Nothing is trained up front: each store's model is trained the first
+    time it is requested, unless an up-to-date artifact already exists (see
+    train_store_models to pre-build them). The fingerprint
+    (history_store.history_fingerprint) is only part of the cache key, so
+    the models are refreshed when the history changes on disk. Likewise
+    params (default: load_model_params()), so pass them to pick up a newly
+    saved config.
+
+    Returns:
+        StoreModelCache
+    """
+    return StoreModelCache(artifact_dir, max_models, path=path, params=params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train one model per store in parallel.")
+    parser.add_argument('--history', default=HISTORY_STORE_PATH, help="History store directory")
+    parser.add_argument('--artifact-dir', default=ARTIFACT_DIR, help="Artifact directory")
+    parser.add_argument('--jobs', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    keys = train_store_models(args.history, args.artifact_dir, n_jobs=args.jobs)
+    print(f"Store models ready in {args.artifact_dir} for {len(keys)} stores")
+
+
+if __name__ == '__main__':
+    main()
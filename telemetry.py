@@ -0,0 +1,194 @@
+"""Lightweight instrumentation: stage timing spans and cache hit/miss counters.
+
+The app wraps each stage of a rerun in a span and counts calls to its cached
+loaders; the cached functions count their own executions as misses. Totals
+are kept per process and can be written to a Prometheus text file or served
+on a /metrics endpoint.
+"""
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, suppress
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRICS_FILE = 'metrics.prom'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Telemetry:
+    """
+    Thread-safe collector of stage timings and cache counters.
+
+    Stage timings are accumulated over the process lifetime; the spans of the
+    current rerun are also kept separately (see begin_run) for display. Those
+    are per thread, since Streamlit runs each session's reruns in its own
+    thread, so concurrent sessions never see each other's timings.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        """Drop every recorded span and counter."""
+        with self._lock:
+            self._stages = defaultdict(lambda: {'count': 0, 'total_seconds': 0.0, 'max_seconds': 0.0})
+            self._last_seconds = {}
+            self._cache_calls = defaultdict(int)
+            self._cache_misses = defaultdict(int)
+        self._local.run = {}
+
+    def begin_run(self):
+        """Start a new rerun in this thread: last_run() only reports spans recorded after this."""
+        self._local.run = {}
+
+    def record_span(self, name, seconds):
+        """Add one timing of a stage."""
+        with self._lock:
+            stage = self._stages[name]
+            stage['count'] += 1
+            stage['total_seconds'] += seconds
+            stage['max_seconds'] = max(stage['max_seconds'], seconds)
+            self._last_seconds[name] = seconds
+        run = self._run()
+        run[name] = run.get(name, 0.0) + seconds
+
+    def _run(self):
+        """Spans of this thread's current rerun."""
+        if not hasattr(self._local, 'run'):
+            self._local.run = {}
+        return self._local.run
+
+    @contextmanager
+    def span(self, name, cached=False):
+        """
+        Time the enclosed block as stage name.
+
+        Args:
+            name: Stage name
+            cached: Also count a call of the cache of the same name (the
+                cached function reports its misses with cache_miss)
+        """
+        if cached:
+            self.cache_call(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_span(name, time.perf_counter() - start)
+
+    def cache_call(self, name):
+        """Count a call of a cached function."""
+        with self._lock:
+            self._cache_calls[name] += 1
+
+    def cache_miss(self, name):
+        """Count an execution of a cached function's body."""
+        with self._lock:
+            self._cache_misses[name] += 1
+
+    def stages(self):
+        """dict mapping stage to count, total_seconds and max_seconds."""
+        with self._lock:
+            return {name: dict(stage) for name, stage in self._stages.items()}
+
+    def last_run(self):
+        """dict mapping stage to seconds spent in it during this thread's current rerun."""
+        return dict(self._run())
+
+    def cache_stats(self):
+        """dict mapping cache to calls, hits and misses."""
+        with self._lock:
+            names = set(self._cache_calls) | set(self._cache_misses)
+            stats = {}
+            for name in sorted(names):
+                calls, misses = self._cache_calls[name], self._cache_misses[name]
+                stats[name] = {'calls': calls, 'hits': max(calls - misses, 0), 'misses': misses}
+            return stats
+
+    def to_prometheus(self):
+        """Every metric in the Prometheus text exposition format."""
+        lines = []
+
+        def family(metric, kind, help_text, label, values):
+            lines.append(f'# HELP {metric} {help_text}')
+            lines.append(f'# TYPE {metric} {kind}')
+            for key, value in sorted(values.items()):
+                lines.append(f'{metric}{{{label}="{key}"}} {value:g}')
+
+        stages = self.stages()
+        family('app_stage_runs_total', 'counter', 'Times each app stage ran.', 'stage',
+               {name: s['count'] for name, s in stages.items()})
+        family('app_stage_seconds_total', 'counter', 'Seconds spent in each app stage.', 'stage',
+               {name: s['total_seconds'] for name, s in stages.items()})
+        family('app_stage_max_seconds', 'gauge', 'Slowest single run of each app stage.', 'stage',
+               {name: s['max_seconds'] for name, s in stages.items()})
+        with self._lock:
+            last_seconds = dict(self._last_seconds)
+        family('app_stage_last_seconds', 'gauge', 'Duration of the latest run of each stage.',
+               'stage', last_seconds)
+        caches = self.cache_stats()
+        family('app_cache_calls_total', 'counter', 'Calls of each cached function.', 'cache',
+               {name: c['calls'] for name, c in caches.items()})
+        family('app_cache_misses_total', 'counter', 'Cache misses of each cached function.', 'cache',
+               {name: c['misses'] for name, c in caches.items()})
+        return '\n'.join(lines) + '\n'
+
+    def write_metrics(self, path=METRICS_FILE):
+        """Atomically write to_prometheus() to path (e.g. for node_exporter's textfile collector)."""
+        # Unique per writer: every session's rerun rewrites the file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except BaseException:
+            with suppress(OSError):
+                os.remove(tmp_path)
+            raise
+
+
+def serve_metrics(port, host='0.0.0.0', collector=None):
+    """
+    Serve the collector's metrics at http://host:port/metrics in a daemon thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        host: Interface to bind
+        collector: Telemetry to export (default: the process-wide one)
+
+    Returns:
+        The running ThreadingHTTPServer; call shutdown() to stop it
+    """
+    collector = collector or get_telemetry()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            payload = collector.to_prometheus().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+_telemetry = Telemetry()
+
+
+def get_telemetry():
+    """Process-wide Telemetry shared by every session and the cached loaders."""
+    return _telemetry
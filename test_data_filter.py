@@ -0,0 +1,78 @@
+import unittest
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from data_filter import WeekIndex, filter_by_week
+
+
+def reference_filter_by_week(df, week_number, window=1):
+    """The original row-by-row implementation, generalized to +/- window weeks
+    and iterating unique target dates (one group per date, not per row)."""
+    target_dates = df[df['Date'].dt.isocalendar().week == week_number]['Date']
+    if target_dates.empty:
+        return df.tail(12).sort_values('Date', ascending=False)
+    result_rows = []
+    for date in target_dates.sort_values(ascending=False).unique():
+        date = pd.Timestamp(date)
+        dates_in_group = [date + timedelta(days=7 * k) for k in range(window, -window - 1, -1)]
+        dates_in_group = [d for d in dates_in_group if d <= datetime.now()]
+        group_df = df[df['Date'].isin(dates_in_group)].copy()
+        if not group_df.empty:
+            group_df['GroupYear'] = date.year
+            result_rows.append(group_df)
+    if not result_rows:
+        return df.tail(12).sort_values('Date', ascending=False)
+    filtered_df = pd.concat(result_rows)
+    return filtered_df.sort_values(['GroupYear', 'Date'], ascending=[False, False])
+
+
+class TestFilterByWeek(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = pd.read_csv('sales_history.csv')
+        cls.df['Date'] = pd.to_datetime(cls.df['Date'])
+
+    def assertSameResult(self, df, week, window=1, index=None):
+        expected = reference_filter_by_week(df, week, window)
+        actual = filter_by_week(df, week, window=window, index=index)
+        pd.testing.assert_frame_equal(actual, expected)
+
+    def test_matches_reference_for_every_week(self):
+        index = WeekIndex(self.df)
+        for week in range(1, 54):
+            self.assertSameResult(self.df, week, index=index)
+
+    def test_configurable_window(self):
+        for window in [0, 2, 4]:
+            for week in [1, 20, 52]:
+                self.assertSameResult(self.df, week, window=window)
+
+    def test_excludes_future_dates(self):
+        today = pd.Timestamp(datetime.now().date())
+        df = pd.DataFrame({'Date': [today - pd.Timedelta(weeks=k) for k in range(-3, 120)][::-1]})
+        df['Value'] = np.arange(len(df))
+        week = today.isocalendar().week
+        result = filter_by_week(df, week)
+        self.assertTrue((result['Date'] <= datetime.now()).all())
+        self.assertSameResult(df, week)
+
+    def test_multi_store_history(self):
+        stores = pd.concat([self.df.assign(Store=s) for s in [1, 2, 3]], ignore_index=True)
+        stores = stores.sample(frac=1, random_state=0)
+        for week in [2, 27, 51]:
+            self.assertSameResult(stores, week)
+
+    def test_rebuilds_index_built_for_other_rows(self):
+        index = WeekIndex(self.df)
+        shuffled = self.df.sample(frac=1, random_state=0)
+        self.assertTrue(index.matches(self.df.copy()))
+        self.assertFalse(index.matches(shuffled))
+        self.assertSameResult(shuffled, 20, index=index)
+
+    def test_fallback_when_week_missing(self):
+        self.assertSameResult(self.df.head(10), 40)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import pandas as pd
+from data_filter import filter_by_week
+from data_formatter import (
+    YEAR_COLORS, add_year_marker, apply_year_highlight, format_data_for_display,
+    highlight_for_display, page_count, paginate
+)
+
+
+def reference_timeline(row_date, target_week):
+    """The original per-row timeline label."""
+    w = row_date.isocalendar().week
+    if w == target_week:
+        return "This Week"
+    if target_week == 1:
+        return "Previous Week" if w >= 52 else "Next Week"
+    if target_week >= 52:
+        return "Next Week" if w == 1 else "Previous Week"
+    return "Previous Week" if w < target_week else "Next Week"
+
+
+class TestDataFormatter(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = pd.read_csv('sales_history.csv')
+        cls.df['Date'] = pd.to_datetime(cls.df['Date'])
+
+    def test_timeline_matches_reference(self):
+        for week in [1, 2, 26, 52, 53]:
+            preview = filter_by_week(self.df, week)
+            display = format_data_for_display(preview, week)
+            expected = [reference_timeline(d, week) for d in preview['Date']]
+            self.assertEqual(list(display['Timeline']), expected)
+
+    def test_highlight_colors_follow_group_year(self):
+        display = format_data_for_display(filter_by_week(self.df, 10), 10)
+        styled = apply_year_highlight(display)
+        styled._compute()
+        for row, year in enumerate(display['GroupYear']):
+            expected = [('background-color', YEAR_COLORS[year % len(YEAR_COLORS)]), ('color', 'black')]
+            self.assertEqual(styled.ctx[(row, 0)], expected)
+        self.assertEqual(list(display.columns[styled.hidden_columns]), ['GroupYear'])
+
+    def test_large_frames_use_marker_column(self):
+        display = format_data_for_display(self.df.assign(GroupYear=self.df['Date'].dt.year))
+        self.assertIsInstance(highlight_for_display(display.head(10)), pd.io.formats.style.Styler)
+        marked = highlight_for_display(display, row_limit=100)
+        self.assertIsInstance(marked, pd.DataFrame)
+        self.assertNotIn('GroupYear', marked.columns)
+        self.assertEqual(len(marked), len(display))
+        self.assertEqual(marked[' '].nunique(), min(4, display['GroupYear'].nunique()))
+        pd.testing.assert_frame_equal(add_year_marker(display).iloc[:, 1:], marked.iloc[:, 1:])
+
+    def test_pagination(self):
+        self.assertEqual(page_count(self.df.head(0), 50), 1)
+        self.assertEqual(page_count(self.df.head(101), 50), 3)
+        pages = [paginate(self.df.head(101), p, 50) for p in [1, 2, 3]]
+        pd.testing.assert_frame_equal(pd.concat(pages), self.df.head(101))
+        pd.testing.assert_frame_equal(paginate(self.df.head(101), 9, 50), pages[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+import pandas as pd
+from generate_data import generate_data
+from model_utils import get_season, TEMPERATURE_CATEGORIES
+
+
+class TestGenerateData(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def _generate(self, name, **kwargs):
+        path = self._path(name)
+        kwargs.setdefault('start_date', datetime(2020, 1, 1))
+        kwargs.setdefault('end_date', datetime(2023, 12, 31))
+        generate_data(output_path=path, **kwargs)
+        if path.endswith('.parquet'):
+            return pd.read_parquet(path)
+        return pd.read_csv(path, parse_dates=['Date'])
+
+    def test_seed_is_reproducible(self):
+        first = self._generate('a.csv', seed=7)
+        second = self._generate('b.csv', seed=7)
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_only_wednesdays_within_range(self):
+        df = self._generate('wed.csv', seed=1)
+        self.assertTrue((df['Date'].dt.weekday == 2).all())
+        self.assertEqual(df['Date'].min(), pd.Timestamp(2020, 1, 1))
+        self.assertEqual(df['Date'].max(), pd.Timestamp(2023, 12, 27))
+        self.assertEqual(len(df), 209)
+        self.assertNotIn('Store', df.columns)
+
+    def test_rules_match_scalar_helpers(self):
+        df = self._generate('rules.csv', seed=3, stores=5, chunk_rows=64)
+        self.assertEqual(len(df), 209 * 5)
+        self.assertEqual(sorted(df['Store'].unique()), [1, 2, 3, 4, 5])
+        seasons = df['Date'].map(get_season)
+        self.assertTrue((seasons == df['Season']).all())
+        self.assertTrue(df['Temperature'].isin(TEMPERATURE_CATEGORIES).all())
+        self.assertFalse(((df['Weather'] == 'Snowy') & (df['Season'] != 'Winter')).any())
+        for column in ['Tomato_Boxes', 'Green_Pepper_Boxes', 'Lettuce_Boxes', 'Cucumber_Boxes']:
+            self.assertGreaterEqual(df[column].min(), 1)
+
+    def test_rejects_empty_requests(self):
+        for kwargs in [{'stores': 0}, {'stores': -1}, {'years': 0}]:
+            with self.assertRaises(ValueError):
+                generate_data(output_path=self._path('empty.csv'), **kwargs)
+        self.assertFalse(os.path.exists(self._path('empty.csv')))
+
+    def test_parquet_output_matches_csv(self):
+        csv_df = self._generate('out.csv', seed=11, stores=2, chunk_rows=50)
+        parquet_df = self._generate('out.parquet', seed=11, stores=2, chunk_rows=50)
+        self.assertEqual(len(csv_df), len(parquet_df))
+        self.assertTrue((csv_df['Tomato_Boxes'] == parquet_df['Tomato_Boxes']).all())
+        self.assertTrue((csv_df['Weather'] == parquet_df['Weather']).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
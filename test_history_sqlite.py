@@ -0,0 +1,78 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from data_filter import WeekIndex, filter_by_week
+from history_sqlite import (
+    filter_by_week_sqlite, read_date_range, read_iso_week, stored_fingerprint, sync_sqlite_history
+)
+from history_store import append_history, history_fingerprint, read_history, write_history
+
+
+class TestSqliteHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'history.parquet')
+        self.db_path = os.path.join(self.tmpdir.name, 'history.sqlite')
+
+    def build(self, csv):
+        write_history(csv, self.path)
+        df = read_history(self.path)
+        sync_sqlite_history(df, history_fingerprint(self.path), self.db_path)
+        return df
+
+    def test_matches_in_memory_filter(self):
+        df = self.build(pd.read_csv('sales_history.csv'))
+        index = WeekIndex(df)
+        for week in range(1, 54):
+            pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, week),
+                                          filter_by_week(df, week, index=index))
+        for window in [0, 3]:
+            pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, 30, window=window),
+                                          filter_by_week(df, 30, window=window))
+
+    def test_multi_store_history(self):
+        csv = pd.read_csv('sales_history.csv')
+        df = self.build(pd.concat([csv.assign(Store=s) for s in [1, 2, 3]], ignore_index=True)
+                        .sample(frac=1, random_state=0))
+        for week in [2, 27, 51]:
+            pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, week),
+                                          filter_by_week(df, week))
+            store_df = df[df['Store'] == 2]
+            pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, week, store=2),
+                                          filter_by_week(store_df, week))
+        expected = store_df[(store_df['Date'] >= '2023-03-01') & (store_df['Date'] <= '2023-05-31')]
+        pd.testing.assert_frame_equal(read_date_range(self.db_path, '2023-03-01', '2023-05-31', store=2),
+                                      expected)
+        iso = store_df['Date'].dt.isocalendar()
+        pd.testing.assert_frame_equal(read_iso_week(self.db_path, 2023, 10, store=2),
+                                      store_df[(iso['year'] == 2023) & (iso['week'] == 10)])
+
+    def test_many_dates_are_queried_in_chunks(self):
+        df = self.build(pd.read_csv('sales_history.csv'))
+        with patch('history_sqlite.MAX_QUERY_DATES', 7):
+            for week in [5, 30]:
+                pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, week, window=4),
+                                              filter_by_week(df, week, window=4))
+
+    def test_fallback_when_week_missing(self):
+        df = self.build(pd.read_csv('sales_history.csv').head(10))
+        pd.testing.assert_frame_equal(filter_by_week_sqlite(self.db_path, 40), filter_by_week(df, 40))
+
+    def test_rebuilds_when_history_changes(self):
+        csv = pd.read_csv('sales_history.csv')
+        self.build(csv.head(100))
+        fingerprint = history_fingerprint(self.path)
+        self.assertFalse(sync_sqlite_history(read_history(self.path), fingerprint, self.db_path))
+        append_history(csv.iloc[100:], self.path)
+        self.assertTrue(sync_sqlite_history(read_history(self.path), history_fingerprint(self.path),
+                                            self.db_path))
+        self.assertNotEqual(stored_fingerprint(self.db_path), None)
+        self.assertEqual(len(read_date_range(self.db_path)), len(csv))
+
+
+if __name__ == '__main__':
+    unittest.main()
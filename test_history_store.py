@@ -0,0 +1,69 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import pandas as pd
+from data_loader import load_data
+from history_store import (
+    append_history, csv_signature, history_exists, history_fingerprint, import_csv,
+    imported_source, read_history, write_history
+)
+
+
+class TestHistoryStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'history.parquet')
+        self.csv = pd.read_csv('sales_history.csv')
+
+    def test_import_uses_typed_columns(self):
+        csv_path = os.path.join(self.tmpdir.name, 'history.csv')
+        self.csv.to_csv(csv_path, index=False)
+        self.assertFalse(history_exists(self.path))
+        import_csv(csv_path, self.path)
+        df = read_history(self.path)
+        self.assertEqual(len(df), len(self.csv))
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(df['Date']))
+        self.assertIsInstance(df['Season'].dtype, pd.CategoricalDtype)
+        self.assertEqual(df['Promotion'].dtype, bool)
+        self.assertEqual(df['Tomato_Boxes'].dtype, 'int16')
+        self.assertEqual(list(df['Weather'].astype(str)), list(self.csv['Weather']))
+
+    def test_append_changes_fingerprint(self):
+        write_history(self.csv.head(100), self.path)
+        before = history_fingerprint(self.path)
+        self.assertEqual(history_fingerprint(self.path), before)
+        append_history(self.csv.iloc[100:], self.path)
+        self.assertNotEqual(history_fingerprint(self.path), before)
+        df = read_history(self.path)
+        self.assertEqual(len(df), len(self.csv))
+        self.assertEqual(list(df['Date'].dt.strftime('%Y-%m-%d')), list(self.csv['Date']))
+
+    def test_concurrent_appends_keep_every_part(self):
+        write_history(self.csv.head(10), self.path)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda _: append_history(self.csv.head(5), self.path), range(16)))
+        self.assertEqual(len(read_history(self.path)), 10 + 16 * 5)
+
+    def test_changed_csv_is_reimported(self):
+        csv_path = os.path.join(self.tmpdir.name, 'history.csv')
+        self.csv.head(50).to_csv(csv_path, index=False)
+        self.assertEqual(len(load_data(self.path, csv_path)), 50)
+        self.assertEqual(imported_source(self.path), csv_signature(csv_path))
+        self.assertEqual(len(load_data(self.path, csv_path)), 50)
+
+        self.csv.head(80).to_csv(csv_path, index=False)
+        self.assertEqual(len(load_data(self.path, csv_path)), 80)
+        self.assertEqual(imported_source(self.path), csv_signature(csv_path))
+
+    def test_write_replaces_contents(self):
+        write_history(self.csv, self.path)
+        append_history(self.csv.head(5), self.path)
+        write_history(self.csv.head(10), self.path)
+        self.assertEqual(len(read_history(self.path)), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+import pandas as pd
+from model_selection import best_config, run_selection, time_series_folds
+from model_trainer import (
+    DEFAULT_MODEL_PARAMS, FEATURE_COLUMNS, fit_model, load_model_params, save_model_config
+)
+
+GRID = [
+    ('random_forest', {'n_estimators': 10, 'random_state': 0}),
+    ('extra_trees', {'n_estimators': 10, 'random_state': 0}),
+    ('hist_gradient_boosting', {'max_iter': 20, 'random_state': 0}),
+]
+
+
+class TestModelSelection(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        df = pd.read_csv('sales_history.csv')
+        df['Date'] = pd.to_datetime(df['Date'])
+        # Shuffled, so the folds have to restore date order themselves
+        cls.df = df.sample(frac=1, random_state=0)
+
+    def test_folds_train_on_the_past(self):
+        dates = self.df['Date'].to_numpy()
+        folds = time_series_folds(self.df, n_splits=4)
+        self.assertEqual(len(folds), 4)
+        for train, test in folds:
+            self.assertLessEqual(dates[train].max(), dates[test].min())
+
+    def test_results_match_across_worker_counts(self):
+        serial = run_selection(self.df, GRID, n_splits=3, n_jobs=1)
+        parallel = run_selection(self.df, GRID, n_splits=3, n_jobs=2)
+        self.assertEqual(len(serial), len(GRID))
+        self.assertTrue(serial['mae'].is_monotonic_increasing)
+        self.assertTrue((serial[['fit_seconds', 'predict_ms']] > 0).all().all())
+        pd.testing.assert_frame_equal(serial[['estimator', 'mae', 'r2']], parallel[['estimator', 'mae', 'r2']])
+
+    def test_best_config_skips_unsupported_estimators(self):
+        results = pd.DataFrame({
+            'estimator': ['hist_gradient_boosting', 'extra_trees'],
+            'params': [{'max_iter': 20}, {'n_estimators': 10}],
+            'mae': [0.5, 0.6],
+        })
+        self.assertEqual(best_config(results), ('extra_trees', {'n_estimators': 10}))
+        with self.assertRaises(ValueError):
+            best_config(results.head(1))
+
+    def test_written_config_becomes_trainer_default(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'model_config.json')
+            self.assertEqual(load_model_params(path), DEFAULT_MODEL_PARAMS)
+            save_model_config('extra_trees', {'n_estimators': 10, 'random_state': 0}, path)
+            params = load_model_params(path)
+            self.assertEqual(params, {'estimator': 'extra_trees', 'n_estimators': 10, 'random_state': 0})
+            model, _ = fit_model(self.df, params)
+            self.assertEqual(type(model.named_steps['regressor']).__name__, 'ExtraTreesRegressor')
+            self.assertEqual(model.predict(self.df[FEATURE_COLUMNS].head(3)).shape, (3, 4))
+            with self.assertRaises(ValueError):
+                save_model_config('hist_gradient_boosting', {}, path)
+
+
+if __name__ == '__main__':
+    unittest.main()
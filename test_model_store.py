@@ -0,0 +1,53 @@
+import os
+import tempfile
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from model_store import artifact_lock, load_or_build
+
+
+def _load_or_build_counted(artifact_dir):
+    """Worker: build 'v1/table' (slowly), counting the builds in a log file."""
+    result_path = os.path.join(artifact_dir, 'result.txt')
+
+    def load():
+        if not os.path.exists(result_path):
+            return None
+        with open(result_path) as f:
+            return f.read()
+
+    def build():
+        with open(os.path.join(artifact_dir, 'builds.log'), 'a') as f:
+            f.write(f'{os.getpid()}\n')
+        time.sleep(0.5)
+        tmp_path = f'{result_path}.{os.getpid()}'
+        with open(tmp_path, 'w') as f:
+            f.write('built')
+        os.replace(tmp_path, result_path)
+        return 'built'
+
+    return load_or_build('v1', 'table', load, build, artifact_dir)
+
+
+class TestSharedArtifacts(unittest.TestCase):
+
+    def test_concurrent_processes_build_once(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            with ProcessPoolExecutor(4) as pool:
+                results = list(pool.map(_load_or_build_counted, [artifact_dir] * 4))
+            self.assertEqual(results, ['built'] * 4)
+            with open(os.path.join(artifact_dir, 'builds.log')) as f:
+                self.assertEqual(len(f.read().split()), 1)
+
+    def test_lock_times_out(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            with artifact_lock('v1', 'model', artifact_dir):
+                with self.assertRaises(TimeoutError):
+                    with artifact_lock('v1', 'model', artifact_dir, timeout=0.2):
+                        pass
+                with artifact_lock('v1', 'other', artifact_dir, timeout=0.2):
+                    pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+import tempfile
+import unittest
+from datetime import date
+import numpy as np
+import pandas as pd
+from model_store import artifact_key, load_arrays, load_artifact, load_latest, load_meta, model_version
+from model_trainer import (
+    fit_model, train_model, update_model, compile_model, predict_orders, predict_orders_batch,
+    DEFAULT_MODEL_PARAMS, FEATURE_COLUMNS, TARGET_COLUMNS, PREDICTION_TABLE_NAME
+)
+from order_planner import next_wednesdays, plan_orders
+
+
+def load_history():
+    df = pd.read_csv('sales_history.csv')
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df
+
+
+class TestModelTrainer(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_history()
+        cls.model, cls.metrics = fit_model(cls.df)
+
+    def test_batch_matches_single_predictions(self):
+        scenarios = self.df.head(20)
+        batch = predict_orders_batch(self.model, scenarios)
+        self.assertEqual(batch.shape, (20, 4))
+        for i, row in enumerate(scenarios.itertuples()):
+            single = predict_orders(
+                self.model, row.Season, row.Weather, row.Temperature,
+                row.Long_Weekend, row.Promotion, row.Holiday
+            )
+            np.testing.assert_allclose(batch[i], single)
+
+    def test_batch_derives_season_from_date(self):
+        batch = predict_orders_batch(self.model, {
+            'Date': ['2024-07-03'], 'Weather': ['Sunny'], 'Temperature': ['Warm']
+        })
+        single = predict_orders(self.model, 'Summer', 'Sunny', 'Warm', False, False, False)
+        np.testing.assert_allclose(batch[0], single)
+
+    def test_batch_rejects_invalid_flags(self):
+        scenarios = {'Season': ['Summer'] * 2, 'Weather': ['Sunny'] * 2, 'Temperature': ['Warm'] * 2,
+                     'Promotion': [1, 0]}
+        expected = predict_orders_batch(self.model, dict(scenarios, Promotion=[True, False]))
+        np.testing.assert_allclose(predict_orders_batch(self.model, scenarios), expected)
+        for invalid in [np.nan, None, 'false']:
+            with self.assertRaises(ValueError):
+                predict_orders_batch(self.model, dict(scenarios, Promotion=[True, invalid]))
+
+    def test_compiled_model_matches_pipeline(self):
+        compiled = compile_model(self.model)
+        X = self.df[FEATURE_COLUMNS]
+        np.testing.assert_allclose(compiled.predict(X), self.model.predict(X))
+        np.testing.assert_allclose(
+            predict_orders(compiled, 'Winter', 'Snowy', 'Cold', False, True, True),
+            predict_orders(self.model, 'Winter', 'Snowy', 'Cold', False, True, True)
+        )
+
+    def test_compiled_model_falls_back_for_unknown_categories(self):
+        compiled = compile_model(self.model)
+        np.testing.assert_allclose(
+            predict_orders(compiled, 'Summer', 'Foggy', 'Warm', False, False, False),
+            predict_orders(self.model, 'Summer', 'Foggy', 'Warm', False, False, False)
+        )
+        X = self.df[FEATURE_COLUMNS].head(3).copy()
+        X['Temperature'] = ['Warm', 'Scorching', 'Cold']
+        np.testing.assert_allclose(compiled.predict(X), self.model.predict(X))
+
+    def test_compiled_table_is_persisted(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            compiled = compile_model(self.model, 'v1', artifact_dir)
+            saved = load_arrays('v1', PREDICTION_TABLE_NAME, artifact_dir)['predictions']
+            np.testing.assert_array_equal(saved, compiled.table)
+            reloaded = compile_model(self.model, 'v1', artifact_dir)
+            np.testing.assert_array_equal(reloaded.table, compiled.table)
+
+
+class TestModelArtifacts(unittest.TestCase):
+
+    def test_train_model_saves_loadable_artifact(self):
+        df = load_history()
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            model, metrics = train_model(df, artifact_dir=artifact_dir)
+            key = artifact_key(df, FEATURE_COLUMNS + TARGET_COLUMNS, DEFAULT_MODEL_PARAMS)
+            loaded_model, loaded_metrics = load_artifact(key, artifact_dir)
+            self.assertEqual(load_meta(key, artifact_dir)['rows'], len(df))
+        self.assertAlmostEqual(loaded_metrics['overall_mae'], metrics['overall_mae'])
+        np.testing.assert_allclose(
+            loaded_model.predict(df[FEATURE_COLUMNS]), model.predict(df[FEATURE_COLUMNS])
+        )
+
+    def test_key_ignores_storage_dtypes(self):
+        df = load_history()
+        typed = df.astype({'Season': 'category', 'Tomato_Boxes': 'int16'})
+        columns = FEATURE_COLUMNS + TARGET_COLUMNS
+        self.assertEqual(
+            artifact_key(df, columns, DEFAULT_MODEL_PARAMS),
+            artifact_key(typed, columns, DEFAULT_MODEL_PARAMS)
+        )
+        self.assertNotEqual(
+            artifact_key(df, columns, DEFAULT_MODEL_PARAMS),
+            artifact_key(df.iloc[:-1], columns, DEFAULT_MODEL_PARAMS)
+        )
+
+    def test_appended_weeks_update_model_incrementally(self):
+        df = load_history()
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            train_model(df.iloc[:180], artifact_dir=artifact_dir)
+            model, metrics = train_model(df, artifact_dir=artifact_dir)
+            latest_key = load_latest(artifact_dir)
+            meta = load_meta(latest_key, artifact_dir)
+            # The update is not stored under the key of a full fit on df
+            full_key = artifact_key(df, FEATURE_COLUMNS + TARGET_COLUMNS, DEFAULT_MODEL_PARAMS)
+            self.assertNotEqual(latest_key, full_key)
+            self.assertIsNone(load_meta(full_key, artifact_dir))
+            train_model.clear()
+            reloaded, _ = train_model(df, artifact_dir=artifact_dir)
+        self.assertEqual(model_version(reloaded), latest_key)
+        self.assertEqual(meta['mode'], 'incremental')
+        self.assertEqual(meta['rows'], len(df))
+        self.assertEqual(len(model.named_steps['regressor'].estimators_),
+                         DEFAULT_MODEL_PARAMS['n_estimators'])
+        self.assertIn('overall_mae', metrics)
+
+    def test_retired_trees_are_capped(self):
+        df = load_history()
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            train_model(df.iloc[:180], artifact_dir=artifact_dir)
+            meta = load_meta(load_latest(artifact_dir), artifact_dir)
+            model, _ = load_artifact(load_latest(artifact_dir), artifact_dir)
+        self.assertIsNotNone(update_model(model, df, 180, meta['holdout'], updates=0))
+        # 100 trees, 10 retired per update: at most half may go
+        self.assertIsNone(update_model(model, df, 180, meta['holdout'], updates=5))
+
+    def test_drift_forces_full_retrain(self):
+        df = load_history()
+        drifted = df.copy()
+        drifted.loc[180:, TARGET_COLUMNS] = 50
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            train_model(df.iloc[:180], artifact_dir=artifact_dir)
+            train_model(drifted, artifact_dir=artifact_dir)
+            meta = load_meta(load_latest(artifact_dir), artifact_dir)
+        self.assertEqual(meta['mode'], 'full')
+
+
+class TestOrderPlanner(unittest.TestCase):
+
+    def test_next_wednesdays(self):
+        self.assertEqual(
+            next_wednesdays(3, date(2024, 1, 1)),
+            [date(2024, 1, 3), date(2024, 1, 10), date(2024, 1, 17)]
+        )
+        self.assertEqual(next_wednesdays(1, date(2024, 1, 3)), [date(2024, 1, 3)])
+
+    def test_plan_uses_forecast_then_history(self):
+        df = load_history()
+        model, _ = fit_model(df)
+
+        def weather_fn(day):
+            return ('Sunny', 25.0) if day < date(2024, 7, 10) else (None, None)
+
+        plan = plan_orders(model, df, n_weeks=3, start_date=date(2024, 7, 1), weather_fn=weather_fn)
+        self.assertEqual(list(plan['Weather_Source']), ['Forecast', 'History', 'History'])
+        self.assertEqual(plan.loc[0, 'Temperature'], 'Warm')
+        expected = predict_orders(model, 'Summer', 'Sunny', 'Warm', False, False, False)
+        self.assertAlmostEqual(plan.loc[0, 'Tomato Raw'], expected[0])
+        self.assertEqual(plan.loc[0, 'Tomato'], int(round(expected[0])))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,11 @@
 import unittest
-from datetime import datetime
-from model_utils import get_temperature_category, get_season
+from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from model_utils import (
+    encode_feature_frame, encode_features, feature_space_frame, get_temperature_category, get_season,
+    get_temperature_categories, get_seasons
+)
 
 class TestModelUtils(unittest.TestCase):
 
@@ -36,5 +41,46 @@ class TestModelUtils(unittest.TestCase):
         self.assertEqual(get_season(datetime(2023, 12, 20)), 'Winter')
         self.assertEqual(get_season(datetime(2023, 3, 19)), 'Winter')
 
+    def test_get_seasons_matches_scalar_for_every_day(self):
+        # A leap year covers every (month, day), including the Dec 20 wraparound
+        days = [date(2024, 1, 1) + timedelta(days=i) for i in range(366)]
+        expected = [get_season(d) for d in days]
+        for dates in [days, pd.to_datetime(days), np.array(days, dtype='datetime64[D]'),
+                      pd.Series(pd.to_datetime(days)).dt.strftime('%Y-%m-%d')]:
+            self.assertEqual(list(get_seasons(dates)), expected)
+        self.assertEqual(list(get_seasons(pd.to_datetime(['2023-12-19', '2023-12-20', '2024-03-19',
+                                                          '2024-03-20']))),
+                         ['Autumn', 'Winter', 'Winter', 'Spring'])
+
+    def test_get_temperature_categories_matches_scalar(self):
+        rng = np.random.default_rng(0)
+        edges = np.array([-3, 10, 17, 27], dtype=float)
+        temps = np.concatenate([
+            edges, np.nextafter(edges, -np.inf), np.nextafter(edges, np.inf),
+            np.arange(-40, 50, 0.1), rng.uniform(-60, 60, 10_000),
+        ])
+        expected = [get_temperature_category(t) for t in temps]
+        self.assertEqual(list(get_temperature_categories(temps)), expected)
+        self.assertEqual(list(get_temperature_categories(list(range(-10, 40)))),
+                         [get_temperature_category(t) for t in range(-10, 40)])
+
+    def test_encode_feature_frame_rejects_missing_flags(self):
+        frame = feature_space_frame().iloc[[0, 1, 2]].reset_index(drop=True)
+        expected = encode_feature_frame(frame)
+        frame = frame.astype({'Promotion': object})
+        frame.loc[1, 'Promotion'] = np.nan
+        self.assertEqual(list(encode_feature_frame(frame)), [expected[0], -1, expected[2]])
+        frame.loc[1, 'Promotion'] = 'false'
+        self.assertEqual(encode_feature_frame(frame)[1], -1)
+        self.assertIsNone(encode_features('Summer', 'Sunny', 'Warm', False, None, False))
+        self.assertEqual(encode_features('Summer', 'Sunny', 'Warm', 0, 1, 0),
+                         encode_features('Summer', 'Sunny', 'Warm', False, True, False))
+
+    def test_get_temperature_categories_missing(self):
+        result = get_temperature_categories([None, 12.5, np.nan])
+        self.assertTrue(pd.isna(result[0]) and pd.isna(result[2]))
+        self.assertEqual(result[1], 'Normal')
+
+
 if __name__ == '__main__':
     unittest.main()
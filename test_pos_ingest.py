@@ -0,0 +1,84 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from history_store import import_csv, read_history, write_history
+from pos_ingest import SalesKeyIndex, ingest_pos_export, sales_keys, validate_chunk
+
+
+class TestPosIngest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'history.parquet')
+        self.csv = pd.read_csv('sales_history.csv', dtype=str)
+
+    def export(self, df, name='export.csv'):
+        export_path = os.path.join(self.tmpdir.name, name)
+        df.to_csv(export_path, index=False)
+        return export_path
+
+    def test_key_index(self):
+        dates = pd.to_datetime(['2024-01-03', '2024-01-10', '2024-01-03'])
+        keys = sales_keys(dates, [1, 1, 2])
+        self.assertEqual(len(set(keys)), 3)
+        index = SalesKeyIndex(keys[:2])
+        np.testing.assert_array_equal(index.contains(keys), [True, True, False])
+        index.add(keys[2:])
+        self.assertTrue(index.contains(keys).all())
+        self.assertEqual(len(index), 3)
+
+    def test_validation_rejects_bad_rows(self):
+        chunk = self.csv.head(6).copy()
+        chunk.loc[0, 'Temperature'] = 'Tepid'
+        chunk.loc[1, 'Date'] = '2024-13-01'
+        chunk.loc[2, 'Holiday'] = 'maybe'
+        chunk.loc[3, 'Lettuce_Boxes'] = '-1'
+        chunk.loc[4, 'Weather'] = ' Sunny '
+        valid, rejected = validate_chunk(chunk)
+        self.assertEqual(len(valid), 2)
+        self.assertEqual(list(rejected['Error']), ['unknown Temperature', 'invalid Date',
+                                                   'invalid Holiday', 'invalid Lettuce_Boxes'])
+        self.assertEqual(valid.loc[0, 'Weather'], 'Sunny')
+        self.assertEqual(valid['Tomato_Boxes'].dtype, 'int16')
+        with self.assertRaises(ValueError):
+            validate_chunk(chunk.drop(columns='Promotion'))
+
+    def test_appends_new_rows_and_skips_duplicates(self):
+        csv_path = self.export(self.csv.head(150), 'seed.csv')
+        import_csv(csv_path, self.path)
+        # Overlaps the stored rows, repeats a row and leaves Season to be derived
+        export = pd.concat([self.csv.iloc[100:], self.csv.tail(1)]).drop(columns='Season')
+        rejects = os.path.join(self.tmpdir.name, 'rejects.csv')
+        progress = []
+        report = ingest_pos_export(self.export(export), self.path, chunk_rows=16, part_rows=25,
+                                   rejects_path=rejects, on_progress=progress.append)
+        self.assertEqual(report['rows_read'], len(export))
+        self.assertEqual(report['rows_appended'], len(self.csv) - 150)
+        self.assertEqual(report['duplicates'], 51)
+        self.assertEqual(report['parts_written'], 2)
+        self.assertFalse(os.path.exists(rejects))
+        self.assertEqual(len(progress), 7)
+
+        history = read_history(self.path)
+        self.assertEqual(list(history.columns), list(self.csv.columns))
+        self.assertEqual(list(history['Date'].dt.strftime('%Y-%m-%d')), list(self.csv['Date']))
+        self.assertEqual(list(history['Season'].astype(str)), list(self.csv['Season']))
+
+        again = ingest_pos_export(self.export(export), self.path)
+        self.assertEqual(again['rows_appended'], 0)
+
+    def test_multi_store_histories_need_store_ids(self):
+        write_history(self.csv.head(10).assign(Store=1), self.path)
+        with self.assertRaises(ValueError):
+            ingest_pos_export(self.export(self.csv.head(10)), self.path)
+        report = ingest_pos_export(self.export(self.csv.head(10)), self.path, store=2)
+        self.assertEqual(report['rows_appended'], 10)
+        history = read_history(self.path)
+        self.assertEqual(history.groupby('Store').size().to_dict(), {1: 10, 2: 10})
+
+
+if __name__ == '__main__':
+    unittest.main()
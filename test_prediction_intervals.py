@@ -0,0 +1,58 @@
+import unittest
+from datetime import date
+import numpy as np
+import pandas as pd
+from model_trainer import (
+    compile_model, fit_model, predict_intervals, predict_quantiles_batch, FEATURE_COLUMNS
+)
+from order_planner import plan_orders
+from prediction_intervals import StackedTrees, predict_quantiles, tree_predictions
+
+
+class TestPredictionIntervals(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = pd.read_csv('sales_history.csv')
+        cls.X = cls.df[FEATURE_COLUMNS]
+        cls.model, _ = fit_model(cls.df)
+
+    def test_tree_predictions_match_each_tree(self):
+        regressor = self.model.named_steps['regressor']
+        encoded = self.model[:-1].transform(self.X)
+        expected = np.stack([tree.predict(encoded) for tree in regressor.estimators_])
+        per_tree = tree_predictions(self.model, self.X)
+        self.assertEqual(per_tree.shape, (len(regressor.estimators_), len(self.X), 4))
+        np.testing.assert_allclose(per_tree, expected)
+        np.testing.assert_allclose(per_tree.mean(axis=0), self.model.predict(self.X), atol=1e-9)
+
+    def test_quantiles_are_chunked_and_deduplicated(self):
+        X = pd.concat([self.X, self.X.head(50)], ignore_index=True)
+        expected = np.quantile(tree_predictions(self.model, X), [0.1, 0.5, 0.9], axis=0)
+        np.testing.assert_allclose(predict_quantiles(self.model, X, chunk_rows=7), expected)
+        self.assertEqual(predict_quantiles(self.model, X.head(0)).shape, (3, 0, 4))
+
+    def test_compiled_model_lookup(self):
+        compiled = compile_model(self.model)
+        scenarios = self.X.head(20).copy()
+        scenarios.loc[0, 'Weather'] = 'Foggy'
+        np.testing.assert_allclose(
+            predict_quantiles_batch(compiled, scenarios),
+            predict_quantiles_batch(self.model, scenarios)
+        )
+        p10, p50, p90 = predict_intervals(compiled, 'Summer', 'Sunny', 'Hot', False, True, False)
+        self.assertTrue((p10 <= p50).all() and (p50 <= p90).all())
+
+    def test_plan_adds_quantile_columns(self):
+        plan = plan_orders(self.model, self.df, n_weeks=3, start_date=date(2024, 7, 1),
+                           weather_fn=lambda day: ('Sunny', 28.0), quantiles=(0.1, 0.9))
+        self.assertTrue((plan['Tomato P10'] <= plan['Tomato P90']).all())
+        self.assertIn('Cucumber P90', plan.columns)
+
+    def test_rejects_models_without_trees(self):
+        with self.assertRaises(ValueError):
+            StackedTrees(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import http.client
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import requests
+from model_trainer import FEATURE_COLUMNS, INGREDIENTS, predict_orders, train_model
+from prediction_service import MicroBatcher, PredictionService, create_server
+
+
+class TestMicroBatcher(unittest.TestCase):
+
+    def test_concurrent_requests_share_batches(self):
+        batch_sizes = []
+
+        def double(frame):
+            batch_sizes.append(len(frame))
+            return frame['x'].to_numpy() * 2
+
+        batcher = MicroBatcher(double, max_batch_size=64, max_wait=0.05)
+        self.addCleanup(batcher.close)
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(lambda i: batcher(pd.DataFrame({'x': [i, i + 100]})), range(32)))
+        for i, result in enumerate(results):
+            np.testing.assert_array_equal(result, [2 * i, 2 * (i + 100)])
+        self.assertEqual(sum(batch_sizes), 64)
+        self.assertLess(batcher.batch_count, 32)
+        self.assertEqual(batcher.request_count, 32)
+
+    def test_errors_reach_every_caller(self):
+        batcher = MicroBatcher(lambda frame: 1 / 0, max_wait=0)
+        self.addCleanup(batcher.close)
+        with self.assertRaises(ZeroDivisionError):
+            batcher(pd.DataFrame({'x': [1]}))
+
+
+class TestPredictionService(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.df = pd.read_csv('sales_history.csv')
+        cls.df['Date'] = pd.to_datetime(cls.df['Date'])
+        cls.model, _ = train_model(cls.df, artifact_dir=cls.tmpdir.name)
+        cls.service = PredictionService(cls.model, cls.tmpdir.name)
+        cls.server = create_server(cls.service, '127.0.0.1', 0, workers=4)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        host, port = cls.server.server_address
+        cls.url = f'http://{host}:{port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.service.close()
+        cls.tmpdir.cleanup()
+
+    def test_predict_matches_predict_orders(self):
+        rows = self.df[FEATURE_COLUMNS].head(5)
+        scenarios = rows.assign(Season=rows['Season'].astype(str)).to_dict('records')
+        response = requests.post(f'{self.url}/predict', json={'scenarios': scenarios}, timeout=10)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertEqual(body['model_version'], self.service.version)
+        for scenario, prediction in zip(scenarios, body['predictions']):
+            expected = predict_orders(self.model, *scenario.values())
+            np.testing.assert_allclose([prediction[f'{i} Raw'] for i in INGREDIENTS], expected)
+            self.assertEqual([prediction[i] for i in INGREDIENTS], [int(round(v)) for v in expected])
+
+    def test_single_scenario_with_date(self):
+        scenario = {'Date': '2024-07-03', 'Weather': 'Sunny', 'Temperature': 'Warm', 'Promotion': True}
+        response = requests.post(f'{self.url}/predict', json=scenario, timeout=10)
+        expected = predict_orders(self.model, 'Summer', 'Sunny', 'Warm', False, True, False)
+        np.testing.assert_allclose([response.json()['predictions'][0][f'{i} Raw'] for i in INGREDIENTS],
+                                   expected)
+
+    def test_explain_matches_explanation_context(self):
+        scenario = {'Season': 'Winter', 'Weather': 'Snowy', 'Temperature': 'Cold'}
+        response = requests.post(f'{self.url}/explain', json=scenario, timeout=10)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        expected = self.service.context.explain(self.service.parse_scenarios(scenario)).values[0]
+        names = self.service.context.feature_names
+        for i, ingredient in enumerate(INGREDIENTS):
+            contributions = body['explanations'][0][ingredient]
+            np.testing.assert_allclose([contributions[n] for n in names], expected[:, i], atol=1e-5)
+
+    def test_rejects_invalid_requests(self):
+        for body in [{'Weather': 'Sunny'}, {'Season': 'Summer', 'Weather': 'Foggy', 'Temperature': 'Hot'},
+                     {'scenarios': []}, [1, 2],
+                     {'Season': ['Summer'], 'Weather': 'Sunny', 'Temperature': 'Hot'},
+                     {'Season': 'Summer', 'Weather': 'Sunny', 'Temperature': 'Hot', 'Promotion': 'false'},
+                     {'Season': 'Summer', 'Weather': 'Sunny', 'Temperature': 'Hot', 'Holiday': None}]:
+            response = requests.post(f'{self.url}/predict', json=body, timeout=10)
+            self.assertEqual(response.status_code, 400, body)
+            self.assertIn('error', response.json())
+        self.assertEqual(requests.post(f'{self.url}/predict', data=b'{', timeout=10).status_code, 400)
+        self.assertEqual(requests.get(f'{self.url}/missing', timeout=10).status_code, 404)
+        # requests always sends the real length, so write this one by hand
+        host, port = self.server.server_address
+        connection = http.client.HTTPConnection(host, port, timeout=10)
+        self.addCleanup(connection.close)
+        connection.putrequest('POST', '/predict')
+        connection.putheader('Content-Length', '-1')
+        connection.endheaders()
+        self.assertEqual(connection.getresponse().status, 400)
+        health = requests.get(f'{self.url}/health', timeout=10).json()
+        self.assertEqual(health['model_version'], self.service.version)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import subprocess
+import sys
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+import shap
+from model_store import load_arrays
+from model_trainer import fit_model, FEATURE_COLUMNS
+from model_utils import FEATURE_SPACE_SIZE
+from shap_explainer import (
+    ExplanationContext, ShapLookup, ingredient_explanation, render_waterfall, start_shap_lookup,
+    waterfall_frame, waterfall_image, SHAP_TABLE_NAME
+)
+from telemetry import get_telemetry
+
+
+class TestExplanationContext(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        df = pd.read_csv('sales_history.csv')
+        cls.X = df[FEATURE_COLUMNS]
+        cls.model, _ = fit_model(df)
+        explainer = shap.TreeExplainer(cls.model.named_steps['regressor'])
+        cls.context = ExplanationContext(cls.model, explainer)
+
+    def test_feature_names_match_encoding(self):
+        encoded = self.context.preprocessor.get_feature_names_out()
+        self.assertEqual(self.context.feature_names, [name.split('__', 1)[1] for name in encoded])
+        self.assertEqual(self.context.feature_names[-3:], ['Long_Weekend', 'Promotion', 'Holiday'])
+
+    def test_explanation_adds_up_to_prediction(self):
+        inputs = self.X.head(5)
+        explanation = self.context.explain(inputs)
+        self.assertEqual(explanation.values.shape, (5, len(self.context.feature_names), 4))
+        reconstructed = explanation.values.sum(axis=1) + explanation.base_values
+        np.testing.assert_allclose(reconstructed, self.model.predict(inputs), atol=1e-6)
+
+    def test_ingredient_slice(self):
+        explanation = self.context.explain(self.X.head(2))
+        single = ingredient_explanation(explanation, 2, row=1)
+        np.testing.assert_allclose(single.values, explanation.values[1][:, 2])
+        self.assertAlmostEqual(single.base_values, self.context.expected_value[2])
+
+
+    def test_lookup_matches_explainer_and_persists(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            lookup = ShapLookup(self.context, 'v1', artifact_dir)
+            self.assertTrue(lookup.wait(60))
+            self.assertEqual(lookup.table['values'].shape[0], FEATURE_SPACE_SIZE)
+            self.assertIsNotNone(load_arrays('v1', SHAP_TABLE_NAME, artifact_dir))
+
+            inputs = self.X.head(10)
+            expected = self.context.explain(inputs)
+            looked_up = lookup.explain(inputs)
+            np.testing.assert_allclose(looked_up.values, expected.values, atol=1e-5)
+            np.testing.assert_allclose(looked_up.data, expected.data)
+
+            reloaded = ShapLookup(self.context, 'v1', artifact_dir)
+            self.assertTrue(reloaded.wait(60))
+            np.testing.assert_array_equal(reloaded.table['values'], lookup.table['values'])
+
+    def test_lookup_falls_back_for_unknown_categories(self):
+        lookup = ShapLookup(self.context)
+        self.assertTrue(lookup.wait(60))
+        inputs = self.X.head(1).copy()
+        inputs['Weather'] = 'Foggy'
+        np.testing.assert_allclose(
+            lookup.explain(inputs).values, self.context.explain(inputs).values
+        )
+
+    def test_background_build(self):
+        with tempfile.TemporaryDirectory() as artifact_dir:
+            future = start_shap_lookup(self.model, 'background-v1', artifact_dir)
+            self.assertIs(start_shap_lookup(self.model, 'background-v1', artifact_dir), future)
+            lookup = future.result(60)
+            self.assertTrue(lookup.wait(60))
+            inputs = self.X.head(3)
+            np.testing.assert_allclose(
+                lookup.explain(inputs).values, self.context.explain(inputs).values, atol=1e-5
+            )
+
+    def test_waterfall_images_close_their_figures(self):
+        import matplotlib.pyplot as plt
+
+        explanation = self.context.explain(self.X.head(1))
+        open_figures = len(plt.get_fignums())
+        png = waterfall_image(explanation, 0)
+        svg = waterfall_image(explanation, 1, fmt='svg')
+        self.assertTrue(png.startswith(b'\x89PNG'))
+        self.assertIn(b'<svg', svg)
+        self.assertEqual(len(plt.get_fignums()), open_figures)
+
+    def test_render_waterfall_is_cached_per_input(self):
+        explanation = self.context.explain(self.X.head(1))
+        input_key = tuple(self.X.iloc[0].tolist())
+        telemetry = get_telemetry()
+        misses = lambda: telemetry.cache_stats().get('render_waterfall', {}).get('misses', 0)
+        before = misses()
+        first = render_waterfall('render-v1', input_key, 0, explanation)
+        self.assertEqual(render_waterfall('render-v1', input_key, 0, explanation), first)
+        self.assertEqual(misses(), before + 1)
+        render_waterfall('render-v1', input_key, 1, explanation)
+        render_waterfall('render-v2', input_key, 0, explanation)
+        self.assertEqual(misses(), before + 3)
+
+    def test_waterfall_frame(self):
+        explanation = self.context.explain(self.X.head(1))
+        frame = waterfall_frame(explanation, 3, max_features=4)
+        self.assertEqual(list(frame.columns), ['Feature', 'Contribution'])
+        self.assertLessEqual(len(frame), 4)
+        contributions = frame['Contribution'].abs().to_numpy()
+        self.assertTrue((np.diff(contributions) <= 0).all())
+        full = waterfall_frame(explanation, 3, max_features=None)
+        self.assertAlmostEqual(full['Contribution'].sum(), explanation.values[0][:, 3].sum(), places=6)
+
+    def test_import_defers_shap_and_matplotlib(self):
+        code = "import sys, shap_explainer; print('shap' in sys.modules, 'matplotlib' in sys.modules)"
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.split(), ['False', 'False'])
+
+
+if __name__ == '__main__':
+    unittest.main()
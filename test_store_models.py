@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from generate_data import generate_data
+from history_store import list_stores, read_history, write_history
+from model_store import load_store_index, model_version
+from model_trainer import FEATURE_COLUMNS, fit_model
+from store_models import StoreModelCache, train_store_models
+
+PARAMS = {'n_estimators': 10, 'random_state': 0}
+
+
+class TestStoreModels(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        csv_path = os.path.join(cls.tmpdir.name, 'history.csv')
+        generate_data(seed=3, stores=3, years=2, output_path=csv_path)
+        cls.path = os.path.join(cls.tmpdir.name, 'history.parquet')
+        write_history(pd.read_csv(csv_path), cls.path)
+        cls.artifact_dir = os.path.join(cls.tmpdir.name, 'artifacts')
+        cls.keys = train_store_models(cls.path, cls.artifact_dir, params=PARAMS, n_jobs=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmpdir.cleanup()
+
+    def test_reads_store_partitions(self):
+        self.assertEqual(list_stores(self.path), [1, 2, 3])
+        full = read_history(self.path)
+        store = read_history(self.path, store=2)
+        self.assertTrue((store['Store'] == 2).all())
+        self.assertEqual(len(store), (full['Store'] == 2).sum())
+
+    def test_one_model_per_store(self):
+        self.assertEqual(sorted(self.keys), [1, 2, 3])
+        self.assertEqual(len(set(self.keys.values())), 3)
+        self.assertEqual(load_store_index(self.artifact_dir), self.keys)
+
+        model, _ = StoreModelCache(self.artifact_dir).get(2)
+        partition = read_history(self.path, store=2)
+        expected, _ = fit_model(partition, PARAMS)
+        X = partition[FEATURE_COLUMNS].head(20)
+        np.testing.assert_allclose(model.predict(X), expected.predict(X))
+
+    def test_unchanged_stores_are_not_retrained(self):
+        model_path = os.path.join(self.artifact_dir, self.keys[1], 'model.joblib')
+        mtime = os.stat(model_path).st_mtime_ns
+        self.assertEqual(train_store_models(self.path, self.artifact_dir, params=PARAMS, n_jobs=1),
+                         self.keys)
+        self.assertEqual(os.stat(model_path).st_mtime_ns, mtime)
+
+    def test_trains_requested_store_on_demand(self):
+        artifact_dir = os.path.join(self.tmpdir.name, 'on-demand')
+        cache = StoreModelCache(artifact_dir, path=self.path, params=PARAMS)
+        self.assertEqual(cache.stores, [1, 2, 3])
+        self.assertEqual(load_store_index(artifact_dir), {})
+        model, _ = cache.get(2)
+        self.assertEqual(model_version(model), self.keys[2])
+        self.assertEqual(load_store_index(artifact_dir), {2: self.keys[2]})
+        with self.assertRaises(KeyError):
+            cache.get(99)
+
+    def test_cache_bounds_resident_models(self):
+        cache = StoreModelCache(self.artifact_dir, max_models=2)
+        self.assertEqual(cache.stores, [1, 2, 3])
+        self.assertEqual(cache.resident, [])
+        first, _ = cache.get(1)
+        cache.get(2)
+        self.assertIs(cache.get(1)[0], first)
+        cache.get(3)
+        self.assertEqual(cache.resident, [1, 3])
+        cache.get(2)
+        self.assertEqual(cache.resident, [3, 2])
+        with self.assertRaises(KeyError):
+            cache.get(99)
+
+    def test_evicted_store_is_not_rehashed(self):
+        cache = StoreModelCache(self.artifact_dir, max_models=1, path=self.path, params=PARAMS)
+        cache.get(1)
+        cache.get(2)
+        self.assertEqual(cache.resident, [2])
+        with patch('store_models.read_history', side_effect=AssertionError("partition re-read")):
+            model, _ = cache.get(1)
+        self.assertEqual(model_version(model), self.keys[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+import unittest
+import pandas as pd
+import requests
+from data_loader import load_data
+from telemetry import Telemetry, get_telemetry, serve_metrics
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_spans_accumulate_and_track_the_current_run(self):
+        telemetry = Telemetry()
+        telemetry.record_span('load_data', 0.5)
+        telemetry.begin_run()
+        telemetry.record_span('load_data', 0.25)
+        with telemetry.span('predict'):
+            pass
+        stages = telemetry.stages()
+        self.assertEqual(stages['load_data'], {'count': 2, 'total_seconds': 0.75, 'max_seconds': 0.5})
+        self.assertEqual(stages['predict']['count'], 1)
+        self.assertEqual(telemetry.last_run()['load_data'], 0.25)
+        self.assertEqual(set(telemetry.last_run()), {'load_data', 'predict'})
+
+    def test_current_run_is_per_thread(self):
+        telemetry = Telemetry()
+        telemetry.begin_run()
+        telemetry.record_span('load_data', 0.5)
+
+        def other_session():
+            telemetry.begin_run()
+            telemetry.record_span('predict', 0.25)
+            return telemetry.last_run()
+
+        thread_runs = []
+        thread = threading.Thread(target=lambda: thread_runs.append(other_session()))
+        thread.start()
+        thread.join()
+        self.assertEqual(thread_runs, [{'predict': 0.25}])
+        self.assertEqual(telemetry.last_run(), {'load_data': 0.5})
+        self.assertEqual(set(telemetry.stages()), {'load_data', 'predict'})
+
+    def test_cache_hits_are_calls_without_misses(self):
+        telemetry = Telemetry()
+        for _ in range(3):
+            with telemetry.span('train_model', cached=True):
+                pass
+        telemetry.cache_miss('train_model')
+        self.assertEqual(telemetry.cache_stats(), {'train_model': {'calls': 3, 'hits': 2, 'misses': 1}})
+
+    def test_cached_loader_reports_misses(self):
+        telemetry = get_telemetry()
+        with tempfile.TemporaryDirectory() as tmp:
+            csv_path = os.path.join(tmp, 'history.csv')
+            pd.read_csv('sales_history.csv').head(50).to_csv(csv_path, index=False)
+            store_path = os.path.join(tmp, 'history.parquet')
+            misses = telemetry.cache_stats().get('load_data', {}).get('misses', 0)
+            for _ in range(2):
+                with telemetry.span('load_data', cached=True):
+                    load_data(store_path, csv_path)
+            self.assertEqual(telemetry.cache_stats()['load_data']['misses'], misses + 1)
+
+    def test_prometheus_export(self):
+        telemetry = Telemetry()
+        telemetry.record_span('weather', 0.125)
+        telemetry.cache_call('load_data')
+        text = telemetry.to_prometheus()
+        self.assertIn('# TYPE app_stage_seconds_total counter', text)
+        self.assertIn('app_stage_seconds_total{stage="weather"} 0.125', text)
+        self.assertIn('app_cache_calls_total{cache="load_data"} 1', text)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'metrics.prom')
+            telemetry.write_metrics(path)
+            with open(path) as f:
+                self.assertEqual(f.read(), text)
+
+        server = serve_metrics(0, host='127.0.0.1', collector=telemetry)
+        try:
+            host, port = server.server_address
+            response = requests.get(f'http://{host}:{port}/metrics', timeout=5)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.text, text)
+            self.assertEqual(requests.get(f'http://{host}:{port}/', timeout=5).status_code, 404)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
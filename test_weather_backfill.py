@@ -0,0 +1,67 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+import pandas as pd
+from weather_backfill import (
+    archive_client, backfill_weather, join_weather, last_stored_date, location_key, read_weather
+)
+from weather_service import get_weather_category
+from weather_stub import StubWeatherServer, stub_observation
+
+LAT, LON = 49.2827, -123.1207
+
+
+class TestWeatherBackfill(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubWeatherServer().start()
+        self.addCleanup(self.server.stop)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'weather.parquet')
+        self.client = archive_client(self.server.base_url + '/v1/archive')
+
+    def test_backfill_uses_range_requests(self):
+        stored = backfill_weather(date(2021, 1, 1), date(2023, 12, 31), LAT, LON,
+                                  path=self.path, client=self.client, chunk_days=366)
+        self.assertEqual(stored, 1095)
+        self.assertEqual(self.server.request_count, 3)
+        weather = read_weather(self.path, location_key(LAT, LON))
+        self.assertEqual(len(weather), 1095)
+        row = weather[weather['Date'] == pd.Timestamp(2022, 6, 15)].iloc[0]
+        code, temp = stub_observation(LAT, LON, date(2022, 6, 15))
+        self.assertEqual(row['Weather'], get_weather_category(code))
+        self.assertAlmostEqual(float(row['Max_Temp']), temp, places=4)
+
+    def test_backfill_resumes_from_last_stored_date(self):
+        backfill_weather(date(2023, 1, 1), date(2023, 6, 30), LAT, LON,
+                         path=self.path, client=self.client)
+        self.assertEqual(last_stored_date(self.path, location_key(LAT, LON)), date(2023, 6, 30))
+        stored = backfill_weather(date(2023, 1, 1), date(2023, 7, 31), LAT, LON,
+                                  path=self.path, client=self.client)
+        self.assertEqual(stored, 31)
+        _, params = self.server.requests[-1]
+        self.assertEqual((params['start_date'], params['end_date']), ('2023-07-01', '2023-07-31'))
+        self.assertEqual(backfill_weather(date(2023, 1, 1), date(2023, 7, 31), LAT, LON,
+                                          path=self.path, client=self.client), 0)
+        self.assertEqual(len(read_weather(self.path)), 212)
+
+    def test_join_by_store_location(self):
+        other = (45.5017, -73.5673)
+        for latitude, longitude in [(LAT, LON), other]:
+            backfill_weather(date(2023, 1, 1), date(2023, 1, 31), latitude, longitude,
+                             path=self.path, client=self.client)
+        sales = pd.DataFrame({
+            'Date': pd.to_datetime(['2023-01-04', '2023-01-04', '2023-02-01']),
+            'Store': [1, 2, 1],
+        })
+        joined = join_weather(sales, read_weather(self.path), {1: (LAT, LON), 2: other})
+        self.assertEqual(len(joined), 3)
+        code, _ = stub_observation(other[0], other[1], date(2023, 1, 4))
+        self.assertEqual(joined.loc[1, 'Observed_Weather'], get_weather_category(code))
+        self.assertTrue(pd.isna(joined.loc[2, 'Max_Temp']))
+
+
+if __name__ == '__main__':
+    unittest.main()
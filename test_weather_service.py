@@ -0,0 +1,126 @@
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from weather_service import WeatherClient, get_weather_category, prefetch_weather
+from weather_stub import StubWeatherServer, stub_observation
+
+LAT, LON = 49.2827, -123.1207
+
+
+class TestWeatherCategory(unittest.TestCase):
+
+    def test_codes(self):
+        self.assertEqual(get_weather_category(0), 'Sunny')
+        self.assertEqual(get_weather_category(3), 'Cloudy')
+        self.assertEqual(get_weather_category(71), 'Snowy')
+        self.assertEqual(get_weather_category(61), 'Rainy')
+
+
+class TestWeatherClient(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubWeatherServer().start()
+        self.addCleanup(self.server.stop)
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def _client(self, **kwargs):
+        kwargs.setdefault('cache_dir', os.path.join(self.tmpdir.name, 'cache'))
+        return WeatherClient(base_url=self.server.base_url + '/v1/forecast', **kwargs)
+
+    def _expected(self, day):
+        weather_code, max_temp = stub_observation(LAT, LON, day)
+        return get_weather_category(weather_code), max_temp
+
+    def test_fetch_single_day_and_cache(self):
+        client = self._client()
+        day = date(2024, 1, 3)
+        self.assertEqual(client.fetch(datetime(2024, 1, 3, 12), LAT, LON), self._expected(day))
+        self.assertEqual(client.fetch(day, LAT, LON), self._expected(day))
+        self.assertEqual(self.server.request_count, 1)
+
+        # A second client with the same cache directory doesn't hit the API either
+        self.assertEqual(self._client().fetch(day, LAT, LON), self._expected(day))
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_range_is_one_request(self):
+        client = self._client()
+        start = date(2024, 3, 1)
+        weather = client.fetch_range(start, start + timedelta(days=27), LAT, LON)
+        self.assertEqual(len(weather), 28)
+        self.assertEqual(weather[start + timedelta(days=5)], self._expected(start + timedelta(days=5)))
+        self.assertEqual(self.server.request_count, 1)
+        _, params = self.server.requests[0]
+        self.assertEqual((params['start_date'], params['end_date']), ('2024-03-01', '2024-03-28'))
+
+    def test_only_missing_days_are_requested(self):
+        client = self._client()
+        client.fetch_range(date(2024, 3, 1), date(2024, 3, 10), LAT, LON)
+        client.fetch_range(date(2024, 3, 5), date(2024, 3, 14), LAT, LON)
+        self.assertEqual(self.server.request_count, 2)
+        _, params = self.server.requests[1]
+        self.assertEqual((params['start_date'], params['end_date']), ('2024-03-11', '2024-03-14'))
+
+    def test_cache_expires(self):
+        client = self._client(cache_ttl=-1)
+        client.fetch(date(2024, 1, 3), LAT, LON)
+        client.fetch(date(2024, 1, 3), LAT, LON)
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_retries_server_errors(self):
+        self.server.fail_first = 1
+        self.assertEqual(self._client().fetch(date(2024, 1, 3), LAT, LON), self._expected(date(2024, 1, 3)))
+        self.assertEqual(self.server.request_count, 2)
+
+    def test_timeout_returns_unavailable(self):
+        self.server.latency = 0.5
+        client = self._client(timeout=0.1, retries=0)
+        self.assertEqual(client.fetch(date(2024, 1, 3), LAT, LON), (None, None))
+
+    def test_missing_days_are_omitted(self):
+        self.server.max_date = date(2024, 1, 5)
+        weather = self._client().fetch_range(date(2024, 1, 1), date(2024, 1, 10), LAT, LON)
+        self.assertEqual(sorted(weather), [date(2024, 1, d) for d in range(1, 6)])
+
+    def test_concurrent_cache_writes(self):
+        client = self._client()
+        day = date(2024, 1, 3)
+
+        def write(i):
+            for _ in range(50):
+                client.cache_put(LAT, LON, day, i, float(i))
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(write, range(8)))
+        self.assertIsNotNone(client.cache_get(LAT, LON, day))
+        self.assertEqual(os.listdir(client.cache_dir), [os.path.basename(client._cache_path(LAT, LON, day))])
+
+    def test_dates_beyond_horizon_are_not_requested(self):
+        client = self._client(horizon_days=16)
+        today = date.today()
+        weather = client.fetch_range(today, today + timedelta(days=60), LAT, LON)
+        self.assertEqual(max(weather), today + timedelta(days=15))
+        self.assertEqual(client.fetch(today + timedelta(days=30), LAT, LON), (None, None))
+        self.assertEqual(self.server.request_count, 1)
+
+    def test_prefetch_fills_cache_and_coalesces(self):
+        client = self._client(horizon_days=None)
+        locations = [(LAT, LON), (45.5017, -73.5673), (LAT, LON)]
+        dates = [date(2024, 1, 3), date(2024, 1, 10), date(2024, 1, 3)]
+        results = prefetch_weather(locations, dates, client=client, concurrency=4)
+        self.assertEqual(len(results), 4)
+        # One range request per location
+        self.assertEqual(self.server.request_count, 2)
+        self.assertEqual({(params['start_date'], params['end_date']) for _, params in self.server.requests},
+                         {('2024-01-03', '2024-01-10')})
+        self.assertEqual(results[(LAT, LON, date(2024, 1, 10))], self._expected(date(2024, 1, 10)))
+
+        # The synchronous path is served from the cache the prefetch filled
+        self.assertEqual(client.fetch(date(2024, 1, 10), LAT, LON), self._expected(date(2024, 1, 10)))
+        self.assertEqual(self.server.request_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+"""Historical weather backfill into a local columnar feature store.
+
+Pulls archived daily observations from the Open-Meteo archive API in large
+date-range requests and stores them per location as Parquet parts. Runs
+resume from the last stored date, so only new days are requested.
+"""
+import argparse
+from datetime import date, timedelta
+import pandas as pd
+from history_store import append_part, read_parts
+from model_utils import WEATHER_CATEGORIES, get_temperature_categories
+from weather_service import (
+    DEFAULT_LATITUDE, DEFAULT_LONGITUDE, WeatherClient, get_weather_category
+)
+
+ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+WEATHER_STORE_PATH = 'weather_history.parquet'
+# Days requested per archive call
+BACKFILL_CHUNK_DAYS = 366
+# The archive lags real time by a few days
+ARCHIVE_DELAY_DAYS = 5
+
+
+def location_key(latitude, longitude):
+    """Stable string key for a location."""
+    return f'{latitude:.4f},{longitude:.4f}'
+
+
+def archive_client(base_url=ARCHIVE_URL):
+    """WeatherClient for the archive API (no forecast horizon, no per-day cache)."""
+    return WeatherClient(base_url=base_url, horizon_days=None, cache_dir=None)
+
+
+def read_weather(path=WEATHER_STORE_PATH, location=None):
+    """
+    Read stored observations.
+
+    Args:
+        path: Weather store directory
+        location: Optional location_key to filter on
+
+    Returns:
+        DataFrame with Location, Date, Weather_Code, Max_Temp, Weather and Temperature
+    """
+    weather = read_parts(path)
+    if weather.empty:
+        return weather
+    if location is not None:
+        weather = weather[weather['Location'] == location]
+    return weather.reset_index(drop=True)
+
+
+def last_stored_date(path=WEATHER_STORE_PATH, location=None):
+    """Latest date stored for a location, or None."""
+    stored = read_parts(path, columns=['Location', 'Date'])
+    if location is not None:
+        stored = stored[stored['Location'] == location]
+    if stored.empty:
+        return None
+    return pd.Timestamp(stored['Date'].max()).date()
+
+
+def _observations_frame(observations, latitude, longitude):
+    """Typed weather rows for a {date: (weather_code, max_temp)} mapping."""
+    days = sorted(observations)
+    codes = [observations[day][0] for day in days]
+    temps = [observations[day][1] for day in days]
+    frame = pd.DataFrame({
+        'Location': location_key(latitude, longitude),
+        'Latitude': latitude,
+        'Longitude': longitude,
+        'Date': pd.to_datetime(days),
+        'Weather_Code': pd.Series(codes, dtype='int16'),
+        'Max_Temp': pd.Series(temps, dtype='float32'),
+    })
+    frame['Weather'] = pd.Categorical(
+        [get_weather_category(code) for code in codes], categories=WEATHER_CATEGORIES
+    )
+    frame['Temperature'] = get_temperature_categories(temps)
+    return frame
+
+
+def backfill_weather(start_date, end_date, latitude=DEFAULT_LATITUDE, longitude=DEFAULT_LONGITUDE,
+                     path=WEATHER_STORE_PATH, client=None, chunk_days=BACKFILL_CHUNK_DAYS):
+    """
+    Store archived daily weather for a location over a date span.
+
+    Resumes after the last date already stored for the location and writes
+    one part per chunk_days request, so an interrupted run keeps its progress.
+
+    Args:
+        start_date: First date to cover
+        end_date: Last date to cover
+        latitude: Location latitude (default: Vancouver)
+        longitude: Location longitude (default: Vancouver)
+        path: Weather store directory
+        client: WeatherClient pointed at the archive API (default: archive_client())
+        chunk_days: Days per archive request
+
+    Returns:
+        int: Number of days stored by this run
+    """
+    client = client or archive_client()
+    last = last_stored_date(path, location_key(latitude, longitude))
+    if last is not None:
+        start_date = max(start_date, last + timedelta(days=1))
+
+    stored = 0
+    chunk_start = start_date
+    while chunk_start <= end_date:
+        chunk_end = min(end_date, chunk_start + timedelta(days=chunk_days - 1))
+        observations = client.request_daily(chunk_start, chunk_end, latitude, longitude)
+        if observations:
+            append_part(_observations_frame(observations, latitude, longitude), path)
+            stored += len(observations)
+        chunk_start = chunk_end + timedelta(days=1)
+    return stored
+
+
+def join_weather(df, weather, locations=None):
+    """
+    Add observed weather columns to a sales history frame.
+
+    Args:
+        df: Sales history DataFrame with a 'Date' column
+        weather: Frame from read_weather
+        locations: Optional mapping of Store to (latitude, longitude). If None,
+            every row uses the single location in weather.
+
+    Returns:
+        df with Observed_Weather, Observed_Temperature and Max_Temp columns
+        (missing where no observation is stored)
+    """
+    observed = weather[['Location', 'Date', 'Weather', 'Temperature', 'Max_Temp']].rename(
+        columns={'Weather': 'Observed_Weather', 'Temperature': 'Observed_Temperature'}
+    )
+    observed['Date'] = observed['Date'].astype(df['Date'].dtype)
+    observed = observed.drop_duplicates(['Location', 'Date'], keep='last')
+    joined = df.copy()
+    if locations is not None and 'Store' in joined.columns:
+        keys = {store: location_key(*location) for store, location in locations.items()}
+        joined['Location'] = joined['Store'].map(keys)
+        joined = joined.merge(observed, on=['Location', 'Date'], how='left')
+        return joined.drop(columns='Location').set_axis(df.index)
+    observed = observed.drop(columns='Location').drop_duplicates('Date')
+    return joined.merge(observed, on='Date', how='left').set_axis(df.index)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill archived weather for the sales history span.")
+    parser.add_argument('--latitude', type=float, default=DEFAULT_LATITUDE)
+    parser.add_argument('--longitude', type=float, default=DEFAULT_LONGITUDE)
+    parser.add_argument('--start', type=date.fromisoformat, default=None,
+                        help="First date (default: first date in the sales history)")
+    parser.add_argument('--end', type=date.fromisoformat, default=None,
+                        help="Last date (default: last date in the sales history)")
+    parser.add_argument('--output', default=WEATHER_STORE_PATH, help="Weather store directory")
+    parser.add_argument('--base-url', default=ARCHIVE_URL, help="Archive API URL")
+    args = parser.parse_args()
+
+    start, end = args.start, args.end
+    if start is None or end is None:
+        from data_loader import load_data
+        dates = load_data()['Date']
+        start = start or dates.min().date()
+        end = end or dates.max().date()
+    end = min(end, date.today() - timedelta(days=ARCHIVE_DELAY_DAYS))
+
+    stored = backfill_weather(start, end, args.latitude, args.longitude, path=args.output,
+                              client=archive_client(args.base_url))
+    print(f"Stored {stored} days of weather in {args.output}")
+
+
+if __name__ == '__main__':
+    main()
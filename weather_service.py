@@ -1,15 +1,44 @@
 """Weather fetching and categorization service."""
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+import os
+import tempfile
+import time
+from datetime import date as date_type, datetime, timedelta
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from model_utils import get_temperature_category
 
+FORECAST_URL = "https://api.open-meteo.com/v1/forecast"
+# Open-Meteo serves forecasts up to 16 days ahead; later dates are reported as unavailable
+FORECAST_HORIZON_DAYS = 16
+
+DEFAULT_LATITUDE = 49.2827    # Vancouver
+DEFAULT_LONGITUDE = -123.1207
+
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT = (3.05, 10)
+DEFAULT_RETRIES = 2
+DEFAULT_POOL_SIZE = 10
+# Concurrent requests issued by prefetch_weather
+DEFAULT_CONCURRENCY = 10
+CACHE_DIR = '.weather_cache'
+CACHE_TTL_SECONDS = 3600
+
+logger = logging.getLogger(__name__)
+
 
 def get_weather_category(weather_code):
     """
     Convert WMO Weather interpretation code to category.
-    
+
     Args:
         weather_code: WMO weather code (WW)
-    
+
     Returns:
         Weather category string: 'Sunny', 'Cloudy', 'Snowy', or 'Rainy'
     """
@@ -24,43 +53,321 @@ def get_weather_category(weather_code):
         return 'Rainy'
 
 
-def fetch_weather_data(date, latitude=49.2827, longitude=-123.1207):
+def _as_date(value):
+    """Normalize a datetime or date to a date."""
+    return value.date() if isinstance(value, datetime) else value
+
+
+def build_session(retries=DEFAULT_RETRIES, pool_size=DEFAULT_POOL_SIZE):
     """
-    Fetch weather data from Open-Meteo API.
-    
+    Create a connection-pooled requests session with bounded retries.
+
+    Retries use exponential backoff and only apply to connection errors and
+    throttling/server errors on idempotent requests.
+
     Args:
-        date: datetime object for the target date
-        latitude: Location latitude (default: Vancouver)
-        longitude: Location longitude (default: Vancouver)
-    
+        retries: Maximum number of retries per request
+        pool_size: Connections kept alive per host
+
     Returns:
-        Tuple of (weather_category, max_temperature) or (None, None) if unavailable
+        requests.Session
     """
-    date_str = date.strftime('%Y-%m-%d')
-
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": latitude,
-        "longitude": longitude,
-        "daily": ["weather_code", "temperature_2m_max"],
-        "timezone": "auto",
-        "start_date": date_str,
-        "end_date": date_str
-    }
+    retry = Retry(
+        total=retries,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET']),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-    try:
-        response = requests.get(url, params=params)
+
+class WeatherClient:
+    """
+    Open-Meteo daily weather client.
+
+    Reuses one pooled session, bounds every request with a timeout and
+    retries, and keeps an on-disk TTL cache keyed by (latitude, longitude,
+    date). Date ranges are fetched with a single request.
+    """
+
+    def __init__(self, base_url=FORECAST_URL, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                 cache_dir=CACHE_DIR, cache_ttl=CACHE_TTL_SECONDS,
+                 horizon_days=FORECAST_HORIZON_DAYS, pool_size=DEFAULT_POOL_SIZE, session=None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.horizon_days = horizon_days
+        self.session = session or build_session(retries, pool_size)
+
+    def _cache_path(self, latitude, longitude, day):
+        return os.path.join(self.cache_dir, f'{latitude:.4f}_{longitude:.4f}_{day.isoformat()}.json')
+
+    def cache_get(self, latitude, longitude, day):
+        """Return the cached (weather_code, max_temp) for a day, or None if missing or expired."""
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(latitude, longitude, day)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - entry['fetched_at'] > self.cache_ttl:
+            return None
+        return entry['weather_code'], entry['max_temp']
+
+    def cache_put(self, latitude, longitude, day, weather_code, max_temp):
+        """
+        Store one day's observation in the on-disk cache.
+
+        Failed writes are logged and ignored; the observation is simply
+        fetched again next time.
+        """
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(latitude, longitude, day)
+        tmp_path = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Unique per writer: threads in one process often cache the same day
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'weather_code': weather_code, 'max_temp': max_temp,
+                           'fetched_at': time.time()}, f)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning('Could not cache weather for %s', path, exc_info=True)
+            if tmp_path is not None:
+                with suppress(OSError):
+                    os.remove(tmp_path)
+
+    def request_daily(self, start_date, end_date, latitude, longitude):
+        """
+        Fetch raw daily observations for a date range in one request.
+
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            latitude: Location latitude
+            longitude: Location longitude
+
+        Returns:
+            dict mapping date to (weather_code, max_temp) for the days returned
+
+        Raises:
+            requests.RequestException: On connection errors, timeouts or HTTP errors
+        """
+        params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "daily": ["weather_code", "temperature_2m_max"],
+            "timezone": "auto",
+            "start_date": start_date.strftime('%Y-%m-%d'),
+            "end_date": end_date.strftime('%Y-%m-%d')
+        }
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
         response.raise_for_status()
-        data = response.json()
+        daily = response.json().get('daily') or {}
+
+        observations = {}
+        for day, weather_code, max_temp in zip(daily.get('time', []),
+                                                daily.get('weather_code', []),
+                                                daily.get('temperature_2m_max', [])):
+            if weather_code is None or max_temp is None:
+                continue
+            observations[date_type.fromisoformat(day)] = (weather_code, max_temp)
+        return observations
+
+    def fetch_range(self, start_date, end_date, latitude=DEFAULT_LATITUDE,
+                    longitude=DEFAULT_LONGITUDE):
+        """
+        Weather for every day in a range, from the cache or one API request.
+
+        Args:
+            start_date: First date (inclusive)
+            end_date: Last date (inclusive)
+            latitude: Location latitude (default: Vancouver)
+            longitude: Location longitude (default: Vancouver)
+
+        Returns:
+            dict mapping date to (weather_category, max_temperature); days
+            without data (beyond the forecast horizon, or on API failure)
+            are omitted
+        """
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+        if self.horizon_days is not None:
+            end_date = min(end_date, date_type.today() + timedelta(days=self.horizon_days - 1))
+
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        observations = {}
+        missing = []
+        for day in days:
+            cached = self.cache_get(latitude, longitude, day)
+            if cached is None:
+                missing.append(day)
+            else:
+                observations[day] = cached
+
+        if missing:
+            try:
+                fetched = self.request_daily(missing[0], missing[-1], latitude, longitude)
+            except (requests.RequestException, ValueError):
+                # ValueError: the response was not valid JSON or had malformed dates
+                logger.warning('Weather request for (%s, %s) %s..%s failed', latitude, longitude,
+                               missing[0], missing[-1], exc_info=True)
+                fetched = {}
+            for day, (weather_code, max_temp) in fetched.items():
+                self.cache_put(latitude, longitude, day, weather_code, max_temp)
+            observations.update(fetched)
+
+        return {
+            day: (get_weather_category(observations[day][0]), observations[day][1])
+            for day in days if day in observations
+        }
+
+    def fetch(self, date, latitude=DEFAULT_LATITUDE, longitude=DEFAULT_LONGITUDE):
+        """
+        Weather for a single day.
+
+        Returns:
+            Tuple of (weather_category, max_temperature) or (None, None) if unavailable
+        """
+        day = _as_date(date)
+        return self.fetch_range(day, day, latitude, longitude).get(day, (None, None))
+
+
+class AsyncWeatherFetcher:
+    """
+    Concurrent weather fetches on top of a WeatherClient.
+
+    Each location's dates are fetched with one range request (see
+    WeatherClient.fetch_range), and the locations run in a dedicated pool of
+    `concurrency` worker threads. A range that is already in flight is
+    shared instead of hitting the API again. Results land in the client's
+    on-disk cache, so the synchronous path reads them afterwards.
+    """
+
+    def __init__(self, client=None, concurrency=DEFAULT_CONCURRENCY):
+        self.client = client or get_default_client()
+        self.concurrency = concurrency
+        self._executor = None
+        self._in_flight = {}
+
+    async def _fetch_range(self, latitude, longitude, start_date, end_date):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self.client.fetch_range,
+                                          start_date, end_date, latitude, longitude)
+
+    def fetch_range(self, latitude, longitude, start_date, end_date):
+        """
+        Schedule (or join) the fetch of one location's date range.
+
+        Must be called from a running event loop.
+
+        Returns:
+            asyncio.Task resolving to a dict mapping date to
+            (weather_category, max_temperature)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency,
+                                                thread_name_prefix='weather-fetch')
+        key = (latitude, longitude, _as_date(start_date), _as_date(end_date))
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_range(*key))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    async def fetch_many(self, items):
+        """
+        Fetch many (latitude, longitude, date) items concurrently.
+
+        The dates of each location are covered by a single range request.
+
+        Args:
+            items: Iterable of (latitude, longitude, date); duplicates are coalesced
 
-        if 'daily' not in data or not data['daily']['time']:
-            return None, None
+        Returns:
+            dict mapping (latitude, longitude, date) to (weather_category,
+            max_temperature), or (None, None) if unavailable
+        """
+        keys = [(latitude, longitude, _as_date(day)) for latitude, longitude, day in items]
+        days_by_location = {}
+        for latitude, longitude, day in keys:
+            days_by_location.setdefault((latitude, longitude), []).append(day)
+        tasks = {
+            location: self.fetch_range(*location, min(days), max(days))
+            for location, days in days_by_location.items()
+        }
+        weather = dict(zip(tasks.keys(), await asyncio.gather(*tasks.values())))
+        return {key: weather[key[:2]].get(key[2], (None, None)) for key in keys}
+
+    def close(self):
+        """Shut down the worker threads."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+def prefetch_weather(locations, dates, client=None, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Fetch weather for every location and date, one range request per location.
+
+    Args:
+        locations: Iterable of (latitude, longitude)
+        dates: Iterable of dates
+        client: WeatherClient to use (default: the shared client). Its
+            pool_size should be at least concurrency so connections are reused.
+        concurrency: Maximum requests in flight
+
+    Returns:
+        dict mapping (latitude, longitude, date) to (weather_category, max_temperature)
+    """
+    fetcher = AsyncWeatherFetcher(client, concurrency)
+    items = [(latitude, longitude, day) for latitude, longitude in locations for day in dates]
+    try:
+        return asyncio.run(fetcher.fetch_many(items))
+    finally:
+        fetcher.close()
 
-        weather_code = data['daily']['weather_code'][0]
-        max_temp = data['daily']['temperature_2m_max'][0]
 
-        weather_category = get_weather_category(weather_code)
+_default_client = None
 
-        return weather_category, max_temp
-    except Exception as e:
-        return None, None
+
+def get_default_client():
+    """Process-wide WeatherClient, so the connection pool and cache are shared."""
+    global _default_client
+    if _default_client is None:
+        _default_client = WeatherClient()
+    return _default_client
+
+
+def fetch_weather_range(start_date, end_date, latitude=DEFAULT_LATITUDE,
+                        longitude=DEFAULT_LONGITUDE):
+    """
+    Fetch weather for a date range from Open-Meteo API in one request.
+
+    Returns:
+        dict mapping date to (weather_category, max_temperature)
+    """
+    return get_default_client().fetch_range(start_date, end_date, latitude, longitude)
+
+
+def fetch_weather_data(date, latitude=DEFAULT_LATITUDE, longitude=DEFAULT_LONGITUDE):
+    """
+    Fetch weather data from Open-Meteo API.
+
+    Args:
+        date: datetime object for the target date
+        latitude: Location latitude (default: Vancouver)
+        longitude: Location longitude (default: Vancouver)
+
+    Returns:
+        Tuple of (weather_category, max_temperature) or (None, None) if unavailable
+    """
+    return get_default_client().fetch(date, latitude, longitude)
@@ -0,0 +1,140 @@
+"""Local stand-in for the Open-Meteo daily weather API.
+
+Serves deterministic synthetic observations for any location and date range,
+so the weather client can be tested and benchmarked without network access.
+"""
+import json
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# WMO codes cycled through by the stub: clear, overcast, rain, snow
+STUB_WEATHER_CODES = [0, 3, 61, 71]
+
+
+def stub_observation(latitude, longitude, day):
+    """Deterministic (weather_code, max_temp) served for a location and day."""
+    seed = day.toordinal() + int(round(latitude * 100)) + int(round(longitude * 100))
+    weather_code = STUB_WEATHER_CODES[seed % len(STUB_WEATHER_CODES)]
+    max_temp = round(-5 + (seed * 7) % 40 + 0.5, 1)
+    return weather_code, max_temp
+
+
+class StubWeatherServer:
+    """
+    Threaded HTTP server answering Open-Meteo style daily requests.
+
+    Args:
+        latency: Seconds to sleep before each response
+        fail_first: Number of initial requests answered with HTTP 503
+        max_date: Last date with data; later days are returned as null, like
+            the real API beyond its horizon
+
+    Use as a context manager; base_url points at the running server.
+    """
+
+    def __init__(self, latency=0.0, fail_first=0, max_date=None):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.max_date = max_date
+        self.requests = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True
+        )
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address
+        return f'http://{host}:{port}'
+
+    @property
+    def request_count(self):
+        with self._lock:
+            return len(self.requests)
+
+    def _record(self, path, params):
+        with self._lock:
+            self.requests.append((path, params))
+            return len(self.requests)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+                count = stub._record(url.path, params)
+                if stub.latency:
+                    time.sleep(stub.latency)
+                if count <= stub.fail_first:
+                    self._send(503, {'error': True, 'reason': 'stub failure'})
+                    return
+                try:
+                    body = stub.daily_response(params)
+                except (KeyError, ValueError) as e:
+                    self._send(400, {'error': True, 'reason': str(e)})
+                    return
+                self._send(200, body)
+
+            def _send(self, status, body):
+                payload = json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (e.g. timed out) before the response
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def daily_response(self, params):
+        """Build the JSON body for a daily request."""
+        latitude = float(params['latitude'])
+        longitude = float(params['longitude'])
+        start = date.fromisoformat(params['start_date'])
+        end = date.fromisoformat(params['end_date'])
+        if end < start:
+            raise ValueError('end_date is before start_date')
+
+        times, codes, temps = [], [], []
+        for i in range((end - start).days + 1):
+            day = start + timedelta(days=i)
+            times.append(day.isoformat())
+            if self.max_date is not None and day > self.max_date:
+                codes.append(None)
+                temps.append(None)
+            else:
+                weather_code, max_temp = stub_observation(latitude, longitude, day)
+                codes.append(weather_code)
+                temps.append(max_temp)
+        return {
+            'latitude': latitude,
+            'longitude': longitude,
+            'daily': {'time': times, 'weather_code': codes, 'temperature_2m_max': temps},
+        }
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()